@@ -0,0 +1 @@
+MEMORY_STORED = "memory.stored"
@@ -0,0 +1,166 @@
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+class IndexConfig(BaseModel):
+    ivf_threshold: int = Field(default=20000, description="Corpus size at which the approximate index is built")
+    nprobe: int = Field(default=8, ge=1, description="Inverted lists scanned per query")
+    kmeans_iterations: int = 10
+    kmeans_sample: int = 32768
+    rebuild_growth: float = Field(default=2.0, gt=1.0, description="Retrain once the corpus grew by this factor")
+
+
+def normalize(vectors: NDArray[np.float32]) -> NDArray[np.float32]:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def top_k(scores: NDArray[np.float32], k: int) -> NDArray[np.int64]:
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+class FlatIndex:
+    """Exact cosine search by a single matrix-vector product over normalized rows."""
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.size = 0
+
+    def add(self, vectors: NDArray[np.float32]):
+        needed = self.size + len(vectors)
+        if needed > len(self.vectors):
+            grown = np.empty((max(needed, 2 * len(self.vectors)), self.dim), dtype=np.float32)
+            grown[: self.size] = self.vectors[: self.size]
+            self.vectors = grown
+        self.vectors[self.size : needed] = vectors
+        self.size = needed
+
+    def search(self, query: NDArray[np.float32], k: int) -> Tuple[NDArray[np.int64], NDArray[np.float32]]:
+        scores = self.vectors[: self.size] @ query
+        ids = top_k(scores, k)
+        return ids, scores[ids]
+
+
+class IvfIndex:
+    """Inverted-file index: k-means coarse quantizer, exact scoring inside probed lists.
+
+    Each list keeps its vectors contiguous so a probe is one small matmul, no gather.
+    """
+
+    def __init__(self, centroids: NDArray[np.float32]):
+        self.centroids = centroids
+        self.lists: List[NDArray[np.float32]] = [np.empty((0, centroids.shape[1]), np.float32) for _ in centroids]
+        self.ids: List[NDArray[np.int64]] = [np.empty(0, np.int64) for _ in centroids]
+
+    @classmethod
+    def train(cls, vectors: NDArray[np.float32], config: IndexConfig, seed: int = 0) -> "IvfIndex":
+        rng = np.random.default_rng(seed)
+        nlist = max(1, int(np.sqrt(len(vectors))))
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), config.kmeans_sample), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+        for _ in range(config.kmeans_iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assignment, kind="stable")
+            counts = np.bincount(assignment, minlength=nlist)
+            empty = counts == 0
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+            sums = np.zeros_like(centroids)
+            sums[~empty] = np.add.reduceat(sample[order], starts[~empty], axis=0)
+            # Re-seed empty clusters with random sample points.
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = normalize(sums)
+
+        index = cls(centroids)
+        index.add(vectors, np.arange(len(vectors)))
+        return index
+
+    def add(self, vectors: NDArray[np.float32], ids: NDArray[np.int64]):
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        for list_id in np.unique(assignment):
+            mask = assignment == list_id
+            self.lists[list_id] = np.concatenate((self.lists[list_id], vectors[mask]))
+            self.ids[list_id] = np.concatenate((self.ids[list_id], ids[mask]))
+
+    def search(self, query: NDArray[np.float32], k: int, nprobe: int) -> Tuple[NDArray[np.int64], NDArray[np.float32]]:
+        probes = top_k(self.centroids @ query, nprobe)
+        scores = np.concatenate([self.lists[p] @ query for p in probes])
+        ids = np.concatenate([self.ids[p] for p in probes])
+        best = top_k(scores, k)
+        return ids[best], scores[best]
+
+
+class VectorIndex:
+    """Cosine top-k search that starts exact and switches to IVF as the corpus grows.
+
+    The IVF index is (re)trained on a background thread; until it is ready queries
+    keep using the exact index, which always holds every vector.
+    """
+
+    def __init__(self, dim: int, config: Optional[IndexConfig] = None):
+        self.config = config or IndexConfig()
+        self.flat = FlatIndex(dim)
+        self.ivf: Optional[IvfIndex] = None
+        self.ivf_trained_at = 0
+        self.lock = threading.Lock()
+        self.training: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return self.flat.size
+
+    def add(self, vectors: NDArray[np.float32]):
+        vectors = normalize(np.atleast_2d(vectors))
+        with self.lock:
+            first = self.flat.size
+            self.flat.add(vectors)
+            if self.ivf is not None:
+                self.ivf.add(vectors, np.arange(first, first + len(vectors)))
+        self._maybe_train()
+
+    def _maybe_train(self, wait: bool = False):
+        size = len(self)
+        due = size >= self.config.ivf_threshold and (
+            self.ivf is None or size >= self.ivf_trained_at * self.config.rebuild_growth
+        )
+        if not due or (self.training is not None and self.training.is_alive()):
+            return
+
+        self.training = threading.Thread(target=self._train, name="memory-ivf-train", daemon=True)
+        self.training.start()
+        if wait:
+            self.training.join()
+
+    def _train(self):
+        with self.lock:
+            size = self.flat.size
+            vectors = self.flat.vectors[:size].copy()
+
+        logger.info(f"Training IVF index over {size} vectors")
+        index = IvfIndex.train(vectors, self.config)
+
+        with self.lock:
+            # Catch up with vectors added while training.
+            if self.flat.size > size:
+                index.add(self.flat.vectors[size : self.flat.size], np.arange(size, self.flat.size))
+            self.ivf = index
+            self.ivf_trained_at = size
+
+    def search(self, query: NDArray[np.float32], k: int) -> Tuple[NDArray[np.int64], NDArray[np.float32]]:
+        query = normalize(query.reshape(-1))
+        with self.lock:
+            if self.ivf is not None:
+                return self.ivf.search(query, k, self.config.nprobe)
+            return self.flat.search(query, k)
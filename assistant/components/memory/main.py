@@ -0,0 +1,92 @@
+from queue import Queue
+from typing import Any, Dict, List
+
+from langchain_ollama import OllamaEmbeddings
+
+from assistant.components.shadow.types import MemorySummary
+from assistant.core import service
+from assistant.core.component import Component
+from assistant.utils import ensure_model_exists
+from assistant.utils.utils import observe
+
+from . import events
+from .index import IndexConfig, VectorIndex
+from .store import EmbeddingCache, MemoryHit, MemoryRecord, MemoryStore
+
+
+class Memory(Component):
+    @property
+    def version(self) -> str:
+        return "0.0.1"
+
+    @property
+    def events(self) -> List[str]:
+        return [events.MEMORY_STORED]
+
+    def initialize(self) -> None:
+        super().initialize()
+        self.logger.setLevel(self.get_config("log_level", "INFO"))
+        location = self.get_config("location", "./.memory")
+        url = self.get_config("url", "http://localhost:11434")
+        model = self.get_config("embedding_model", "nomic-embed-text")
+        # The dimension probe below needs the model, so wait for a pull here.
+        ensure_model_exists(url, model).wait()
+
+        self.embeddings = OllamaEmbeddings(base_url=url, model=model)
+        # Probe once for the embedding size instead of hardcoding it per model.
+        dim = len(self.embeddings.embed_query("dimension probe"))
+
+        self.embed = EmbeddingCache(location, model, dim, self.embeddings.embed_documents)
+        self.store = MemoryStore(location, dim)
+        self.index = VectorIndex(dim, IndexConfig.model_validate(self.get_config("index", {})))
+        self.index.add(self.store.load_vectors())
+
+        self.summaries = Queue()
+        self.summaries_observer = observe(self.summaries, self.store_summary, name="memory-summaries")
+
+        self.logger.info(f"Plugin '{self.name}' initialized with {len(self.index)} memories")
+
+    def shutdown(self) -> None:
+        super().shutdown()
+        self.summaries.put_nowait(None)
+        self.logger.info(f"Plugin '{self.name}' shutdown done.")
+
+    def on_summary(self, summary: MemorySummary):
+        self.summaries.put_nowait(summary)
+
+    def store_summary(self, summary: MemorySummary):
+        record = MemoryRecord(summary=summary.summary, entities=summary.entities, topics=summary.topics)
+        vector = self.embed([self.document(record)])[0]
+
+        self.store.add(record, vector)
+        self.index.add(vector)
+        self.logger.info(f"Stored memory {record.id} ({len(self.index)} total)")
+        self.proxy(events.MEMORY_STORED)(record)
+
+    @staticmethod
+    def document(record: MemoryRecord) -> str:
+        parts = [record.summary]
+        if record.entities:
+            parts.append("Entities: " + ", ".join(record.entities))
+        if record.topics:
+            parts.append("Topics: " + ", ".join(record.topics))
+        return "\n".join(parts)
+
+    @service
+    def search(self, text: str, k: int = 5) -> List[MemoryHit]:
+        query = self.embed([text])[0]
+        ids, scores = self.index.search(query, k)
+        hits = []
+        for position, score in zip(ids, scores):
+            record = self.store.get(int(position))
+            if record is not None:
+                hits.append(MemoryHit(record=record, score=float(score)))
+        return hits
+
+    @service
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memories": len(self.index),
+            "approximate": self.index.ivf is not None,
+            "embedding_cache": {"hits": self.embed.hits, "misses": self.embed.misses},
+        }
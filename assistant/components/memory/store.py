@@ -0,0 +1,162 @@
+import hashlib
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel, Field
+
+
+class MemoryRecord(BaseModel):
+    id: UUID = Field(default_factory=uuid4)
+    created_at: datetime = Field(default_factory=datetime.now)
+    summary: str
+    entities: List[str] = Field(default_factory=list)
+    topics: List[str] = Field(default_factory=list)
+
+
+class MemoryHit(BaseModel):
+    record: MemoryRecord
+    score: float
+
+
+def _read_lines(path: str) -> List[Tuple[bytes, int]]:
+    """Newline-terminated lines with the file offset just past each one; a torn last line is left out."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        data = f.read()
+    lines, start = [], 0
+    while (end := data.find(b"\n", start)) != -1:
+        lines.append((data[start:end], end + 1))
+        start = end + 1
+    return lines
+
+
+def _truncate(path: str, size: int):
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        os.truncate(path, size)
+
+
+class AppendOnlyMatrix:
+    """Float32 rows appended to a raw file; the file is the whole on-disk format."""
+
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.dim = dim
+
+    @property
+    def row_size(self) -> int:
+        return self.dim * np.dtype(np.float32).itemsize
+
+    def rows(self) -> int:
+        return os.path.getsize(self.path) // self.row_size if os.path.exists(self.path) else 0
+
+    def truncate(self, rows: int):
+        """Drops everything after `rows`, so the next append starts on a row boundary."""
+        _truncate(self.path, rows * self.row_size)
+
+    def load(self) -> NDArray[np.float32]:
+        if not os.path.exists(self.path):
+            return np.empty((0, self.dim), dtype=np.float32)
+        data = np.fromfile(self.path, dtype=np.float32)
+        rows = len(data) // self.dim
+        # A torn write leaves a partial row at the end; ignore it.
+        return data[: rows * self.dim].reshape(rows, self.dim)
+
+    def append(self, rows: NDArray[np.float32]):
+        with open(self.path, "ab") as f:
+            f.write(np.ascontiguousarray(rows, dtype=np.float32).tobytes())
+
+
+class EmbeddingCache:
+    """Persistent text -> embedding cache so nothing is embedded twice."""
+
+    def __init__(self, location: str, model: str, dim: int, embed: Callable[[List[str]], List[List[float]]]):
+        self.embed_fn = embed
+        self.lock = threading.Lock()
+        key = hashlib.sha1(model.encode()).hexdigest()[:12]
+        self.keys_path = os.path.join(location, f"embedding-cache-{key}.keys")
+        self.matrix = AppendOnlyMatrix(os.path.join(location, f"embedding-cache-{key}.f32"), dim)
+
+        # Vectors are written before their keys: after a torn write, cut both
+        # files to the entries they have in common before anything is appended.
+        lines = _read_lines(self.keys_path)
+        size = min(len(lines), self.matrix.rows())
+        _truncate(self.keys_path, lines[size - 1][1] if size else 0)
+        self.matrix.truncate(size)
+
+        keys = [line.decode() for line, _ in lines[:size]]
+        vectors = self.matrix.load()
+        self.entries: Dict[str, NDArray[np.float32]] = dict(zip(keys, vectors))
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def __call__(self, texts: List[str]) -> NDArray[np.float32]:
+        keys = [self.key(t) for t in texts]
+        with self.lock:
+            missing = list(dict.fromkeys(k for k in keys if k not in self.entries))
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            by_key = dict(zip(keys, texts))
+            vectors = np.asarray(self.embed_fn([by_key[k] for k in missing]), dtype=np.float32)
+            with self.lock:
+                self.matrix.append(vectors)
+                with open(self.keys_path, "a") as f:
+                    f.write("".join(f"{k}\n" for k in missing))
+                self.entries.update(zip(missing, vectors))
+
+        with self.lock:
+            return np.stack([self.entries[k] for k in keys])
+
+
+class MemoryStore:
+    """Append-only memory records with their embedding rows, aligned by position."""
+
+    def __init__(self, location: str, dim: int):
+        os.makedirs(location, exist_ok=True)
+        self.records_path = os.path.join(location, "memories.jsonl")
+        self.matrix = AppendOnlyMatrix(os.path.join(location, "memories.f32"), dim)
+        self.lock = threading.Lock()
+        self.records: List[MemoryRecord] = []
+
+        ends: List[int] = []
+        for line, end in _read_lines(self.records_path):
+            if not line.strip():
+                continue
+            try:
+                self.records.append(MemoryRecord.model_validate_json(line))
+            except ValueError:
+                break
+            ends.append(end)
+
+        # Records are written after vectors, so the shorter of the two is consistent.
+        # Cut both files to it, otherwise the next append would pair a record with
+        # an orphan vector.
+        size = min(len(self.records), self.matrix.rows())
+        self.records = self.records[:size]
+        _truncate(self.records_path, ends[size - 1] if size else 0)
+        self.matrix.truncate(size)
+
+    def load_vectors(self) -> NDArray[np.float32]:
+        return self.matrix.load()[: len(self.records)]
+
+    def add(self, record: MemoryRecord, vector: NDArray[np.float32]):
+        with self.lock:
+            self.matrix.append(vector.reshape(1, -1))
+            with open(self.records_path, "a") as f:
+                f.write(record.model_dump_json() + "\n")
+            self.records.append(record)
+
+    def get(self, position: int) -> Optional[MemoryRecord]:
+        with self.lock:
+            return self.records[position] if position < len(self.records) else None
@@ -0,0 +1,181 @@
+import logging
+import threading
+from queue import Queue
+from time import sleep
+from typing import Callable, Optional
+
+import reactivex as rx
+from pydantic import BaseModel, field_validator
+from pymumble_py3 import Mumble
+from pymumble_py3.callbacks import (
+    PYMUMBLE_CLBK_CONNECTED,
+    PYMUMBLE_CLBK_DISCONNECTED,
+    PYMUMBLE_CLBK_SOUNDRECEIVED,
+    PYMUMBLE_CLBK_USERREMOVED,
+    PYMUMBLE_CLBK_USERUPDATED,
+)
+from pymumble_py3.channels import Channel
+from pymumble_py3.constants import PYMUMBLE_SAMPLERATE
+from pymumble_py3.soundqueue import SoundChunk
+from pymumble_py3.users import User
+from reactivex import operators as ops
+from reactivex.abc import DisposableBase
+from reactivex.scheduler import EventLoopScheduler
+
+from assistant.config import ASSISTANT_NAME
+from assistant.utils import chop_audio, observe
+
+from . import events
+from .types import DEFAULT_CONNECTION, Sentence
+
+
+class ConnectionConfig(BaseModel):
+    name: str = DEFAULT_CONNECTION
+    host: str = "127.0.0.1"
+    port: int = 64738
+    password: str = ""
+    channel: Optional[str] = None
+    user: str = ASSISTANT_NAME
+
+    @field_validator("name")
+    @classmethod
+    def plain_name(cls, name: str) -> str:
+        if not name or "/" in name:
+            raise ValueError(f"Connection name '{name}' must be non-empty and must not contain '/'")
+        return name
+
+
+class MumbleConnection:
+    """One client in one channel, with its own playback queue.
+
+    Received audio and user departures are handed to the owning `MumbleInterface`
+    tagged with the connection name, `emit(event)` returns the interface's proxy.
+    """
+
+    def __init__(
+        self,
+        config: ConnectionConfig,
+        on_sound: Callable[[str, str, bytes], None],
+        on_user_removed: Callable[[str, str], None],
+        emit: Callable[[str], Callable],
+        logger: logging.Logger,
+    ):
+        self.config = config
+        self.name = config.name
+        self.on_sound = on_sound
+        self.on_user_removed = on_user_removed
+        self.emit = emit
+        self.logger = logger
+
+        self.client = Mumble(host=config.host, port=config.port, password=config.password, user=config.user)
+        self.client.name = f"pymumble-{self.name}"
+
+        self.playback_queue = Queue()
+        observe(self.playback_queue, self.on_play_from_queue, name=f"mumble-playback-{self.name}")
+        # Paces playback frames from one named thread, the default scheduler starts a timer thread per frame.
+        self.playback_clock = EventLoopScheduler(
+            thread_factory=lambda target: threading.Thread(
+                target=target, name=f"mumble-playback-clock-{self.name}", daemon=True
+            )
+        )
+
+        self.is_interrupted = threading.Event()
+        self.is_playback_done = threading.Event()
+        self.is_playback_in_progress = threading.Event()
+        self.playback: Optional[DisposableBase] = None
+
+    def start(self) -> "MumbleConnection":
+        self.client.callbacks.set_callback(PYMUMBLE_CLBK_SOUNDRECEIVED, self.on_sound_from_source)
+        self.client.callbacks.set_callback(
+            PYMUMBLE_CLBK_CONNECTED, lambda: self.emit(events.MUMBLE_CLIENT_CONNECTED)(self.name)
+        )
+        self.client.callbacks.set_callback(PYMUMBLE_CLBK_USERUPDATED, self.on_user_updated)
+        self.client.callbacks.set_callback(PYMUMBLE_CLBK_USERREMOVED, self.on_user_left)
+        self.client.callbacks.set_callback(
+            PYMUMBLE_CLBK_DISCONNECTED, lambda: self.emit(events.MUMBLE_CLIENT_DISCONNECTED)(self.name)
+        )
+        self.client.set_receive_sound(True)
+        self.client.start()
+        self.logger.info(f"Connection '{self.name}' connecting to server: '{self.config.host}:{self.config.port}'")
+        self.client.is_ready()  # waits connection
+
+        if self.config.channel:
+            if channel := self.client.channels.find_by_name(self.config.channel):
+                channel: Channel = channel
+                channel.move_in()
+                # NOTE: Need to wait a bit before getting list of users on channel.
+                sleep(1)
+        return self
+
+    def stop(self):
+        self.logger.info(f"Connection '{self.name}' disconnecting from server.")
+        self.client.stop()
+        self.playback_clock.dispose()
+
+    def on_user_updated(self, session, attributes):
+        self.logger.info(f"[{self.name}] on_user_updated({session}, {attributes})")
+
+    def on_user_left(self, user: User, message):
+        if username := user.get("name"):
+            self.on_user_removed(self.name, username)
+
+    def on_sound_from_source(self, source: dict, chunk: SoundChunk):
+        username = source.get("name", None)
+        assert username is not None
+        if username == self.config.user:
+            return
+        self.on_sound(self.name, username, chunk.pcm)
+
+    def on_play(self, sentence: Sentence):
+        self.logger.info(f"[{self.name}] > on_play('{sentence.text}')")
+        self.playback_queue.put(sentence)
+
+    def interrupt(self) -> bool:
+        """Stops the sentence being played and drops the queued ones. Returns False if nothing was playing."""
+        if not self.is_playback_in_progress.is_set() or self.is_interrupted.is_set():
+            return False
+        self.is_interrupted.set()
+        # Disposing runs the playback's finally action, which emits the interrupt.
+        if (playback := self.playback) is not None:
+            playback.dispose()
+        self.client.sound_output.clear_buffer()
+        return True
+
+    def on_play_from_queue(self, sentence: Sentence):
+        self.is_playback_done.clear()
+        self.is_playback_in_progress.set()
+
+        def on_interrupt():
+            if self.is_interrupted.is_set():
+                self.emit(events.MUMBLE_PLAYBACK_INTERRUPT)(self.name)
+                while not self.playback_queue.empty():
+                    self.playback_queue.get()
+                    self.playback_queue.task_done()
+
+                self.is_interrupted.clear()
+                self.is_playback_in_progress.clear()
+                self.is_playback_done.set()
+
+        def on_playback_complete():
+            self.is_playback_in_progress.clear()
+            self.is_playback_done.set()
+            self.emit(events.MUMBLE_PLAYBACK_DONE)(self.name)
+
+        self.playback = (
+            rx.zip(
+                rx.interval(0.020, scheduler=self.playback_clock),
+                rx.from_iterable(chop_audio(sentence.audio, PYMUMBLE_SAMPLERATE, 20)),
+            )
+            .pipe(
+                ops.map(lambda x: x[1].tobytes()),
+                ops.do_action(self.client.sound_output.add_sound),
+                ops.finally_action(on_interrupt),
+            )
+            .subscribe(on_completed=on_playback_complete)
+        )
+        if self.is_interrupted.is_set():
+            # Interrupted before the subscription could be disposed.
+            self.playback.dispose()
+
+        self.is_playback_done.wait()
+        self.playback = None
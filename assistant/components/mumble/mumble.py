@@ -1,52 +1,19 @@
-import threading
-from datetime import datetime
-from functools import partial
-from queue import Queue
-from time import sleep
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
 
 import numpy as np
-import reactivex as rx
-from numpy.typing import NDArray
-from pydantic import BaseModel, Field
-from pymumble_py3 import Mumble
-from pymumble_py3.callbacks import (
-    PYMUMBLE_CLBK_CONNECTED,
-    PYMUMBLE_CLBK_DISCONNECTED,
-    PYMUMBLE_CLBK_SOUNDRECEIVED,
-    PYMUMBLE_CLBK_USERUPDATED,
-)
-from pymumble_py3.channels import Channel
 from pymumble_py3.constants import PYMUMBLE_SAMPLERATE
-from pymumble_py3.soundqueue import SoundChunk
-from pymumble_py3.users import User
-from reactivex import operators as ops
-
-from assistant.config import (
-    ASSISTANT_NAME,
-    SPEECH_PIPELINE_SAMPLERATE,
-)
+
 from assistant.core import service
-from assistant.utils import observe
+from assistant.utils import DispatchConfig, SourceDispatcher
+from assistant.utils.audio import VadConfig
 from assistant.core.component import Component
-from assistant.utils.audio import VadFilter
-from assistant.utils.audio.reshape import FixedLengthAudioChunker
 from . import events
+from .connection import ConnectionConfig, MumbleConnection
+from .speakers import SpeakerRegistry, SpeakersConfig
+from .types import DEFAULT_CONNECTION, Sentence, SpeechSegment
 
-
-class Sentence(BaseModel):
-    text: str
-    audio: Any
-    length: float
-
-
-class SpeechSegment(BaseModel):
-    source: str
-    data: NDArray[np.int16] = Field(repr=False)
-    timestamp: datetime = Field(default_factory=datetime.now)
-
-    class Config:
-        arbitrary_types_allowed = True
+__all__ = ["DEFAULT_CONNECTION", "MumbleInterface", "Sentence", "SpeechSegment"]
 
 
 class MumbleInterface(Component):
@@ -67,157 +34,119 @@ class MumbleInterface(Component):
             events.MUMBLE_PLAYBACK_INTERRUPT,
         ]
 
+    def connection_configs(self) -> List[ConnectionConfig]:
+        """`servers` lists one entry per channel, a lone `server` is the "default" connection."""
+        servers = self.get_config("servers", None)
+        if servers is None:
+            return [ConnectionConfig.model_validate(self.get_config("server", {}))]
+
+        configs = [ConnectionConfig.model_validate(server) for server in servers]
+        names = [config.name for config in configs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Connection names must be unique, got {names}")
+        return configs
+
     def initialize(self) -> None:
         super().initialize()
         self.logger.setLevel(self.get_config("log_level", "DEBUG"))
-        mumble_server = self.get_config("server", {})
-        mumble_host = mumble_server.get("host", "127.0.0.1")
-        mumble_port = mumble_server.get("port", 64738)
-        mumble_password = mumble_server.get("password", "")
-        mumble_channel = mumble_server.get("channel", None)
-
-        # TODO: Get or create
-        self.client = Mumble(
-            host=mumble_host,
-            port=mumble_port,
-            password=mumble_password,
-            user=ASSISTANT_NAME,
-        )
-
-        self.playback_queue = Queue()
-        sub = observe(self.playback_queue, self.on_play_from_queue)
-
-        self.is_interrupted = threading.Event()
-        self.is_playback_done = threading.Event()
-        self.is_playback_in_progress = threading.Event()
-
-        self.fixed_chunker_for_source: Dict[str, FixedLengthAudioChunker] = {}
-        self.speech_filter_for_source: Dict[str, VadFilter] = {}
-
-        self.client.callbacks.set_callback(
-            PYMUMBLE_CLBK_SOUNDRECEIVED, self.on_sound_from_source
-        )
-        self.client.callbacks.set_callback(
-            PYMUMBLE_CLBK_CONNECTED,
-            self.proxy(events.MUMBLE_CLIENT_CONNECTED),
-        )
-        self.client.callbacks.set_callback(
-            PYMUMBLE_CLBK_USERUPDATED, self.on_user_updated
-        )
-
-        self.client.callbacks.set_callback(
-            PYMUMBLE_CLBK_DISCONNECTED,
-            self.proxy(events.MUMBLE_CLIENT_DISCONNECTED),
-        )
-        self.client.set_receive_sound(True)
-        self.client.start()
-        self.logger.info(
-            f"Plugin '{self.name}' connecting to server: '{mumble_host}:{mumble_port}'"
-        )
-        self.client.is_ready()  # waits connection
-
-        if mumble_channel:
-            if channel := self.client.channels.find_by_name(mumble_channel):
-                channel: Channel = channel
-                channel.move_in()
-                # NOTE: Need to wait a bit before getting list of users on channel.
-                sleep(1)
-
-        for session in self.client.my_channel().get_users():
-            user: User = self.client.users[session["session"]]
-            self.add_speech_filter(user)
-
-        # self.event_bus.subscribe(events.MUMBLE_AUDIO_PLAY, self.on_play)
-        self.logger.info(f"Plugin '{self.name}' initialized and ready")
-
-    def add_speech_filter(self, source: User):
-        username = source.get_property("name")
-        assert username is not None
-
-        if username == ASSISTANT_NAME:
-            self.logger.info(f"Ignored source '{username}', because its assistant.")
-            return False
-
-        if username not in self.speech_filter_for_source:
-            self.speech_filter_for_source[username] = VadFilter(
-                partial(self.on_speech, source),
-            )
-
-        if username not in self.fixed_chunker_for_source:
-            self.fixed_chunker_for_source[username] = FixedLengthAudioChunker(
-                callback=lambda chunk: self.speech_filter_for_source[username](chunk),
-                target_chunk_length_ms=32,
-                source_samplerate=PYMUMBLE_SAMPLERATE,
-                target_samplerate=SPEECH_PIPELINE_SAMPLERATE,
-            )
+        self.start_processing()
+
+        self.connections = {
+            config.name: MumbleConnection(config, self.on_sound, self.on_user_removed, self.proxy, self.logger)
+            for config in self.connection_configs()
+        }
+        # Connecting waits for the server and the channel move, do it for all at once.
+        with ThreadPoolExecutor(max_workers=len(self.connections), thread_name_prefix="mumble-connect") as executor:
+            list(executor.map(MumbleConnection.start, self.connections.values()))
+
+        self.logger.info(f"Plugin '{self.name}' initialized and ready, connections: {list(self.connections)}")
+
+    def start_processing(self):
+        """Sets up received audio processing without connecting, e.g. to replay recorded sessions."""
+        self.connections: Dict[str, MumbleConnection] = {}
+
+        # Shared by all connections, keyed by "<connection>/<username>".
+        # pymumble calls back on its network thread, which also sends keep-alives and
+        # receives everyone else's packets. It only enqueues, the rest runs on workers.
+        self.dispatcher = SourceDispatcher(
+            self.process_sound,
+            DispatchConfig.model_validate(self.get_config("dispatch", {})),
+            name="mumble-audio",
+        ).start()
+        self.speakers = SpeakerRegistry(
+            self.on_speech,
+            source_samplerate=PYMUMBLE_SAMPLERATE,
+            config=SpeakersConfig.model_validate(self.get_config("speakers", {})),
+            can_evict=self.dispatcher.forget,
+            vad=VadConfig.model_validate(self.get_config("vad", {})),
+            on_speech_start=self.on_speech_start,
+        ).start()
+
+    def apply_config(self, previous: Dict[str, Any]) -> None:
+        dispatch = DispatchConfig.model_validate(self.get_config("dispatch", {}))
+        speakers = SpeakersConfig.model_validate(self.get_config("speakers", {}))
+        vad = VadConfig.model_validate(self.get_config("vad", {}))
+        if not hasattr(self, "dispatcher"):
+            return
+
+        self.logger.setLevel(self.get_config("log_level", "DEBUG"))
+        self.dispatcher.reconfigure(dispatch)
+        self.speakers.reconfigure(speakers, vad)
+        for key in ("server", "servers"):
+            if self.get_config(key) != previous.get(key):
+                self.logger.warning(f"Changes to '{key}' take effect on restart.")
 
     def shutdown(self) -> None:
         super().shutdown()
-        self.logger.info(f"Plugin '{self.name}' disconnection from server.")
-        self.client.stop()
+        for connection in self.connections.values():
+            connection.stop()
+        self.dispatcher.shutdown()
+        self.speakers.shutdown()
 
-    def on_user_updated(self, session, attributes):
-        self.logger.info(f"on_user_updated({session}, {attributes})")
-        my_channel = self.client.my_channel().get("channel_id")
+    @staticmethod
+    def speaker_key(connection: str, username: str) -> str:
+        return f"{connection}/{username}"
 
-        if my_channel == session.get("channel_id"):
-            user: User = self.client.users[session["session"]]
-            self.add_speech_filter(user)
+    def on_user_removed(self, connection: str, username: str):
+        # Left the server; an idle sweep catches it if audio is still queued.
+        self.speakers.evict(self.speaker_key(connection, username))
 
-    def on_sound_from_source(self, source: dict, chunk: SoundChunk):
-        username = source.get("name", None)
-        assert username is not None
-        self.fixed_chunker_for_source[username](chunk.pcm)
+    def on_sound(self, connection: str, username: str, pcm: bytes):
+        key = self.speaker_key(connection, username)
+        if not self.dispatcher.submit(key, pcm):
+            self.logger.debug(f"Audio queue of '{key}' is full, dropped oldest chunk.")
 
-    def on_speech(self, user: User, speech: bytes):
-        self.logger.info(f"{type(speech)}, {user}")
-        username = str(user.get_property("name"))
+    def process_sound(self, key: str, pcm: bytes):
+        self.speakers.process(key, pcm)
+
+    @service
+    def audio_stats(self) -> Dict[str, Any]:
+        return {"sources": self.dispatcher.stats(), "speakers": self.speakers.stats()}
+
+    def on_speech_start(self, key: str):
+        """Barge-in: someone starting to talk stops the assistant's playback on that connection."""
+        if not self.get_config("interrupt_on_speech", True):
+            return
+        connection, _, username = key.partition("/")
+        if (target := self.connections.get(connection)) is not None and target.interrupt():
+            self.logger.info(f"Playback on '{connection}' interrupted by '{username}'")
+
+    def on_speech(self, key: str, speech: bytes):
+        # Connection names never contain '/', usernames may.
+        connection, _, username = key.partition("/")
+        self.logger.info(f"Speech from '{username}' on '{connection}', {len(speech)} bytes")
 
         buffer = np.frombuffer(speech, dtype=np.int16)
-        segment = SpeechSegment(source=username, data=buffer)
+        segment = SpeechSegment(source=username, data=buffer, connection=connection)
 
         self.proxy(events.MUMBLE_AUDIO_SPEECH)(segment)
 
     def on_play(self, sentence: Sentence):
-        self.logger.info(f"> on_play('{sentence.text}')")
-        self.playback_queue.put(sentence)
+        if (connection := self.connections.get(sentence.connection)) is None:
+            self.logger.warning(f"Dropped '{sentence.text}' for unknown connection '{sentence.connection}'")
+            return
+        connection.on_play(sentence)
 
     @service
     async def play_audio(self, sentence: Sentence):
         pass
-
-    def on_play_from_queue(self, sentence: Sentence):
-        self.is_playback_done.clear()
-        self.is_playback_in_progress.set()
-
-        def on_interrupt():
-            if self.is_interrupted.is_set():
-                self.proxy(events.MUMBLE_PLAYBACK_INTERRUPT)()
-                while not self.playback_queue.empty():
-                    self.playback_queue.get()
-                    self.playback_queue.task_done()
-
-                self.is_interrupted.clear()
-                self.is_playback_in_progress.clear()
-                self.is_playback_done.set()
-
-        def on_playback_complete():
-            self.is_playback_in_progress.clear()
-            self.is_playback_done.set()
-            self.proxy(events.MUMBLE_PLAYBACK_DONE)()
-
-        _ = (
-            rx.zip(
-                rx.interval(0.020),
-                rx.from_iterable(chop_audio(sentence.audio, PYMUMBLE_SAMPLERATE, 20)),
-            )
-            .pipe(
-                ops.map(lambda x: x[1].tobytes()),
-                ops.do_action(self.client.sound_output.add_sound),
-                ops.finally_action(on_interrupt),
-            )
-            .subscribe(on_completed=on_playback_complete)
-        )
-
-        # self.event_bus.publish(events.MUMBLE_PLAYBACK_IN_PROGRESS, sentence)
-        self.is_playback_done.wait()
@@ -0,0 +1,144 @@
+import logging
+import threading
+from time import monotonic
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from assistant.config import SPEECH_PIPELINE_SAMPLERATE
+from assistant.utils.audio import VadConfig, VadFilter, VadPool
+from assistant.utils.audio.reshape import FixedLengthAudioChunker
+
+logger = logging.getLogger(__name__)
+
+
+class SpeakersConfig(BaseModel):
+    idle_timeout: float = Field(default=120.0, gt=0, description="Seconds without audio before a speaker is evicted")
+    sweep_interval: float = Field(default=10.0, gt=0)
+    max_idle_vads: int = Field(default=8, ge=0, description="Released VAD models kept for reuse")
+
+
+class SpeakerState:
+    def __init__(self, chunker: FixedLengthAudioChunker, speech_filter: VadFilter):
+        self.chunker = chunker
+        self.speech_filter = speech_filter
+        self.last_heard = monotonic()
+
+
+class SpeakerRegistry:
+    """Audio processing state per speaker, created on first audio and evicted when idle.
+
+    `can_evict(source)` is asked before a speaker is dropped, so state that still has
+    audio queued somewhere is kept. Speech in progress is flushed on eviction, since a
+    speaker who stops transmitting never sends the silence that would end it.
+    """
+
+    def __init__(
+        self,
+        on_speech: Callable[[str, bytes], None],
+        source_samplerate: int,
+        config: SpeakersConfig,
+        can_evict: Callable[[str], bool] = lambda source: True,
+        pool: Optional[VadPool] = None,
+        vad: Optional[VadConfig] = None,
+        on_speech_start: Optional[Callable[[str], None]] = None,
+    ):
+        self.on_speech = on_speech
+        self.on_speech_start = on_speech_start
+        self.source_samplerate = source_samplerate
+        self.config = config
+        self.vad = vad or VadConfig()
+        self.can_evict = can_evict
+        self.pool = pool or VadPool(max_idle=config.max_idle_vads)
+        self.lock = threading.Lock()
+        self.speakers: Dict[str, SpeakerState] = {}
+        self.evicted = 0
+        self._stopped = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def start(self) -> "SpeakerRegistry":
+        self._sweeper = threading.Thread(target=self._sweep_periodically, name="mumble-speakers-sweep", daemon=True)
+        self._sweeper.start()
+        return self
+
+    def shutdown(self):
+        self._stopped.set()
+        with self.lock:
+            for source in list(self.speakers):
+                self._evict(source)
+
+    def process(self, source: str, pcm: bytes):
+        with self.lock:
+            state = self.speakers.get(source)
+            if state is None:
+                state = self.speakers[source] = self._create(source)
+                logger.debug(f"Created audio state for '{source}', {len(self.speakers)} speakers active.")
+            state.last_heard = monotonic()
+        state.chunker(pcm)
+
+    def _create(self, source: str) -> SpeakerState:
+        on_start = self.on_speech_start
+        speech_filter = VadFilter(
+            lambda speech: self.on_speech(source, speech),
+            vad=self.pool.acquire(),
+            config=self.vad,
+            on_start=(lambda: on_start(source)) if on_start else None,
+        )
+        chunker = FixedLengthAudioChunker(
+            callback=speech_filter,
+            target_chunk_length_ms=32,
+            source_samplerate=self.source_samplerate,
+            target_samplerate=SPEECH_PIPELINE_SAMPLERATE,
+        )
+        return SpeakerState(chunker, speech_filter)
+
+    def reconfigure(self, config: SpeakersConfig, vad: VadConfig):
+        """Active speakers' filters pick up `vad` on their next chunk.
+
+        A new sweep interval applies after the current wait.
+        """
+        with self.lock:
+            self.config = config
+            self.pool.max_idle = config.max_idle_vads
+            if vad != self.vad:
+                self.vad = vad
+                for state in self.speakers.values():
+                    state.speech_filter.config = vad
+
+    def _evict(self, source: str):
+        state = self.speakers.pop(source)
+        state.speech_filter.flush()
+        self.pool.release(state.speech_filter.vad)
+        self.evicted += 1
+
+    def evict(self, source: str) -> bool:
+        """Evicts `source` now, e.g. when it left the channel. Returns False if it is still busy."""
+        with self.lock:
+            if source not in self.speakers or not self.can_evict(source):
+                return False
+            self._evict(source)
+        logger.debug(f"Evicted audio state for '{source}'.")
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> List[str]:
+        now = monotonic() if now is None else now
+        evicted = []
+        with self.lock:
+            for source, state in list(self.speakers.items()):
+                if now - state.last_heard >= self.config.idle_timeout and self.can_evict(source):
+                    self._evict(source)
+                    evicted.append(source)
+        if evicted:
+            logger.debug(f"Evicted idle audio state for {evicted}.")
+        return evicted
+
+    def _sweep_periodically(self):
+        while not self._stopped.wait(self.config.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.exception(f"Sweeping idle speakers failed: {e}")
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"active": len(self.speakers), "evicted": self.evicted, "vad": self.pool.stats()}
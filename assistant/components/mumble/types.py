@@ -0,0 +1,77 @@
+import struct
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+import numpy as np
+from numpy.typing import NDArray
+
+from assistant.utils.payload import Buffer, decode, encode, from_micros, to_micros
+
+# Name of the connection configured with the single `server` entry.
+DEFAULT_CONNECTION = "default"
+
+# Event payloads on the audio hot path are plain slotted dataclasses: built for every
+# utterance, never validated, and encoded as a small header plus the raw int16 buffer.
+# Compared by identity, since the audio arrays have no single truth value.
+
+
+@dataclass(slots=True, kw_only=True, eq=False)
+class Sentence:
+    text: str
+    audio: Optional[NDArray[np.int16]] = field(repr=False)
+    length: float
+    connection: str = DEFAULT_CONNECTION
+
+    MAGIC = b"SENT"
+    FIXED = struct.Struct("<d")
+
+    def to_buffers(self) -> List[memoryview]:
+        return encode(self.MAGIC, self.FIXED, (self.length,), (self.text, self.connection), self.audio)
+
+    def to_bytes(self) -> bytes:
+        return b"".join(self.to_buffers())
+
+    @classmethod
+    def from_bytes(cls, buffer: Buffer) -> "Sentence":
+        (length,), (text, connection), audio = decode(buffer, cls.MAGIC, cls.FIXED)
+        return cls(text=text, audio=audio, length=length, connection=connection)
+
+
+@dataclass(slots=True, kw_only=True, eq=False)
+class SpeechSegment:
+    source: str
+    data: NDArray[np.int16] = field(repr=False)
+    timestamp: datetime = field(default_factory=datetime.now)
+    connection: str = DEFAULT_CONNECTION
+    # Stable reference to the utterance, e.g. to join recordings with their transcripts.
+    id: UUID = field(default_factory=uuid4)
+
+    MAGIC = b"SSEG"
+    # id, timestamp as microseconds since the (naive) epoch
+    FIXED = struct.Struct("<16sq")
+
+    @property
+    def speaker(self) -> str:
+        """Unique across connections, the same name in two channels is two speakers."""
+        return self.source if self.connection == DEFAULT_CONNECTION else f"{self.connection}/{self.source}"
+
+    def to_buffers(self) -> List[memoryview]:
+        values = (self.id.bytes, to_micros(self.timestamp))
+        return encode(self.MAGIC, self.FIXED, values, (self.source, self.connection), self.data)
+
+    def to_bytes(self) -> bytes:
+        return b"".join(self.to_buffers())
+
+    @classmethod
+    def from_bytes(cls, buffer: Buffer) -> "SpeechSegment":
+        """The decoded `data` is a read-only view into `buffer`."""
+        (id, micros), (source, connection), data = decode(buffer, cls.MAGIC, cls.FIXED)
+        return cls(
+            source=source,
+            data=data if data is not None else np.zeros(0, dtype=np.int16),
+            timestamp=from_micros(micros),
+            connection=connection,
+            id=UUID(bytes=id),
+        )
@@ -0,0 +1 @@
+PROFILER_PROFILE_DONE = "profiler.profile.done"
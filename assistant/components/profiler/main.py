@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from assistant.core import service
+from assistant.core.component import Component
+from assistant.utils.profiling import ProfileFormat, SamplingProfiler, cpu_usage, thread_cpu_times
+from . import events
+
+EXTENSIONS = {ProfileFormat.COLLAPSED: "folded", ProfileFormat.SVG: "svg"}
+
+
+class ProfilerConfig(BaseModel):
+    location: str = "/tmp/assistant-profiles"
+    interval: float = Field(default=0.01, gt=0, description="Seconds between stack samples")
+    max_duration: float = Field(default=300.0, gt=0)
+    format: ProfileFormat = ProfileFormat.COLLAPSED
+
+
+class Profiler(Component):
+    """On-demand sampling profiler and per-thread CPU accounting for the running process.
+
+    Nothing runs until `start_profile` is called, the profile is written to
+    `location` when its duration is up or on `stop_profile`.
+    """
+
+    @property
+    def version(self) -> str:
+        return "0.0.1"
+
+    @property
+    def events(self) -> List[str]:
+        return [events.PROFILER_PROFILE_DONE]
+
+    def initialize(self) -> None:
+        super().initialize()
+        self.logger.setLevel(self.get_config("log_level", "INFO"))
+        self.profiler_config = ProfilerConfig.model_validate(self.config)
+        self.lock = threading.Lock()
+        self.profiler: Optional[SamplingProfiler] = None
+        self.format = self.profiler_config.format
+        self.timer: Optional[threading.Timer] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.logger.info(f"Plugin '{self.name}' initialized and ready")
+
+    def shutdown(self) -> None:
+        super().shutdown()
+        if self.profiler is not None:
+            self.stop_profile()
+        self.logger.info(f"Plugin '{self.name}' shutdown done.")
+
+    def apply_config(self, previous: Dict[str, Any]) -> None:
+        config = ProfilerConfig.model_validate(self.config)
+        if hasattr(self, "profiler_config"):
+            # Used from the next profile on.
+            self.profiler_config = config
+
+    @service
+    def start_profile(
+        self,
+        duration: float = 30.0,
+        format: Optional[ProfileFormat] = None,
+        interval: Optional[float] = None,
+        idle: bool = False,
+    ) -> Dict[str, Any]:
+        """Samples all threads for `duration` seconds, then writes collapsed stacks or an SVG flame graph."""
+        config = self.profiler_config
+        if not 0 < duration <= config.max_duration:
+            raise ValueError(f"Profile duration must be in (0, {config.max_duration}] seconds")
+
+        with self.lock:
+            if self.profiler is not None:
+                raise RuntimeError("A profile is already running")
+            self.format = ProfileFormat(format or config.format)
+            profiler = self.profiler = SamplingProfiler(interval=interval or config.interval, idle=idle).start()
+            self.timer = threading.Timer(duration, self.stop_profile)
+            self.timer.name = "profiler-timer"
+            self.timer.daemon = True
+            self.timer.start()
+
+        self.logger.info(f"Profiling for {duration}s every {profiler.interval * 1000:.0f}ms")
+        return {"duration": duration, "interval": profiler.interval, "format": self.format.value}
+
+    @service
+    def stop_profile(self) -> Optional[Dict[str, Any]]:
+        """Stops the running profile early and writes it. Returns its report, or None if none was running."""
+        with self.lock:
+            profiler, self.profiler = self.profiler, None
+            if profiler is None:
+                return None
+            format = self.format
+            if self.timer is not None:
+                self.timer.cancel()
+
+        profile = profiler.stop()
+        os.makedirs(self.profiler_config.location, exist_ok=True)
+        name = f"profile-{datetime.now():%Y%m%d-%H%M%S}.{EXTENSIONS[format]}"
+        path = os.path.join(self.profiler_config.location, name)
+        profile.write(path, format)
+
+        self.last_report = {
+            "path": path,
+            "samples": profile.samples,
+            "duration": profile.duration,
+            "by_thread": profile.by_thread(),
+            "threads": profile.threads,
+        }
+        self.logger.info(f"Wrote {profile.samples} samples over {profile.duration:.1f}s to '{path}'")
+        self.proxy(events.PROFILER_PROFILE_DONE)(self.last_report)
+        return self.last_report
+
+    @service
+    def profile_status(self) -> Dict[str, Any]:
+        with self.lock:
+            profiler = self.profiler
+        return {
+            "running": profiler is not None,
+            "samples": profiler.samples if profiler is not None else 0,
+            "last": self.last_report,
+        }
+
+    @service
+    def thread_cpu(self, window: float = 1.0) -> List[Dict[str, Any]]:
+        """CPU seconds and percent of one core per thread over the next `window` seconds, busiest first."""
+        before = thread_cpu_times()
+        started_at = time.monotonic()
+        time.sleep(window)
+        return cpu_usage(before, thread_cpu_times(), time.monotonic() - started_at)
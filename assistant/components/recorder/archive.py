@@ -0,0 +1,199 @@
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+from uuid import UUID
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from assistant.components.mumble.mumble import SpeechSegment
+
+logger = logging.getLogger(__name__)
+
+# One fixed-size record per segment, so the index can be memory-mapped and filtered in bulk.
+INDEX_DTYPE = np.dtype(
+    [
+        ("speaker", "<u4"),
+        ("timestamp", "<f8"),
+        ("file", "<u4"),
+        ("offset", "<u8"),
+        ("length", "<u4"),
+        ("id", "V16"),
+    ]
+)
+
+INDEX_FILE = "index.bin"
+SPEAKERS_FILE = "speakers.txt"
+
+
+class ArchiveConfig(BaseModel):
+    max_file_size: int = Field(default=256 * 1024 * 1024, ge=1, description="Bytes per audio file before rolling over")
+
+
+class ArchiveEntry(BaseModel):
+    id: UUID
+    speaker: str
+    timestamp: datetime
+    file: int
+    offset: int
+    length: int
+
+
+def _epoch(value: Union[datetime, float, None]) -> Optional[float]:
+    return value.timestamp() if isinstance(value, datetime) else value
+
+
+class Archive:
+    """Append-only store of speech segments in a few large files.
+
+    Audio is raw int16 PCM appended to `audio-NNNNNN.pcm` files, which roll over at
+    `max_file_size`. Every segment gets one `INDEX_DTYPE` record in `index.bin`, with
+    speakers numbered in `speakers.txt`. Audio is written before its index record, so
+    a crash leaves at most unreferenced audio and a partial record, dropped on open.
+    """
+
+    def __init__(self, location: str, config: Optional[ArchiveConfig] = None):
+        self.location = location
+        self.config = config or ArchiveConfig()
+        os.makedirs(location, exist_ok=True)
+        self.lock = threading.Lock()
+
+        self.speakers: List[str] = []
+        self.speaker_ids: Dict[str, int] = {}
+        speakers_path = os.path.join(location, SPEAKERS_FILE)
+        if os.path.exists(speakers_path):
+            with open(speakers_path, encoding="utf-8") as f:
+                for name in f.read().split("\n")[:-1]:
+                    self._remember(name)
+        self.speakers_file = open(speakers_path, "a", encoding="utf-8")
+
+        index_path = os.path.join(location, INDEX_FILE)
+        self.index_file = open(index_path, "ab")
+        size = self.index_file.tell()
+        if size % INDEX_DTYPE.itemsize:
+            logger.warning(f"Dropping partial index record at the end of '{index_path}'")
+            self.index_file.truncate(size - size % INDEX_DTYPE.itemsize)
+        # In-memory copy of the index, grown by doubling so appends stay cheap.
+        loaded = np.fromfile(index_path, dtype=INDEX_DTYPE)
+        self.count = len(loaded)
+        self._records = np.zeros(max(1024, 2 * self.count), dtype=INDEX_DTYPE)
+        self._records[: self.count] = loaded
+
+        self.file_number = int(loaded["file"].max()) if self.count else 0
+        self.audio_file = open(self._audio_path(self.file_number), "ab")
+        self._maps: Dict[int, np.memmap] = {}
+
+    def _audio_path(self, number: int) -> str:
+        return os.path.join(self.location, f"audio-{number:06d}.pcm")
+
+    def _remember(self, name: str) -> int:
+        self.speaker_ids[name] = len(self.speakers)
+        self.speakers.append(name)
+        return self.speaker_ids[name]
+
+    def append(self, segment: SpeechSegment, speaker: Optional[str] = None) -> ArchiveEntry:
+        """Appends the audio of `segment`. Not durable until `sync`."""
+        speaker = speaker or segment.speaker
+        data = np.ascontiguousarray(segment.data, dtype="<i2")
+        with self.lock:
+            if speaker not in self.speaker_ids:
+                if "\n" in speaker:
+                    raise ValueError(f"Speaker name must be a single line: {speaker!r}")
+                self._remember(speaker)
+                self.speakers_file.write(f"{speaker}\n")
+                self.speakers_file.flush()
+
+            if self.audio_file.tell() and self.audio_file.tell() + data.nbytes > self.config.max_file_size:
+                self.audio_file.close()
+                self.file_number += 1
+                self.audio_file = open(self._audio_path(self.file_number), "ab")
+
+            offset = self.audio_file.tell()
+            self.audio_file.write(data.tobytes())
+            self.audio_file.flush()
+
+            if self.count == len(self._records):
+                self._records = np.concatenate((self._records, np.zeros_like(self._records)))
+            record = self._records[self.count : self.count + 1]
+            record[0] = (
+                self.speaker_ids[speaker],
+                segment.timestamp.timestamp(),
+                self.file_number,
+                offset,
+                len(data),
+                segment.id.bytes,
+            )
+            self.index_file.write(record.tobytes())
+            self.index_file.flush()
+            self.count += 1
+            # The memory map of the current file no longer covers its end.
+            self._maps.pop(self.file_number, None)
+            return self._entry(record[0])
+
+    def sync(self):
+        """Makes everything appended so far durable, audio first."""
+        with self.lock:
+            os.fsync(self.audio_file.fileno())
+            os.fsync(self.speakers_file.fileno())
+            os.fsync(self.index_file.fileno())
+
+    def close(self):
+        with self.lock:
+            for f in (self.audio_file, self.speakers_file, self.index_file):
+                f.close()
+            self._maps.clear()
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def records(self) -> np.ndarray:
+        return self._records[: self.count]
+
+    def _entry(self, record: np.void) -> ArchiveEntry:
+        return ArchiveEntry(
+            id=UUID(bytes=bytes(record["id"])),
+            speaker=self.speakers[int(record["speaker"])],
+            timestamp=datetime.fromtimestamp(float(record["timestamp"])),
+            file=int(record["file"]),
+            offset=int(record["offset"]),
+            length=int(record["length"]),
+        )
+
+    def query(
+        self,
+        speaker: Optional[str] = None,
+        start: Union[datetime, float, None] = None,
+        end: Union[datetime, float, None] = None,
+        limit: Optional[int] = None,
+    ) -> List[ArchiveEntry]:
+        """Segments of `speaker` (or everyone) with start <= timestamp < end, oldest first."""
+        with self.lock:
+            records = self.records
+            if speaker is not None and speaker not in self.speaker_ids:
+                return []
+
+            mask = np.ones(len(records), dtype=bool)
+            if speaker is not None:
+                mask &= records["speaker"] == self.speaker_ids[speaker]
+            if (start := _epoch(start)) is not None:
+                mask &= records["timestamp"] >= start
+            if (end := _epoch(end)) is not None:
+                mask &= records["timestamp"] < end
+
+            selected = records[mask]
+            selected = selected[np.argsort(selected["timestamp"], kind="stable")][:limit]
+            return [self._entry(record) for record in selected]
+
+    def read(self, entry: ArchiveEntry) -> np.ndarray:
+        """Audio of `entry` as a read-only view into the memory-mapped audio file."""
+        if not entry.length:
+            return np.zeros(0, dtype="<i2")
+        with self.lock:
+            if entry.file not in self._maps:
+                self._maps[entry.file] = np.memmap(self._audio_path(entry.file), dtype="<i2", mode="r")
+            audio = self._maps[entry.file]
+        start = entry.offset // audio.itemsize
+        return audio[start : start + entry.length]
@@ -1,9 +1,13 @@
+from assistant.core import service
 from assistant.core.component import Component
+from datetime import datetime
 from typing import Optional, Dict, Any, List
-import soundfile as sf
 import os
+import numpy as np
 from assistant.config import SPEECH_PIPELINE_SAMPLERATE
 from assistant.components.mumble.mumble import SpeechSegment
+from assistant.components.recorder.archive import Archive, ArchiveConfig, ArchiveEntry
+from assistant.components.recorder.writer import ArchiveWriter, AsyncWriter, WriterConfig
 
 class Recorder(Component):
     @property
@@ -21,15 +25,57 @@ class Recorder(Component):
             os.mkdir(self.recordings_dir)
 
         self.logger.setLevel(self.get_config("log_level", "DEBUG"))
+        # Encoding and disk writes happen on a background thread, off the speech callback chain.
+        writer_config = WriterConfig.model_validate(self.get_config("writer", {}))
+        self.archive: Optional[Archive] = None
+        if self.get_config("mode", "files") == "archive":
+            # Large append-only files plus an index instead of one file per utterance.
+            self.archive = Archive(self.recordings_dir, ArchiveConfig.model_validate(self.get_config("archive", {})))
+            self.writer = ArchiveWriter(self.archive, writer_config).start()
+        else:
+            self.writer = AsyncWriter(
+                self.recordings_dir,
+                writer_config,
+                samplerate=SPEECH_PIPELINE_SAMPLERATE,
+                name_for=self.file_name,
+            ).start()
         self.logger.info(f"Plugin '{self.name}' initialized and ready")
 
 
     def shutdown(self) -> None:
         super().shutdown()
+        self.writer.shutdown()
         self.logger.info(f"Plugin '{self.name}' disconnection from server.")
 
+    @staticmethod
+    def file_name(segment: SpeechSegment) -> str:
+        speaker = segment.speaker.replace("/", "-")
+        return f"{speaker}-{segment.timestamp}"
+
     def on_speech(self, segment: SpeechSegment):
         self.logger.info(f"{self.name} ({segment.source}) > on_speech({type(segment)})")
-        path = os.path.join(self.recordings_dir, f"{segment.source}-{segment.timestamp}.flac")
-        sf.write(path, segment.data, samplerate=SPEECH_PIPELINE_SAMPLERATE)
+        if not self.writer.submit(segment):
+            self.logger.warning(f"Recorder backlog full, dropped segment of '{segment.source}'")
+
+    @service
+    def writer_stats(self) -> Dict[str, Any]:
+        return dict(self.writer.stats.summary(), backlog=self.writer.backlog())
+
+    @service
+    def query_recordings(
+        self,
+        speaker: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[ArchiveEntry]:
+        """Archived segments by `SpeechSegment.speaker` and time range, only in archive mode."""
+        if self.archive is None:
+            raise RuntimeError("Recordings can only be queried in archive mode")
+        return self.archive.query(speaker, start, end, limit)
 
+    @service
+    def read_recording(self, entry: ArchiveEntry) -> np.ndarray:
+        if self.archive is None:
+            raise RuntimeError("Recordings can only be read in archive mode")
+        return self.archive.read(entry)
@@ -0,0 +1,218 @@
+import logging
+import os
+import threading
+from collections import deque
+from enum import Enum
+from queue import Empty, Full, Queue
+from time import monotonic, perf_counter
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+from pydantic import BaseModel, Field
+
+from assistant.components.mumble.mumble import SpeechSegment
+from assistant.components.recorder.archive import Archive
+
+logger = logging.getLogger(__name__)
+
+
+class Codec(str, Enum):
+    FLAC = "flac"
+    WAV = "wav"
+    OGG = "ogg"
+
+
+# soundfile format and subtype per codec.
+CODECS: Dict[Codec, Tuple[str, str]] = {
+    Codec.FLAC: ("FLAC", "PCM_16"),
+    Codec.WAV: ("WAV", "PCM_16"),
+    Codec.OGG: ("OGG", "VORBIS"),
+}
+
+
+class WriterConfig(BaseModel):
+    codec: Codec = Codec.FLAC
+    max_queue: int = Field(default=256, ge=1, description="Segments waiting for disk before new ones are dropped")
+    max_batch: int = Field(default=32, ge=1, description="Segments written between two fsyncs")
+    fsync: bool = True
+
+
+class WriterStats:
+    """Rolling write latencies plus counters, shared between the writer thread and `stats()` callers."""
+
+    WINDOW = 512
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.write: Deque[float] = deque(maxlen=self.WINDOW)
+        self.fsync: Deque[float] = deque(maxlen=self.WINDOW)
+        self.lag: Deque[float] = deque(maxlen=self.WINDOW)
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.bytes = 0
+        self.batches = 0
+
+    def summary(self) -> Dict[str, Any]:
+        def percentiles(values: Deque[float]) -> Optional[Dict[str, float]]:
+            if not values:
+                return None
+            return {"p50": float(np.percentile(values, 50)), "p95": float(np.percentile(values, 95))}
+
+        with self.lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "bytes": self.bytes,
+                "batches": self.batches,
+                "write": percentiles(self.write),
+                "fsync": percentiles(self.fsync),
+                "lag": percentiles(self.lag),
+            }
+
+
+class AsyncWriter:
+    """Encodes and writes speech segments on a background thread.
+
+    `submit` never blocks the speech callback chain: when the bounded queue is full
+    the segment is dropped and counted. Segments that queued up while the disk was
+    busy are written together and made durable with one fsync per batch.
+    """
+
+    def __init__(
+        self,
+        location: str,
+        config: WriterConfig,
+        samplerate: int,
+        name_for: Callable[[SpeechSegment], str],
+    ):
+        self.location = location
+        self.config = config
+        self.samplerate = samplerate
+        self.name_for = name_for
+        self.format, self.subtype = CODECS[config.codec]
+        self.queue: Queue = Queue(maxsize=config.max_queue)
+        self.stats = WriterStats()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="recorder-writer", daemon=True)
+
+    def start(self) -> "AsyncWriter":
+        self._thread.start()
+        return self
+
+    def submit(self, segment: SpeechSegment) -> bool:
+        try:
+            self.queue.put_nowait((monotonic(), segment))
+            return True
+        except Full:
+            with self.stats.lock:
+                self.stats.dropped += 1
+            return False
+
+    def backlog(self) -> int:
+        return self.queue.qsize()
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """Stops after writing everything already queued."""
+        self._stopped.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not (self._stopped.is_set() and self.queue.empty()):
+            try:
+                batch = [self.queue.get(timeout=0.2)]
+            except Empty:
+                continue
+            while len(batch) < self.config.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except Empty:
+                    break
+
+            try:
+                self.write_batch(batch)
+            except Exception as e:
+                logger.exception(f"Failed to write {len(batch)} segment(s): {e}")
+
+    def write_batch(self, batch: List[Tuple[float, SpeechSegment]]):
+        files: List[BinaryIO] = []
+        try:
+            for queued_at, segment in batch:
+                path = os.path.join(self.location, f"{self.name_for(segment)}.{self.config.codec.value}")
+                started_at = perf_counter()
+                f = open(path, "wb")
+                try:
+                    sf.write(f, segment.data, samplerate=self.samplerate, format=self.format, subtype=self.subtype)
+                    f.flush()
+                except Exception as e:
+                    logger.error(f"Failed to write '{path}': {e}")
+                    f.close()
+                    os.unlink(path)
+                    with self.stats.lock:
+                        self.stats.failed += 1
+                    continue
+                files.append(f)
+                self.record_write(started_at, queued_at, f.tell())
+
+            if self.config.fsync and files:
+                started_at = perf_counter()
+                for f in files:
+                    os.fsync(f.fileno())
+                # New directory entries are only durable once the directory is synced too.
+                directory = os.open(self.location, os.O_RDONLY)
+                try:
+                    os.fsync(directory)
+                finally:
+                    os.close(directory)
+                self.record_fsync(started_at)
+        finally:
+            for f in files:
+                f.close()
+            with self.stats.lock:
+                self.stats.batches += 1
+
+    def record_write(self, started_at: float, queued_at: float, size: int):
+        with self.stats.lock:
+            self.stats.write.append(perf_counter() - started_at)
+            self.stats.lag.append(monotonic() - queued_at)
+            self.stats.written += 1
+            self.stats.bytes += size
+
+    def record_fsync(self, started_at: float):
+        with self.stats.lock:
+            self.stats.fsync.append(perf_counter() - started_at)
+
+
+class ArchiveWriter(AsyncWriter):
+    """Same queueing and batching, but segments are appended to an `Archive` as raw PCM."""
+
+    def __init__(self, archive: Archive, config: WriterConfig):
+        super().__init__(archive.location, config, samplerate=0, name_for=lambda segment: str(segment.id))
+        self.archive = archive
+
+    def shutdown(self, timeout: Optional[float] = None):
+        super().shutdown(timeout)
+        self.archive.close()
+
+    def write_batch(self, batch: List[Tuple[float, SpeechSegment]]):
+        try:
+            for queued_at, segment in batch:
+                started_at = perf_counter()
+                try:
+                    self.archive.append(segment)
+                except Exception as e:
+                    logger.error(f"Failed to archive segment {segment.id} of '{segment.source}': {e}")
+                    with self.stats.lock:
+                        self.stats.failed += 1
+                    continue
+                self.record_write(started_at, queued_at, segment.data.nbytes)
+
+            if self.config.fsync:
+                started_at = perf_counter()
+                self.archive.sync()
+                self.record_fsync(started_at)
+        finally:
+            with self.stats.lock:
+                self.stats.batches += 1
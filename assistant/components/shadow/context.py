@@ -0,0 +1,124 @@
+import logging
+import math
+import threading
+from collections import deque
+from queue import Queue
+from typing import Callable, Deque, List, Tuple
+
+from pydantic import BaseModel, Field
+
+from assistant.utils.utils import observe
+
+logger = logging.getLogger(__name__)
+
+
+class ContextConfig(BaseModel):
+    max_tokens: int = Field(default=1024, ge=1)
+    low_watermark: float = Field(
+        default=0.75, gt=0.0, le=1.0, description="Fraction of max_tokens kept after folding"
+    )
+    chars_per_token: float = Field(default=4.0, gt=0.0)
+
+
+class ContextChunk(BaseModel):
+    text: str
+    tokens: int
+
+
+class RollingContext:
+    """Token-budgeted conversation window with a running summary of older chunks.
+
+    When the window exceeds `max_tokens` the oldest chunks are moved out in one
+    batch (down to `low_watermark`) and folded into the summary on a background
+    thread by `summarize(previous_summary, chunks) -> summary`. Chunks stay
+    visible in `snapshot()` until their fold has completed.
+    """
+
+    def __init__(
+        self, config: ContextConfig, summarize: Callable[[str, List[str]], str], name: str = "context-fold"
+    ):
+        self.config = config
+        self.summarize = summarize
+        self.lock = threading.Lock()
+
+        self.summary = ""
+        self.summary_tokens = 0
+        self.chunks: Deque[ContextChunk] = deque()
+        self.tokens = 0
+        self.folding: List[ContextChunk] = []
+        # Bumped by clear() so folds started before it are discarded.
+        self.generation = 0
+
+        self.folds = Queue()
+        self.folds_observer = observe(self.folds, self._fold, name=name)
+
+    def count_tokens(self, text: str) -> int:
+        return max(1, math.ceil(len(text) / self.config.chars_per_token))
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.folding) + len(self.chunks)
+
+    @property
+    def prompt_tokens(self) -> int:
+        with self.lock:
+            return self.summary_tokens + sum(c.tokens for c in self.folding) + self.tokens
+
+    def append(self, text: str):
+        chunk = ContextChunk(text=text, tokens=self.count_tokens(text))
+        with self.lock:
+            self.chunks.append(chunk)
+            self.tokens += chunk.tokens
+
+            if self.summary_tokens + self.tokens <= self.config.max_tokens:
+                return
+
+            target = self.config.max_tokens * self.config.low_watermark
+            evicted = []
+            # Always keep the newest chunk in the window.
+            while len(self.chunks) > 1 and self.summary_tokens + self.tokens > target:
+                old = self.chunks.popleft()
+                self.tokens -= old.tokens
+                evicted.append(old)
+
+            if evicted:
+                self.folding.extend(evicted)
+                self.folds.put_nowait((self.generation, evicted))
+
+    def _fold(self, job: Tuple[int, List[ContextChunk]]):
+        generation, chunks = job
+        with self.lock:
+            if generation != self.generation:
+                return
+            previous = self.summary
+
+        try:
+            summary = self.summarize(previous, [c.text for c in chunks]).strip()
+        except Exception as e:
+            logger.error(f"Failed to fold {len(chunks)} chunks into summary: {e}")
+            summary = " ".join([previous] + [c.text for c in chunks]).strip()
+
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.summary = summary
+            self.summary_tokens = self.count_tokens(summary) if summary else 0
+            folded = {id(c) for c in chunks}
+            self.folding = [c for c in self.folding if id(c) not in folded]
+
+    def snapshot(self) -> Tuple[str, List[str]]:
+        """Summary and window texts, read atomically."""
+        with self.lock:
+            return self.summary, [c.text for c in self.folding] + [c.text for c in self.chunks]
+
+    def clear(self):
+        with self.lock:
+            self.summary = ""
+            self.summary_tokens = 0
+            self.chunks.clear()
+            self.tokens = 0
+            self.folding = []
+            self.generation += 1
+
+    def close(self):
+        self.folds.put_nowait(None)
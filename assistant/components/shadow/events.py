@@ -0,0 +1,3 @@
+SHADOW_MEMORY_SUMMARY = "shadow.memory.summary"
+SHADOW_RESPONSE_SENTENCE = "shadow.response.sentence"
+SHADOW_MODEL_PROGRESS = "shadow.model.progress"
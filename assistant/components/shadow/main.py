@@ -1,8 +1,11 @@
+import asyncio
 from datetime import datetime
-from queue import Queue
 import threading
-from enum import Enum
-from typing import List, Optional
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable
 
 from langchain.schema import (
     HumanMessage,
@@ -11,13 +14,26 @@ from langchain.schema import (
 from langchain_ollama import ChatOllama
 from pydantic import BaseModel, Field
 
-from assistant.components.mumble.mumble import SpeechSegment
+from assistant.components.mumble.mumble import DEFAULT_CONNECTION, SpeechSegment
+from assistant.components.shadow.context import ContextConfig, RollingContext
+from assistant.components.shadow.metrics import LlmCallStats
+from assistant.components.shadow.preclassifier import PreClassifier, PreClassifierConfig
+from assistant.components.shadow.sentences import SentenceSplitter
+from assistant.components.shadow.types import (
+    ActionDecision,
+    LlmConfig,
+    MemorySummary,
+    ResponseSentence,
+    TranscriptionAction,
+)
 from assistant.components.transcriber.types import Transcript
+from assistant.config import ASSISTANT_NAME
+from assistant.core import service
 from assistant.core.component import Component
-from assistant.utils import ensure_model_exists, event_context
-from assistant.utils.utils import observe
+from assistant.utils import ensure_model_exists
+from . import events
 
-DECISION_SYSTEM_PROMPT = """
+DECISION_SYSTEM_PROMPT = f"""
 You are an AI assistant that processes transcription chunks. Your job is to:
 
 1. Analyze each transcription chunk to determine its importance and relevance
@@ -30,15 +46,20 @@ For each chunk, decide between these actions:
 - ADD_TO_CONTEXT: Add to the current conversation context because it contains relevant information for the ongoing dialogue
 - STORE_IN_MEMORY: Store as a memory/fact for later use because it contains important information but isn't immediately relevant
 - DISCARD: Discard because it's not important (e.g., filler words, background noise transcription)
+- RESPOND: The speaker addresses you, {ASSISTANT_NAME}, directly and expects a spoken answer
+
+The conversation summary and context so far, from the same speaker, may precede the chunks.
+Decide only for the new transcription chunk(s), not for the context.
 """
 
 
-class ActionDecision(BaseModel):
-    action: str = Field(
-        description="The chosen action ADD_TO_CONTEXT, STORE_IN_MEMORY or DISCARD"
-    )
-    reason: str = Field(
-        description="A concise explanation for why this action was chosen"
+class ChunkDecision(ActionDecision):
+    index: int = Field(description="Index of the transcription chunk this decision is for")
+
+
+class BatchDecision(BaseModel):
+    decisions: List[ChunkDecision] = Field(
+        description="One decision per transcription chunk, in chunk order"
     )
 
 
@@ -64,18 +85,21 @@ Create a summary that captures the essence of the current context while preservi
 """
 
 
-class MemorySummary(BaseModel):
-    summary: str = Field(
-        description="A concise yet comprehensive summary of the accumulated context"
-    )
-    entities: List[str] = Field(
-        description="Key entities (people, places, objects, concepts) mentioned in the context",
-        default_factory=list
-    )
-    topics: List[str] = Field(
-        description="Main topics or themes discussed in the context",
-        default_factory=list
-    )
+ROLLING_SUMMARY_PROMPT = """
+You maintain a running summary of a transcribed conversation. You receive the current summary and
+the transcription chunks that are falling out of the conversation window.
+
+Rewrite the summary so it also covers the new chunks. Keep names, numbers, decisions and open questions,
+drop filler. Answer with the summary text only, no preamble.
+"""
+
+
+RESPONSE_SYSTEM_PROMPT = f"""
+You are {ASSISTANT_NAME}, a voice assistant taking part in a conversation. Your answer is spoken aloud
+as soon as each sentence is complete, so start with the answer itself, use short plain sentences,
+and never use markdown, lists, code or emoji. Keep it brief unless asked for detail.
+"""
+
 
 class StreamToken(BaseModel):
     token: str = Field(repr=True)
@@ -83,16 +107,13 @@ class StreamToken(BaseModel):
 
 class QueryResponse(BaseModel):
     tokens: List[StreamToken] = Field(default_factory=list)
+    sentences: List[str] = Field(default_factory=list)
     interrupted: bool
 
     def add(self, t):
         self.tokens.append(StreamToken(token=t, done=bool(t == "")))
 
 
-class TranscriptionAction(str, Enum):
-    ADD_TO_CONTEXT = "ADD_TO_CONTEXT"
-    STORE_IN_MEMORY = "STORE_IN_MEMORY"
-    DISCARD = "DISCARD"
 
 
 class Shadow(Component):
@@ -102,89 +123,402 @@ class Shadow(Component):
 
     @property
     def events(self) -> List[str]:
-        return []
+        return [events.SHADOW_MEMORY_SUMMARY, events.SHADOW_RESPONSE_SENTENCE, events.SHADOW_MODEL_PROGRESS]
 
     def initialize(self) -> None:
         super().initialize()
-        model = self.get_config("model", "llama3.2:3b")
-        self.llm = self.create_llm(model)
+        # A small fast model decides on every chunk, a larger one writes the rare summaries.
+        # Streamed responses use the decision model, its latency is what the listener waits for.
+        self.models_ready: Dict[str, threading.Event] = {}
+        self.decision_llm = self.create_llm("decision")
+        self.summary_llm = self.create_llm("summary")
+
+        # Built once: wrapping the model with a schema on every call is not free.
+        # json_schema constrains decoding server-side instead of injecting tool definitions
+        # into the prompt, which keeps the prompt prefix stable for Ollama's KV cache.
+        method = self.get_config("structured_output_method", "json_schema")
+        self.decision_chain = self.decision_llm.with_structured_output(ActionDecision, method=method, include_raw=True)
+        self.summary_chain = self.summary_llm.with_structured_output(MemorySummary, method=method, include_raw=True)
+        self.batch_chain = self.decision_llm.with_structured_output(BatchDecision, method=method, include_raw=True)
+        self.llm_stats = LlmCallStats()
+        self.preclassifier = PreClassifier(
+            PreClassifierConfig.model_validate(self.get_config("preclassifier", {}))
+        )
 
-        # Conversation context that we're building
-        self.context: List[str] = []
+        # Conversation context per speaker, keyed by `SpeechSegment.speaker`.
+        self.context_config = ContextConfig.model_validate(self.get_config("context", {}))
+        self.contexts: Dict[str, RollingContext] = {}
+        self.contexts_lock = threading.Lock()
 
         self.is_processing = threading.Event()
+        self.in_flight = 0
+        self.last_decision: Optional[ActionDecision] = None
+
+        # Speakers are handled concurrently on one event loop, each one strictly in order.
+        # Transcripts queued for a speaker while its decision is in flight are decided together.
+        self.max_batch = self.get_config("max_batch", 8)
+        self.llm_slots = {
+            "decision": asyncio.Semaphore(self.get_config("max_concurrent_llm_calls", 2)),
+            "summary": asyncio.Semaphore(self.get_config("max_concurrent_summaries", 1)),
+        }
+        self.speaker_queues: Dict[str, asyncio.Queue] = {}
+        self.speaker_tasks: Dict[str, asyncio.Task] = {}
+        # Streaming responses and the connection they are played on, cancelled when its playback is interrupted.
+        self.responses: Dict[asyncio.Task, str] = {}
+        self.min_sentence_chars = self.get_config("min_sentence_chars", 12)
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, name="shadow-loop", daemon=True)
+        self.loop_thread.start()
+
+        # Memory summaries are written in the background so they never hold up the next decision.
+        self.summary_jobs: asyncio.Queue = asyncio.Queue()
+        asyncio.run_coroutine_threadsafe(self._summary_worker(), self.loop)
+
         self.logger.info(f"Plugin '{self.name}' initialized and ready")
 
-        self.transcripts = Queue()
-        observe(self.transcripts, lambda args: self.process_transcript(*args))
+    def shutdown(self) -> None:
+        super().shutdown()
 
+        async def cancel():
+            # Speaker workers, responses and the summary worker; let them unwind before the loop stops.
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
+        asyncio.run_coroutine_threadsafe(cancel(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join()
 
-    def shutdown(self) -> None:
-        super().shutdown()
+        with self.contexts_lock:
+            for context in self.contexts.values():
+                context.close()
         self.logger.info(f"Plugin '{self.name}' shutdown done.")
 
-    def create_llm(self, model: str):
-        url = self.get_config("url", "localhost:11434")
-        temperature = self.get_config("temperature", 0.0)
-        ensure_model_exists(url, model)
+    def llm_config(self, role: str) -> LlmConfig:
+        """`<role>_model` config, either a model name or a mapping, over the top-level model settings."""
+        config = {
+            "model": self.get_config("model", "llama3.2:3b"),
+            "url": self.get_config("url", "localhost:11434"),
+            "temperature": self.get_config("temperature", 0.0),
+            "keep_alive": self.get_config("keep_alive", "30m"),
+        }
+        role_config = self.get_config(f"{role}_model", {})
+        config.update({"model": role_config} if isinstance(role_config, str) else role_config)
+        return LlmConfig.model_validate(config)
+
+    def create_llm(self, role: str):
+        config = self.llm_config(role)
+        # Pulled and loaded in the background; startup does not wait for either.
+        self.models_ready[role] = ensure_model_exists(
+            config.url,
+            config.model,
+            on_progress=self.proxy(events.SHADOW_MODEL_PROGRESS),
+            warmup=self.get_config("warmup", True),
+            keep_alive=config.keep_alive,
+        )
 
-        self.logger.info(f"Creating Ollama using '{model}' model.")
+        self.logger.info(f"Creating Ollama using '{config.model}' model for {role}.")
         return ChatOllama(
-            base_url=url,
-            model=model,
-            temperature=temperature,
+            base_url=config.url,
+            model=config.model,
+            temperature=config.temperature,
+            keep_alive=config.keep_alive,
+            **config.options,
         )
 
-    def on_transcript(self, segment: SpeechSegment, transcript: Transcript):
-        self.transcripts.put_nowait((segment, transcript))
-
-
-    def process_transcript(self, segment: SpeechSegment, t: Transcript):
-        self.logger.info(f"-> {datetime.now() - segment.timestamp}")
-
-        self.logger.info(f"({t.language}: {t.duration}) -> {t.transcript}...")
-
-        with event_context(self.is_processing):
-            if self.context:
-                combined_context = " ".join(self.context + [t.transcript])
-            else:
-                combined_context = t.transcript
-
-            messages = [
-                SystemMessage(content=DECISION_SYSTEM_PROMPT),
-                HumanMessage(content=f'Transcription chunk: "{combined_context}"'),
-            ]
-
-            decision: Optional[ActionDecision] = self.llm.with_structured_output(
-                ActionDecision
-            ).invoke(messages)
-
-            self.last_decision = decision
-            if decision is None:
-                return
-
-            self.logger.info(f"[{decision.action}] {decision.reason}")
-
-            if decision.action == TranscriptionAction.ADD_TO_CONTEXT:
-                self.context.append(t.transcript)
-
-            elif decision.action == TranscriptionAction.STORE_IN_MEMORY:
-                self.logger.info("[MEM_DUMP]")
-
-                context = "\r\n -".join(self.context)
-
-                messages = [
-                    SystemMessage(content=CONDENSED_MEMORY_PROMPT),
-                    HumanMessage(content=f"Context: {context}\r\n")
-                ]
-
-                summary: MemorySummary = self.llm.with_structured_output(MemorySummary).invoke(messages)
-                self.logger.info(f"{summary}")
-
-                self.context = []
-            elif decision.action == TranscriptionAction.DISCARD:
-                pass
-
-            return decision
+    def context_for(self, source: str) -> RollingContext:
+        with self.contexts_lock:
+            if source not in self.contexts:
+                summarize = lambda summary, chunks: self.summarize_context(source, summary, chunks)  # noqa: E731
+                self.contexts[source] = RollingContext(
+                    self.context_config, summarize, name=f"shadow-fold-{source}"
+                )
+            return self.contexts[source]
+
+    async def wait_for_model(self, role: str):
+        if not self.models_ready[role].is_set():
+            self.logger.info(f"Waiting for the {role} model to be pulled and loaded")
+            await asyncio.to_thread(self.models_ready[role].wait)
+
+    async def invoke_structured(
+        self, name: str, chain: Runnable, messages: List[BaseMessage], role: str = "decision"
+    ) -> Optional[Any]:
+        await self.wait_for_model(role)
+        async with self.llm_slots[role]:
+            started_at = perf_counter()
+            result = await chain.ainvoke(messages)
+            self.llm_stats.record(name, perf_counter() - started_at, result["raw"])
+
+        if result["parsing_error"] is not None:
+            self.logger.error(f"Failed to parse '{name}' output: {result['parsing_error']}")
+        return result["parsed"]
+
+    @service
+    def llm_call_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.llm_stats.summary()
+
+    @service
+    def preclassifier_stats(self) -> Dict[str, int]:
+        return self.preclassifier.stats()
+
+    @service
+    def context_stats(self) -> Dict[str, Dict[str, int]]:
+        with self.contexts_lock:
+            contexts = dict(self.contexts)
+        return {
+            source: {
+                "chunks": len(context),
+                "prompt_tokens": context.prompt_tokens,
+                "queued": self.speaker_queues[source].qsize() if source in self.speaker_queues else 0,
+            }
+            for source, context in contexts.items()
+        }
+
+    def decision_messages(self, context: RollingContext, transcripts: List[Transcript]) -> List[BaseMessage]:
+        """Stable system prefix, then append-only context, then the new chunk(s).
+
+        Between summary folds each prompt extends the previous one, so Ollama can
+        reuse the evaluated prefix instead of re-reading the whole conversation.
+        """
+        summary, texts = context.snapshot()
+
+        messages: List[BaseMessage] = [SystemMessage(content=DECISION_SYSTEM_PROMPT)]
+        if summary:
+            messages.append(HumanMessage(content=f"Conversation summary: {summary}"))
+        if texts:
+            messages.append(HumanMessage(content="Conversation context:\n" + "\n".join(f"- {x}" for x in texts)))
+        if len(transcripts) == 1:
+            messages.append(HumanMessage(content=f'Transcription chunk: "{transcripts[0].transcript}"'))
+        else:
+            chunks = "\n".join(f'[{i}] "{t.transcript}"' for i, t in enumerate(transcripts))
+            messages.append(
+                HumanMessage(
+                    content=f"Transcription chunks, in order:\n{chunks}\n"
+                    "Decide for every chunk and return one decision per chunk index."
+                )
+            )
+        return messages
+
+    def summarize_context(self, source: str, summary: str, chunks: List[str]) -> str:
+        """Runs on the context's fold thread; the call itself goes through the loop to respect the LLM caps."""
+        messages = [
+            SystemMessage(content=ROLLING_SUMMARY_PROMPT),
+            HumanMessage(
+                content=f"Current summary: {summary or '(empty)'}\r\nNew chunks:\r\n -"
+                + "\r\n -".join(chunks)
+            ),
+        ]
+
+        async def fold():
+            await self.wait_for_model("summary")
+            async with self.llm_slots["summary"]:
+                started_at = perf_counter()
+                response = await self.summary_llm.ainvoke(messages)
+                self.llm_stats.record("context_fold", perf_counter() - started_at, response)
+                return response
+
+        self.logger.debug(f"Folding {len(chunks)} chunks of '{source}' into the summary")
+        response = asyncio.run_coroutine_threadsafe(fold(), self.loop).result()
+        return str(response.content)
 
+    def on_transcript(self, segment: SpeechSegment, transcript: Transcript):
+        self.loop.call_soon_threadsafe(self._enqueue, segment, transcript)
+
+    def _enqueue(self, segment: SpeechSegment, transcript: Transcript):
+        source = segment.speaker
+        if source not in self.speaker_queues:
+            self.speaker_queues[source] = asyncio.Queue()
+            self.speaker_tasks[source] = self.loop.create_task(self._speaker_worker(source), name=f"shadow-{source}")
+        self.speaker_queues[source].put_nowait((segment, transcript))
+
+    async def _speaker_worker(self, source: str):
+        queue = self.speaker_queues[source]
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await self.process_transcripts(source, batch)
+            except Exception as e:
+                self.logger.exception(f"Failed to process {len(batch)} transcript(s) of '{source}': {e}")
+
+    def process_transcript(self, segment: SpeechSegment, t: Transcript) -> Optional[ActionDecision]:
+        """Blocking single-transcript entry point, bypasses the per-speaker queue."""
+        future = asyncio.run_coroutine_threadsafe(self.process_transcripts(segment.speaker, [(segment, t)]), self.loop)
+        return future.result()[0]
+
+    async def process_transcripts(
+        self, source: str, batch: List[Tuple[SpeechSegment, Transcript]]
+    ) -> List[Optional[ActionDecision]]:
+        for segment, t in batch:
+            self.logger.info(f"-> {datetime.now() - segment.timestamp}")
+            self.logger.info(f"[{source}] ({t.language}: {t.duration}) -> {t.transcript}...")
+
+        context = self.context_for(source)
+        transcripts = [t for _, t in batch]
+        connection = batch[0][0].connection
+
+        self.in_flight += 1
+        self.is_processing.set()
+        try:
+            decisions: List[Optional[ActionDecision]] = [self.preclassifier.classify(t) for t in transcripts]
+            ambiguous = [i for i, d in enumerate(decisions) if d is None]
+
+            if ambiguous:
+                decided = await self.decide(context, [transcripts[i] for i in ambiguous])
+                for i, decision in zip(ambiguous, decided):
+                    decisions[i] = decision
+
+            for t, decision in zip(transcripts, decisions):
+                await self.apply_decision(source, t, decision, connection)
+
+            self.last_decision = decisions[-1]
+            return decisions
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self.is_processing.clear()
+
+    async def decide(self, context: RollingContext, transcripts: List[Transcript]) -> List[Optional[ActionDecision]]:
+        self.logger.debug(f"Prompt context ~{context.prompt_tokens} tokens, batch of {len(transcripts)}")
+        messages = self.decision_messages(context, transcripts)
+
+        if len(transcripts) == 1:
+            return [await self.invoke_structured("decision", self.decision_chain, messages)]
+
+        result: Optional[BatchDecision] = await self.invoke_structured("batch_decision", self.batch_chain, messages)
+        by_index = {d.index: d for d in result.decisions} if result else {}
+        decisions: List[Optional[ActionDecision]] = []
+        for i in range(len(transcripts)):
+            if i not in by_index:
+                # Keep the information rather than silently losing it.
+                self.logger.warning(f"No decision for chunk {i} of {len(transcripts)}, adding to context")
+                by_index[i] = ChunkDecision(
+                    index=i, action=TranscriptionAction.ADD_TO_CONTEXT, reason="Missing from batch decision"
+                )
+            decisions.append(by_index[i])
+        return decisions
+
+    async def apply_decision(
+        self, source: str, t: Transcript, decision: Optional[ActionDecision], connection: str = DEFAULT_CONNECTION
+    ):
+        if decision is None:
+            return
+
+        context = self.context_for(source)
+
+        self.logger.info(f"[{decision.action}] {decision.reason}")
+
+        if decision.action == TranscriptionAction.ADD_TO_CONTEXT:
+            context.append(t.transcript)
+
+        elif decision.action == TranscriptionAction.STORE_IN_MEMORY:
+            self.logger.info("[MEM_DUMP]")
+
+            summary_text, texts = context.snapshot()
+            text = "\r\n -".join(texts)
+            if summary_text:
+                text = f"{summary_text}\r\n -{text}"
+
+            context.clear()
+            self.summary_jobs.put_nowait((source, text))
+
+        elif decision.action == TranscriptionAction.RESPOND:
+            context.append(t.transcript)
+            response = await self.respond(source, context, connection)
+            if response.sentences:
+                # Only what was handed to playback, an interrupted tail was never heard.
+                context.append(f"{ASSISTANT_NAME}: {' '.join(response.sentences)}")
+
+        elif decision.action == TranscriptionAction.DISCARD:
+            pass
+
+    async def _summary_worker(self):
+        while True:
+            source, text = await self.summary_jobs.get()
+            try:
+                await self.summarize_memory(source, text)
+            except Exception as e:
+                self.logger.exception(f"Failed to summarize memory of '{source}': {e}")
+
+    async def summarize_memory(self, source: str, text: str) -> Optional[MemorySummary]:
+        messages = [
+            SystemMessage(content=CONDENSED_MEMORY_PROMPT),
+            HumanMessage(content=f"Context: {text}\r\n")
+        ]
+
+        summary: Optional[MemorySummary] = await self.invoke_structured(
+            "summary", self.summary_chain, messages, role="summary"
+        )
+        self.logger.info(f"[{source}] {summary}")
+        if summary is not None:
+            self.proxy(events.SHADOW_MEMORY_SUMMARY)(summary)
+        return summary
+
+    def response_messages(self, context: RollingContext) -> List[BaseMessage]:
+        summary, texts = context.snapshot()
+        messages: List[BaseMessage] = [SystemMessage(content=RESPONSE_SYSTEM_PROMPT)]
+        if summary:
+            messages.append(HumanMessage(content=f"Conversation summary: {summary}"))
+        messages.append(HumanMessage(content="Conversation so far:\n" + "\n".join(f"- {x}" for x in texts)))
+        return messages
+
+    async def respond(
+        self, source: str, context: RollingContext, connection: str = DEFAULT_CONNECTION
+    ) -> QueryResponse:
+        """Streams the answer and emits every sentence the moment it is complete."""
+        response = QueryResponse(interrupted=False)
+        generation = self.loop.create_task(
+            self.stream_response(source, self.response_messages(context), response, connection),
+            name=f"shadow-respond-{source}",
+        )
+        self.responses[generation] = connection
+        try:
+            await generation
+        except asyncio.CancelledError:
+            # Only an interrupt of the generation itself is handled here, not shutdown.
+            if asyncio.current_task().cancelling() or not generation.cancelled():
+                raise
+            response.interrupted = True
+            self.logger.info(f"Response to '{source}' interrupted after {len(response.tokens)} tokens")
+        finally:
+            self.responses.pop(generation, None)
+        return response
+
+    async def stream_response(
+        self, source: str, messages: List[BaseMessage], response: QueryResponse, connection: str = DEFAULT_CONNECTION
+    ):
+        splitter = SentenceSplitter(min_chars=self.min_sentence_chars)
+        await self.wait_for_model("decision")
+
+        def emit(sentences: List[str]):
+            for text in sentences:
+                index = len(response.sentences)
+                if index == 0:
+                    self.llm_stats.record("response_first_sentence", perf_counter() - started_at)
+                response.sentences.append(text)
+                self.proxy(events.SHADOW_RESPONSE_SENTENCE)(
+                    ResponseSentence(source=source, text=text, index=index, connection=connection)
+                )
+
+        async with self.llm_slots["decision"]:
+            started_at = perf_counter()
+            last = None
+            async for chunk in self.decision_llm.astream(messages):
+                last = chunk
+                token = str(chunk.content)
+                response.add(token)
+                emit(splitter.feed(token))
+            emit(splitter.flush())
+            self.llm_stats.record("response", perf_counter() - started_at, last)
+
+    def on_interrupt(self, connection: Optional[str] = None):
+        self.loop.call_soon_threadsafe(self.cancel_responses, connection)
+
+    def cancel_responses(self, connection: Optional[str] = None):
+        """Cancels responses played on `connection`, or all of them."""
+        for task, played_on in self.responses.items():
+            if connection is None or played_on == connection:
+                task.cancel()
@@ -0,0 +1,52 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import numpy as np
+
+
+class LlmCallStats:
+    """Rolling per-chain latency samples of LLM calls.
+
+    Time to first token is taken from Ollama's response metadata as model load
+    plus prompt evaluation time; `prompt_tokens` is the number of prompt tokens
+    Ollama actually evaluated, so it drops when the KV cache prefix is reused.
+    """
+
+    WINDOW = 512
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples: Dict[str, Deque[Dict[str, Optional[float]]]] = {}
+
+    def record(self, name: str, wall: float, raw: Any = None):
+        metadata = getattr(raw, "response_metadata", None) or {}
+        ttft = None
+        if "prompt_eval_duration" in metadata:
+            ttft = (metadata.get("load_duration", 0) + metadata["prompt_eval_duration"]) / 1e9
+
+        sample = {
+            "wall": wall,
+            "ttft": ttft,
+            "load": metadata["load_duration"] / 1e9 if "load_duration" in metadata else None,
+            "prompt_tokens": metadata.get("prompt_eval_count"),
+        }
+        with self.lock:
+            self.samples.setdefault(name, deque(maxlen=self.WINDOW)).append(sample)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            samples = {name: list(s) for name, s in self.samples.items()}
+
+        result = {}
+        for name, items in samples.items():
+            stats: Dict[str, Any] = {"calls": len(items)}
+            for key in ("wall", "ttft", "load", "prompt_tokens"):
+                values = [s[key] for s in items if s[key] is not None]
+                stats[key] = (
+                    {"p50": float(np.percentile(values, 50)), "p95": float(np.percentile(values, 95))}
+                    if values
+                    else None
+                )
+            result[name] = stats
+        return result
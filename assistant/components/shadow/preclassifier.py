@@ -0,0 +1,126 @@
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from assistant.components.transcriber.types import Transcript
+from assistant.config import ASSISTANT_NAME
+
+from .types import ActionDecision, TranscriptionAction
+
+# Fillers and the usual Whisper hallucinations on silence or noise.
+DEFAULT_STOP_PHRASES = [
+    "you",
+    "thank you",
+    "thanks",
+    "thank you very much",
+    "thanks for watching",
+    "thank you for watching",
+    "please subscribe",
+    "subtitles by the amara org community",
+    "bye",
+    "okay",
+    "ok",
+    "um",
+    "uh",
+    "hmm",
+    "mm",
+    "ah",
+    "oh",
+    "so",
+    "yeah",
+    "",
+]
+
+
+class PreClassifierConfig(BaseModel):
+    enabled: bool = True
+    stop_phrases: List[str] = Field(default_factory=lambda: list(DEFAULT_STOP_PHRASES))
+    keep_words: List[str] = Field(
+        default_factory=lambda: [ASSISTANT_NAME.lower(), "yes", "no", "stop", "wait"],
+        description="Words that always go to the model, even on their own",
+    )
+    min_words: int = Field(default=2, description="Fewer words than this is discarded")
+    max_words_per_second: float = Field(default=6.0, description="Faster than humanly possible is a hallucination")
+    min_words_per_second: float = Field(default=0.2, description="One word over long audio is a hallucination")
+    min_duration_for_rate: float = Field(default=4.0, description="Word-rate checks only apply to longer audio")
+    min_unique_ratio: float = Field(default=0.3, description="Whisper repetition loops have few unique words")
+    min_words_for_repetition: int = 6
+    fragment_max_words: int = Field(
+        default=0, description="Unfinished fragments up to this many words are added to context; 0 disables"
+    )
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", text.lower())).strip()
+
+
+class PreClassifier:
+    """Cheap local rules that settle obvious transcripts without an LLM call.
+
+    Returns a decision only when a rule is confident, `None` sends the chunk to the model.
+    """
+
+    def __init__(self, config: PreClassifierConfig):
+        self.config = config
+        self.stop_phrases = {normalize(p) for p in config.stop_phrases}
+        self.keep_words = {normalize(w) for w in config.keep_words}
+        self.lock = threading.Lock()
+        self.counters: Counter = Counter()
+
+    def classify(self, t: Transcript) -> Optional[ActionDecision]:
+        decision = self._classify(t) if self.config.enabled else None
+        with self.lock:
+            self.counters["total"] += 1
+            if decision is None:
+                self.counters["llm"] += 1
+            else:
+                self.counters[f"avoided.{decision.action}"] += 1
+        return decision
+
+    def _classify(self, t: Transcript) -> Optional[ActionDecision]:
+        text = normalize(t.transcript)
+        words = text.split()
+
+        if text in self.stop_phrases:
+            return self._discard(f"Stop phrase '{text}'")
+
+        if self.keep_words.intersection(words):
+            return None
+
+        if len(words) < self.config.min_words:
+            return self._discard(f"Only {len(words)} word(s)")
+
+        if t.duration >= self.config.min_duration_for_rate:
+            rate = len(words) / t.duration
+            if rate > self.config.max_words_per_second:
+                return self._discard(f"Implausible speech rate {rate:.1f} words/s")
+            if rate < self.config.min_words_per_second:
+                return self._discard(f"Implausible speech rate {rate:.2f} words/s")
+
+        if len(words) >= self.config.min_words_for_repetition:
+            unique_ratio = len(set(words)) / len(words)
+            if unique_ratio < self.config.min_unique_ratio:
+                return self._discard(f"Repetition loop, {unique_ratio:.0%} unique words")
+
+        if t.segments and not any(s.text.strip() for s in t.segments):
+            return self._discard("No speech in segments")
+
+        fragment = t.transcript.strip()
+        if 0 < len(words) <= self.config.fragment_max_words and fragment and fragment[-1] not in ".?!":
+            return ActionDecision(
+                action=TranscriptionAction.ADD_TO_CONTEXT,
+                reason="Unfinished fragment, decided together with what follows",
+            )
+
+        return None
+
+    @staticmethod
+    def _discard(reason: str) -> ActionDecision:
+        return ActionDecision(action=TranscriptionAction.DISCARD, reason=reason)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counters)
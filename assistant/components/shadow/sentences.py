@@ -0,0 +1,55 @@
+import re
+from typing import List, Optional, Set
+
+# Sentence-final punctuation followed by optional closing quotes/brackets and whitespace,
+# or a line break. Requiring the whitespace keeps "3.5" together while it is streamed.
+BOUNDARY = re.compile(r"[.!?…]+[\"')\]]*(?=\s)|\n")
+
+DEFAULT_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "st", "vs", "etc", "e.g", "i.e", "approx", "no"}
+
+# Markdown the model might produce despite the prompt; it must not be read aloud.
+MARKDOWN = re.compile(r"[*#`_]+|^\s*(?:[-•]|\d+\.)\s+")
+
+
+class SentenceSplitter:
+    """Accumulates streamed tokens and hands out sentences as soon as they are complete.
+
+    Sentences shorter than `min_chars` are held back and joined with the next one, so
+    speech synthesis is not fed single-word fragments.
+    """
+
+    def __init__(self, min_chars: int = 12, abbreviations: Optional[Set[str]] = None):
+        self.min_chars = min_chars
+        self.abbreviations = DEFAULT_ABBREVIATIONS if abbreviations is None else abbreviations
+        self.buffer = ""
+
+    def feed(self, token: str) -> List[str]:
+        self.buffer += token
+        sentences = []
+        start = 0
+        for match in BOUNDARY.finditer(self.buffer):
+            candidate = self.clean(self.buffer[start : match.end()])
+            if not candidate:
+                start = match.end()
+                continue
+            if match.group().startswith(".") and self.ends_with_abbreviation(candidate):
+                continue
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        rest, self.buffer = self.clean(self.buffer), ""
+        return [rest] if rest else []
+
+    def ends_with_abbreviation(self, sentence: str) -> bool:
+        words = sentence.rstrip(".").split()
+        return bool(words) and words[-1].lower() in self.abbreviations
+
+    @staticmethod
+    def clean(text: str) -> str:
+        return re.sub(r"\s+", " ", MARKDOWN.sub("", text.strip())).strip()
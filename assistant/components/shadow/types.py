@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Union
+
+from pydantic import BaseModel, Field
+
+from assistant.components.mumble.types import DEFAULT_CONNECTION
+
+
+class TranscriptionAction(str, Enum):
+    ADD_TO_CONTEXT = "ADD_TO_CONTEXT"
+    STORE_IN_MEMORY = "STORE_IN_MEMORY"
+    DISCARD = "DISCARD"
+    RESPOND = "RESPOND"
+
+
+class ActionDecision(BaseModel):
+    action: str = Field(
+        description="The chosen action ADD_TO_CONTEXT, STORE_IN_MEMORY, DISCARD or RESPOND"
+    )
+    reason: str = Field(
+        description="A concise explanation for why this action was chosen"
+    )
+
+
+class MemorySummary(BaseModel):
+    summary: str = Field(
+        description="A concise yet comprehensive summary of the accumulated context"
+    )
+    entities: List[str] = Field(
+        description="Key entities (people, places, objects, concepts) mentioned in the context",
+        default_factory=list
+    )
+    topics: List[str] = Field(
+        description="Main topics or themes discussed in the context",
+        default_factory=list
+    )
+
+
+@dataclass(slots=True, kw_only=True)
+class ResponseSentence:
+    """One complete sentence of a streamed response, in speaking order."""
+
+    source: str
+    text: str
+    index: int
+    connection: str = DEFAULT_CONNECTION
+
+
+class LlmConfig(BaseModel):
+    """One model role in Shadow; unset fields fall back to the top-level plugin config."""
+
+    model: str
+    url: str
+    temperature: float = 0.0
+    # Ollama duration like "30m", or seconds with -1 for forever.
+    keep_alive: Union[int, str, None] = None
+    options: Dict[str, Any] = Field(
+        default_factory=dict, description="Extra ChatOllama parameters, e.g. num_ctx or num_predict"
+    )
@@ -0,0 +1,92 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+class CacheConfig(BaseModel):
+    location: Optional[str] = Field(default="./.synthesis-cache", description="Disk cache directory, null disables")
+    capacity: int = Field(default=256, ge=1, description="Phrases kept in memory")
+    max_disk_chars: int = Field(default=120, description="Longer phrases are not written to disk")
+
+
+def phrase_key(model: str, text: str) -> str:
+    """Same phrase, same key: case and whitespace do not change how it is spoken."""
+    phrase = re.sub(r"\s+", " ", text.strip().lower())
+    return hashlib.sha256(f"{model}\0{phrase}".encode()).hexdigest()
+
+
+class AudioCache:
+    """Synthesized audio by phrase key, LRU in memory and `.npy` files on disk.
+
+    Only phrases up to `max_disk_chars` are written to disk: greetings and
+    confirmations repeat, long answers practically never do.
+    """
+
+    def __init__(self, location: Optional[str], capacity: int = 256, max_disk_chars: int = 120):
+        self.location = location
+        self.capacity = capacity
+        self.max_disk_chars = max_disk_chars
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, NDArray[np.int16]]" = OrderedDict()
+        self.counters: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        if location:
+            os.makedirs(location, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        assert self.location is not None
+        return os.path.join(self.location, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[NDArray[np.int16]]:
+        with self.lock:
+            audio = self.entries.get(key)
+            if audio is not None:
+                self.entries.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return audio
+
+        if self.location and os.path.exists(self.path(key)):
+            try:
+                audio = np.load(self.path(key))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+                os.unlink(self.path(key))
+            else:
+                self._remember(key, audio)
+                with self.lock:
+                    self.counters["disk_hits"] += 1
+                return audio
+
+        with self.lock:
+            self.counters["misses"] += 1
+        return None
+
+    def put(self, key: str, text: str, audio: NDArray[np.int16]):
+        self._remember(key, audio)
+        if self.location and len(text) <= self.max_disk_chars and not os.path.exists(self.path(key)):
+            # Written aside and renamed, so a reader never sees a partial file.
+            temporary = f"{self.path(key)}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                np.save(f, audio)
+            os.replace(temporary, self.path(key))
+
+    def _remember(self, key: str, audio: NDArray[np.int16]):
+        audio.setflags(write=False)
+        with self.lock:
+            self.entries[key] = audio
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counters, entries=len(self.entries))
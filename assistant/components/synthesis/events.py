@@ -0,0 +1 @@
+SYNTHESIS_SENTENCE_READY = "synthesis.sentence.ready"
@@ -0,0 +1,136 @@
+import os
+import threading
+from queue import Queue
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import resampy
+from piper import PiperVoice
+from pymumble_py3.constants import PYMUMBLE_SAMPLERATE
+
+from assistant.components.mumble.mumble import Sentence
+from assistant.components.shadow.types import ResponseSentence
+from assistant.config import ASSISTANT_NAME, PIPER_MODELS_LOCATION, PIPER_TTS_MODEL
+from assistant.core import service
+from assistant.core.component import Component
+from assistant.utils import WorkerPool, audio_length
+
+from . import events
+from .cache import AudioCache, CacheConfig, phrase_key
+
+DEFAULT_PRELOAD = [
+    "Yes.",
+    "No.",
+    "Okay.",
+    "One moment.",
+    "Done.",
+    "Sorry, I didn't catch that.",
+    f"Hi, I'm {ASSISTANT_NAME}.",
+]
+
+
+class Synthesis(Component):
+    @property
+    def version(self) -> str:
+        return "0.0.1"
+
+    @property
+    def events(self) -> List[str]:
+        return [events.SYNTHESIS_SENTENCE_READY]
+
+    def initialize(self) -> None:
+        super().initialize()
+        self.logger.setLevel(self.get_config("log_level", "INFO"))
+        self.model = self.get_config("model", PIPER_TTS_MODEL)
+        location = self.get_config("models_location", PIPER_MODELS_LOCATION)
+        self.voice = PiperVoice.load(
+            os.path.join(location, f"{self.model}.onnx"), use_cuda=self.get_config("use_cuda", False)
+        )
+        self.cache = AudioCache(**CacheConfig.model_validate(self.get_config("cache", {})).model_dump())
+
+        # Sentences are synthesized in parallel but emitted per source in arrival order.
+        self.lock = threading.Lock()
+        self.sequence: Dict[str, int] = {}
+        self.next_out: Dict[str, int] = {}
+        self.finished: Dict[str, Dict[int, Optional[Sentence]]] = {}
+        # Bumped per connection on interrupt so its queued and in-flight sentences are dropped.
+        self.generations: Dict[str, int] = {}
+
+        self.jobs = Queue()
+        self.workers = WorkerPool(self.jobs, self.synthesize_job, self.get_config("max_workers", 2), "synthesis")
+        self.workers.start()
+
+        phrases = self.get_config("preload", DEFAULT_PRELOAD)
+        threading.Thread(target=self.preload, args=(phrases,), name="synthesis-preload", daemon=True).start()
+
+        self.logger.info(f"Plugin '{self.name}' initialized with '{self.model}' voice")
+
+    def shutdown(self) -> None:
+        super().shutdown()
+        self.workers.shutdown()
+        self.logger.info(f"Plugin '{self.name}' shutdown done.")
+
+    def preload(self, phrases: List[str]):
+        for phrase in phrases:
+            self.synthesize(phrase)
+        self.logger.info(f"Preloaded {len(phrases)} phrases: {self.cache.stats()}")
+
+    def on_sentence(self, sentence: ResponseSentence):
+        with self.lock:
+            sequence = self.sequence.get(sentence.source, 0)
+            self.sequence[sentence.source] = sequence + 1
+            job = (self.generations.setdefault(sentence.connection, 0), sequence, sentence)
+        self.jobs.put_nowait(job)
+
+    def on_interrupt(self, connection: Optional[str] = None):
+        with self.lock:
+            for name in [connection] if connection is not None else list(self.generations):
+                self.generations[name] = self.generations.get(name, 0) + 1
+
+    def is_current(self, generation: int, sentence: ResponseSentence) -> bool:
+        return generation == self.generations.get(sentence.connection, 0)
+
+    def synthesize_job(self, job: Tuple[int, int, ResponseSentence]):
+        generation, sequence, sentence = job
+        result = None
+        if self.is_current(generation, sentence):
+            try:
+                result = self.synthesize(sentence.text)
+                result.connection = sentence.connection
+            except Exception as e:
+                self.logger.exception(f"Failed to synthesize '{sentence.text}': {e}")
+        self.release(generation, sentence, sequence, result)
+
+    def release(self, generation: int, sentence: ResponseSentence, sequence: int, result: Optional[Sentence]):
+        source = sentence.source
+        # Emitting under the lock keeps two workers from handing out their sentences out of order.
+        with self.lock:
+            finished = self.finished.setdefault(source, {})
+            finished[sequence] = result if self.is_current(generation, sentence) else None
+
+            next_out = self.next_out.get(source, 0)
+            while next_out in finished:
+                ready = finished.pop(next_out)
+                next_out += 1
+                if ready is not None:
+                    self.proxy(events.SYNTHESIS_SENTENCE_READY)(ready)
+            self.next_out[source] = next_out
+
+    @service
+    def synthesize(self, text: str) -> Sentence:
+        key = phrase_key(self.model, text)
+        audio = self.cache.get(key)
+        if audio is None:
+            started_at = perf_counter()
+            speech = np.frombuffer(b"".join(self.voice.synthesize_stream_raw(text)), dtype=np.int16)
+            resampled = resampy.resample(speech.astype(np.float32), self.voice.config.sample_rate, PYMUMBLE_SAMPLERATE)
+            audio = np.clip(resampled, -32768, 32767).astype(np.int16)
+            self.cache.put(key, text, audio)
+            self.logger.debug(f"Synthesized {len(text)} chars in {perf_counter() - started_at:.3f}s")
+
+        return Sentence(text=text, audio=audio, length=audio_length(audio, PYMUMBLE_SAMPLERATE))
+
+    @service
+    def cache_stats(self) -> Dict[str, int]:
+        return dict(self.cache.stats(), queued=self.jobs.qsize())
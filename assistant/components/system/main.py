@@ -24,7 +24,7 @@ class SystemIII(Component):
         self.logger.info(f"Plugin '{self.name}' initialized and ready")
 
         self.transcripts = Queue()
-        observe(self.transcripts, lambda args: self.process_transcript(*args))
+        observe(self.transcripts, lambda args: self.process_transcript(*args), name="system-transcripts")
 
     def shutdown(self) -> None:
         super().shutdown()
@@ -0,0 +1,254 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from enum import Enum
+from time import monotonic
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+
+import numpy as np
+import requests
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BreakerState(str, Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreakerConfig(BaseModel):
+    failure_threshold: int = Field(default=3, ge=1)
+    reset_timeout: float = Field(default=30.0, description="Seconds before an open breaker lets a probe through")
+
+
+class HealthCheckConfig(BaseModel):
+    enabled: bool = True
+    interval: float = 10.0
+    timeout: float = 2.0
+    path: str = "/health"
+
+
+class HedgingConfig(BaseModel):
+    enabled: bool = False
+    quantile: float = Field(default=0.95, gt=0.0, lt=1.0)
+    min_samples: int = Field(default=20, ge=1)
+
+
+class EndpointPoolConfig(BaseModel):
+    urls: List[str]
+    breaker: CircuitBreakerConfig = Field(default_factory=CircuitBreakerConfig)
+    health_check: HealthCheckConfig = Field(default_factory=HealthCheckConfig)
+    hedging: HedgingConfig = Field(default_factory=HedgingConfig)
+
+
+class NoEndpointAvailable(Exception):
+    pass
+
+
+class Endpoint:
+    LATENCY_WINDOW = 256
+
+    def __init__(self, url: str, breaker: CircuitBreakerConfig):
+        self.url = url.rstrip("/")
+        self.breaker = breaker
+        self.outstanding = 0
+        self.latencies: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.state = BreakerState.CLOSED
+        self.opened_at = 0.0
+        self.healthy = True
+
+    def available(self, now: float) -> bool:
+        if not self.healthy:
+            return False
+        if self.state == BreakerState.OPEN and now - self.opened_at >= self.breaker.reset_timeout:
+            self.state = BreakerState.HALF_OPEN
+        if self.state == BreakerState.HALF_OPEN:
+            # Only a single probe request at a time while half-open.
+            return self.outstanding == 0
+        return self.state == BreakerState.CLOSED
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.state = BreakerState.CLOSED
+
+    def record_failure(self, now: float):
+        self.consecutive_failures += 1
+        if (
+            self.state == BreakerState.HALF_OPEN
+            or self.consecutive_failures >= self.breaker.failure_threshold
+        ):
+            if self.state != BreakerState.OPEN:
+                logger.warning(f"Circuit opened for '{self.url}' after {self.consecutive_failures} failures")
+            self.state = BreakerState.OPEN
+            self.opened_at = now
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "state": self.state.value,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "consecutive_failures": self.consecutive_failures,
+            "p50": float(np.percentile(self.latencies, 50)) if self.latencies else None,
+            "p95": float(np.percentile(self.latencies, 95)) if self.latencies else None,
+        }
+
+
+def is_endpoint_fault(e: Exception) -> bool:
+    """Client errors (4xx) are caused by the request, not by the node serving it."""
+    response = getattr(e, "response", None)
+    return response is None or response.status_code >= 500
+
+
+class EndpointPool:
+    """Least-outstanding-requests balancing over a set of HTTP endpoints.
+
+    Failing nodes are taken out by a per-endpoint circuit breaker (passive) and a
+    periodic health probe (active). Optionally a request that runs longer than the
+    pool's latency quantile is hedged to a second endpoint, first response wins.
+    """
+
+    def __init__(self, config: EndpointPoolConfig, max_workers: int = 4):
+        if not config.urls:
+            raise ValueError("Endpoint pool needs at least one url")
+
+        self.config = config
+        self.endpoints = [Endpoint(url, config.breaker) for url in config.urls]
+        self.lock = threading.Lock()
+        # Room for a hedge next to every primary request.
+        self.executor = ThreadPoolExecutor(max_workers=max_workers * 2, thread_name_prefix="whisperx-request")
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._stopped = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+    def start(self) -> "EndpointPool":
+        if self.config.health_check.enabled:
+            self._health_thread = threading.Thread(target=self._health_loop, name="whisperx-health", daemon=True)
+            self._health_thread.start()
+        return self
+
+    def shutdown(self):
+        self._stopped.set()
+        self.executor.shutdown(wait=False)
+
+    def resize(self, max_workers: int):
+        """New requests go to a resized executor, those in flight finish on the old one."""
+        with self.lock:
+            previous = self.executor
+            self.executor = ThreadPoolExecutor(max_workers=max_workers * 2, thread_name_prefix="whisperx-request")
+        previous.shutdown(wait=False)
+
+    def _submit(self, endpoint: Endpoint, fn: Callable[[str], T]) -> Future:
+        # Under the lock, so a concurrent resize can't shut the executor down in between.
+        with self.lock:
+            return self.executor.submit(self._call, endpoint, fn)
+
+    def acquire(self, exclude: Optional[Endpoint] = None) -> Endpoint:
+        with self.lock:
+            now = monotonic()
+            candidates = [e for e in self.endpoints if e is not exclude and e.available(now)]
+            if not candidates:
+                raise NoEndpointAvailable("No healthy transcription endpoint available")
+
+            endpoint = min(candidates, key=lambda e: e.outstanding)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, latency: float, error: Optional[Exception] = None):
+        with self.lock:
+            endpoint.outstanding -= 1
+            if error is None:
+                endpoint.record_success(latency)
+            elif is_endpoint_fault(error):
+                endpoint.record_failure(monotonic())
+
+    def hedge_delay(self) -> Optional[float]:
+        hedging = self.config.hedging
+        if not hedging.enabled or len(self.endpoints) < 2:
+            return None
+
+        with self.lock:
+            latencies = [latency for e in self.endpoints for latency in e.latencies]
+
+        if len(latencies) < hedging.min_samples:
+            return None
+        return float(np.quantile(latencies, hedging.quantile))
+
+    def _call(self, endpoint: Endpoint, fn: Callable[[str], T]) -> T:
+        started_at = monotonic()
+        try:
+            result = fn(endpoint.url)
+        except Exception as e:
+            self.release(endpoint, monotonic() - started_at, e)
+            raise
+        self.release(endpoint, monotonic() - started_at)
+        return result
+
+    def request(self, fn: Callable[[str], T]) -> T:
+        """Run `fn(base_url)` against the pool and return the first successful result."""
+        primary = self.acquire()
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._call(primary, fn)
+
+        futures: Dict[Future, Endpoint] = {self._submit(primary, fn): primary}
+        done, pending = wait(futures, timeout=delay)
+
+        if not done:
+            try:
+                hedge = self.acquire(exclude=primary)
+            except NoEndpointAvailable:
+                hedge = None
+
+            if hedge is not None:
+                with self.lock:
+                    self.hedges_sent += 1
+                futures[self._submit(hedge, fn)] = hedge
+                pending = set(futures)
+
+        error: Optional[BaseException] = None
+        while pending or done:
+            if not done:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is None:
+                    if futures[future] is not primary:
+                        with self.lock:
+                            self.hedges_won += 1
+                    return future.result()
+                error = future.exception()
+            done = set()
+
+        assert error is not None
+        raise error
+
+    def _health_loop(self):
+        health = self.config.health_check
+        while not self._stopped.wait(health.interval):
+            for endpoint in self.endpoints:
+                try:
+                    response = requests.get(f"{endpoint.url}{health.path}", timeout=health.timeout)
+                    healthy = response.status_code < 500
+                except requests.exceptions.RequestException:
+                    healthy = False
+
+                if healthy != endpoint.healthy:
+                    logger.warning(f"Endpoint '{endpoint.url}' is now {'healthy' if healthy else 'unhealthy'}")
+                endpoint.healthy = healthy
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "endpoints": [e.stats() for e in self.endpoints],
+                "hedges_sent": self.hedges_sent,
+                "hedges_won": self.hedges_won,
+            }
@@ -1,10 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import io
-from queue import Queue
-from typing import List, Optional
+import threading
+from typing import Any, Dict, List, Optional
 
+import numpy as np
 import requests
 import soundfile as sf
+from numpy.typing import NDArray
 
 from assistant.config import (
     SPEECH_PIPELINE_SAMPLERATE,
@@ -13,8 +16,11 @@ from assistant.core import service
 from assistant.core.component import Component
 from assistant.components.mumble.mumble import SpeechSegment
 from assistant.core.config_manager import ConfigManager
-from assistant.utils.utils import observe
+from assistant.utils.workers import WorkerPool
+from .endpoints import EndpointPool, EndpointPoolConfig, NoEndpointAvailable
+from .scheduler import FairScheduler, SchedulerConfig
 from .types import Transcript
+from .windowing import WindowingConfig, split_windows, stitch
 from .events import (
     TRANSCRIPTION_SEGMENT_STARTED,
     TRANSCRIPTION_QUEUE_ADDED,
@@ -42,54 +48,138 @@ class TranscriberService(Component):
 
     def initialize(self) -> None:
         super().initialize()
-        self.speech_segments = Queue()
-        self.speech_segments_observer = observe(self.speech_segments, self.transcribe_segment, threaded=True, max_workers=4)
+        max_workers = self.get_config("max_workers", 4)
+        whisperx = self.get_config("whisperx", {})
+        self.endpoints = EndpointPool(
+            EndpointPoolConfig.model_validate(
+                {
+                    **whisperx,
+                    "urls": whisperx.get("urls") or [whisperx.get("url", "http://localhost:8000")],
+                }
+            ),
+            max_workers=max_workers,
+        ).start()
+
+        self.windowing = WindowingConfig.model_validate(self.get_config("windowing", {}))
+        # Held while a segment's windows are submitted, so the executor isn't swapped mid-way.
+        self.windows_lock = threading.Lock()
+        self.windows_executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="transcriber-window"
+        )
+
+        scheduler_config = SchedulerConfig.model_validate(self.get_config("scheduler", {}))
+        self.speech_segments = FairScheduler(scheduler_config)
+        self.speech_segments_workers = WorkerPool(
+            self.speech_segments,
+            self.transcribe_segment,
+            max_workers=max_workers,
+            name="transcriber",
+        ).start()
 
         self.logger.info(f"Plugin '{self.name}' initialized and ready")
 
+    def apply_config(self, previous: Dict[str, Any]) -> None:
+        max_workers = self.get_config("max_workers", 4)
+        scheduler_config = SchedulerConfig.model_validate(self.get_config("scheduler", {}))
+        windowing = WindowingConfig.model_validate(self.get_config("windowing", {}))
+        if not hasattr(self, "speech_segments"):
+            return
+
+        self.windowing = windowing
+        self.speech_segments.reconfigure(scheduler_config)
+        if max_workers != previous.get("max_workers", 4):
+            self.speech_segments_workers.resize(max_workers)
+            self.endpoints.resize(max_workers)
+            with self.windows_lock:
+                windows_executor, self.windows_executor = self.windows_executor, ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="transcriber-window"
+                )
+            # Windows already submitted still run to completion.
+            windows_executor.shutdown(wait=False)
+        if self.get_config("whisperx") != previous.get("whisperx"):
+            self.logger.warning("Changes to the 'whisperx' endpoints and breakers take effect on restart.")
+
     def shutdown(self) -> None:
         super().shutdown()
-        self.speech_segments_observer.dispose()
+        self.speech_segments_workers.shutdown()
+        self.windows_executor.shutdown(wait=False)
+        self.endpoints.shutdown()
         self.logger.info(f"Plugin '{self.name}' shutdown done.")
 
     def on_speech(self, segment: SpeechSegment):
         self.speech_segments.put_nowait(segment)
 
+    @service
+    def queue_stats(self) -> Dict[str, Any]:
+        return self.speech_segments.stats()
+
+    @service
+    def endpoint_stats(self) -> Dict[str, Any]:
+        return self.endpoints.stats()
+
     def transcribe_segment(self, segment: SpeechSegment):
         self.logger.info(f"-> {datetime.now() - segment.timestamp}")
         self.proxy(TRANSCRIPTION_SEGMENT_STARTED)(segment)
-        whisperx = self.get_config("whisperx", {})
 
         try:
-            audio = io.BytesIO()
-            sf.write(
-                audio,
-                segment.data,
-                SPEECH_PIPELINE_SAMPLERATE,
-                format="FLAC",
-            )
-            audio.seek(0)
+            duration = len(segment.data) / SPEECH_PIPELINE_SAMPLERATE
+            if self.windowing.enabled and duration > self.windowing.max_length:
+                transcript = self.transcribe_windowed(segment.data, duration)
+            else:
+                transcript = self.transcribe(segment.data)
+
+            self.proxy(TRANSCRIPTION_SEGMENT_DONE)(segment, transcript)
+
+        except (requests.exceptions.RequestException, NoEndpointAvailable) as e:
+            self.logger.error(f"Failed to process transcription request: {str(e)}")
+            raise Exception("Transcription failed due to network or connection issues")
+
+    def transcribe_windowed(self, data: NDArray[np.int16], duration: float) -> Transcript:
+        """Transcribe overlapping windows concurrently and stitch them back together."""
+        windows = split_windows(
+            len(data), SPEECH_PIPELINE_SAMPLERATE, self.windowing.window, self.windowing.overlap
+        )
+        self.logger.info(f"Splitting {duration:.1f}s segment into {len(windows)} windows")
+
+        # The executor is replaced when max_workers changes, submit all windows to one.
+        with self.windows_lock:
+            futures = [self.windows_executor.submit(self.transcribe, data[start:end]) for start, end in windows]
+        parts = [
+            (start / SPEECH_PIPELINE_SAMPLERATE, future.result())
+            for (start, _), future in zip(windows, futures)
+        ]
+        return stitch(parts, self.windowing.overlap, duration)
+
+    def transcribe(self, data: NDArray[np.int16]) -> Transcript:
+        whisperx = self.get_config("whisperx", {})
 
-            url = whisperx.get("url", "http://localhost:8000")
+        audio = io.BytesIO()
+        sf.write(
+            audio,
+            data,
+            SPEECH_PIPELINE_SAMPLERATE,
+            format="FLAC",
+        )
+        payload = audio.getvalue()
 
+        def post(url: str) -> requests.Response:
             response = requests.post(
                 f"{url}/transcribe",
-                files={"file": ("audio.flac", audio, "audio/flac")},
+                files={"file": ("audio.flac", io.BytesIO(payload), "audio/flac")},
                 data={
                     "whisper_model": whisperx.get("model", "small"),
                     "diarize": whisperx.get("diarize", False),
                     "align_words": whisperx.get("align", False),
                 },
+                timeout=whisperx.get("timeout", 120),
             )
 
             if not response.status_code == 200:
                 raise requests.exceptions.HTTPError(
-                    f"Transcription failed with status code: {response.status_code}"
+                    f"Transcription failed with status code: {response.status_code}",
+                    response=response,
                 )
+            return response
 
-            transcript = Transcript.model_validate(response.json())
-            self.proxy(TRANSCRIPTION_SEGMENT_DONE)(segment, transcript)
-
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Failed to process transcription request: {str(e)}")
-            raise Exception("Transcription failed due to network or connection issues")
+        response = self.endpoints.request(post)
+        return Transcript.model_validate(response.json())
@@ -0,0 +1,306 @@
+import logging
+import os
+import struct
+import threading
+from collections import Counter, OrderedDict, deque
+from dataclasses import replace
+from datetime import datetime
+from enum import Enum
+from queue import Empty
+from time import monotonic
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from assistant.components.mumble.mumble import SpeechSegment
+
+logger = logging.getLogger(__name__)
+
+
+class SheddingPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    MERGE = "merge"
+    SPILL = "spill"
+
+
+class SchedulingClass(BaseModel):
+    """Group of sources sharing a priority level and a fair-share weight."""
+
+    name: str
+    priority: int = Field(default=0, description="Lower value is served first")
+    weight: int = Field(default=1, ge=1)
+    sources: List[str] = Field(default_factory=list)
+    max_age: Optional[float] = Field(
+        default=None, description="Seconds since SpeechSegment.timestamp after which a segment is shed"
+    )
+
+
+class SchedulerConfig(BaseModel):
+    default_class: str = "live"
+    classes: List[SchedulingClass] = Field(
+        default_factory=lambda: [
+            SchedulingClass(name="live", priority=0, max_age=30.0),
+            SchedulingClass(name="batch", priority=1, sources=["watchdog"]),
+        ]
+    )
+    max_depth: Optional[int] = Field(default=None, ge=1)
+    policy: SheddingPolicy = SheddingPolicy.DROP_OLDEST
+    spill_dir: str = "/tmp/transcriber-spill"
+
+
+# (enqueued_at, segment)
+Entry = Tuple[float, SpeechSegment]
+
+
+class _ClassQueue:
+    def __init__(self, spec: SchedulingClass):
+        self.spec = spec
+        self.sources: "OrderedDict[str, Deque[Entry]]" = OrderedDict()
+        self.current_weight = 0
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self.sources.values())
+
+    def put(self, entry: Entry):
+        # By speaker, the same name on two connections is two people.
+        self.sources.setdefault(entry[1].speaker, deque()).append(entry)
+
+    def pop(self) -> Entry:
+        # Round-robin across speakers: serve the head source, then rotate it to the back.
+        source, queue = next(iter(self.sources.items()))
+        entry = queue.popleft()
+        del self.sources[source]
+        if queue:
+            self.sources[source] = queue
+        return entry
+
+    def oldest_source(self, min_items: int = 1) -> Optional[str]:
+        candidates = [(q[0][1].timestamp, s) for s, q in self.sources.items() if len(q) >= min_items]
+        return min(candidates)[1] if candidates else None
+
+    def pop_oldest(self) -> Entry:
+        source = self.oldest_source()
+        assert source is not None
+        queue = self.sources[source]
+        entry = queue.popleft()
+        if not queue:
+            del self.sources[source]
+        return entry
+
+
+class FairScheduler:
+    """Queue replacement for speech segments with per-class priority and fairness.
+
+    Classes are served by strict priority; classes sharing a priority level split
+    workers by smooth weighted round-robin; sources inside a class take turns.
+    Segments older than their class `max_age` are shed on dequeue and, when
+    `max_depth` is reached, the lowest priority class sheds by `policy`.
+    Implements the subset of `queue.Queue` used by `WorkerPool`.
+    """
+
+    WAIT_WINDOW = 1024
+
+    def __init__(self, config: Optional[SchedulerConfig] = None):
+        self.config = config or SchedulerConfig()
+        self.classes: Dict[str, _ClassQueue] = {
+            spec.name: _ClassQueue(spec) for spec in self.config.classes
+        }
+        if self.config.default_class not in self.classes:
+            raise ValueError(f"Unknown default scheduling class '{self.config.default_class}'")
+
+        self.class_for_source: Dict[str, str] = {
+            source: spec.name for spec in self.config.classes for source in spec.sources
+        }
+        self._size = 0
+        self._not_empty = threading.Condition()
+
+        self.shed: Counter = Counter()
+        self.waits: Deque[float] = deque(maxlen=self.WAIT_WINDOW)
+        self.max_wait = 0.0
+        self.dequeued = 0
+
+        if self.config.policy == SheddingPolicy.SPILL:
+            os.makedirs(self.config.spill_dir, exist_ok=True)
+
+    def reconfigure(self, config: SchedulerConfig):
+        """Applies new classes and limits in place.
+
+        Queued segments keep their class if it still exists and are reclassified
+        otherwise. A lowered `max_depth` sheds the excess right away.
+        """
+        if config.default_class not in {spec.name for spec in config.classes}:
+            raise ValueError(f"Unknown default scheduling class '{config.default_class}'")
+
+        with self._not_empty:
+            classes = {}
+            for spec in config.classes:
+                queue = classes[spec.name] = self.classes.get(spec.name) or _ClassQueue(spec)
+                queue.spec = spec
+            orphans = [queue for name, queue in self.classes.items() if name not in classes]
+
+            self.config = config
+            self.classes = classes
+            self.class_for_source = {source: spec.name for spec in config.classes for source in spec.sources}
+            for queue in orphans:
+                for entries in queue.sources.values():
+                    for entry in entries:
+                        self.classes[self.classify(entry[1])].put(entry)
+
+            if config.policy == SheddingPolicy.SPILL:
+                os.makedirs(config.spill_dir, exist_ok=True)
+            while config.max_depth is not None and self._size > config.max_depth:
+                self._shed_overflow()
+
+    def classify(self, segment: SpeechSegment) -> str:
+        return self.class_for_source.get(segment.source, self.config.default_class)
+
+    def put(self, segment: SpeechSegment, block: bool = True, timeout: Optional[float] = None):
+        """Never blocks: a full scheduler sheds instead of applying backpressure."""
+        with self._not_empty:
+            self.classes[self.classify(segment)].put((monotonic(), segment))
+            self._size += 1
+            if self.config.max_depth is not None and self._size > self.config.max_depth:
+                self._shed_overflow()
+            self._not_empty.notify()
+
+    def put_nowait(self, segment: SpeechSegment):
+        self.put(segment, block=False)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> SpeechSegment:
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._not_empty:
+            while True:
+                if not self._size:
+                    self._unspill()
+
+                if not block:
+                    if not self._size:
+                        raise Empty
+                elif deadline is None:
+                    while not self._size:
+                        self._not_empty.wait()
+                else:
+                    while not self._size:
+                        remaining = deadline - monotonic()
+                        if remaining <= 0.0:
+                            raise Empty
+                        self._not_empty.wait(remaining)
+
+                queue = self._select()
+                enqueued_at, segment = queue.pop()
+                self._size -= 1
+
+                if self._is_expired(queue.spec, segment):
+                    self.shed[f"{queue.spec.name}.expired"] += 1
+                    continue
+
+                wait = monotonic() - enqueued_at
+                self.waits.append(wait)
+                self.max_wait = max(self.max_wait, wait)
+                self.dequeued += 1
+                return segment
+
+    def get_nowait(self) -> SpeechSegment:
+        return self.get(block=False)
+
+    def _select(self) -> _ClassQueue:
+        ready = [c for c in self.classes.values() if c.sources]
+        top = min(c.spec.priority for c in ready)
+        candidates = [c for c in ready if c.spec.priority == top]
+
+        total = 0
+        for c in candidates:
+            c.current_weight += c.spec.weight
+            total += c.spec.weight
+
+        chosen = max(candidates, key=lambda c: c.current_weight)
+        chosen.current_weight -= total
+        return chosen
+
+    @staticmethod
+    def _is_expired(spec: SchedulingClass, segment: SpeechSegment) -> bool:
+        if spec.max_age is None:
+            return False
+        return (datetime.now() - segment.timestamp).total_seconds() > spec.max_age
+
+    def _shed_overflow(self):
+        victim = max((c for c in self.classes.values() if c.sources), key=lambda c: c.spec.priority)
+        policy = self.config.policy
+
+        if policy == SheddingPolicy.MERGE:
+            source = victim.oldest_source(min_items=2)
+            if source is not None:
+                queue = victim.sources[source]
+                first_at, first = queue.popleft()
+                _, second = queue.popleft()
+                merged = replace(first, data=np.concatenate((first.data, second.data)))
+                queue.appendleft((first_at, merged))
+                self._size -= 1
+                self.shed[f"{victim.spec.name}.merged"] += 1
+                return
+
+        _, segment = victim.pop_oldest()
+        self._size -= 1
+
+        if policy == SheddingPolicy.SPILL:
+            self._spill(segment)
+            self.shed[f"{victim.spec.name}.spilled"] += 1
+        else:
+            self.shed[f"{victim.spec.name}.dropped"] += 1
+
+    def _spill(self, segment: SpeechSegment):
+        # Sortable by time, and the segment's own encoding keeps id and connection.
+        name = f"{segment.timestamp.timestamp():.6f}-{segment.id}.seg"
+        with open(os.path.join(self.config.spill_dir, name), "wb") as f:
+            f.writelines(segment.to_buffers())
+
+    def _unspill(self):
+        if self.config.policy != SheddingPolicy.SPILL:
+            return
+
+        files = sorted(f for f in os.listdir(self.config.spill_dir) if f.endswith(".seg"))
+        if not files:
+            return
+
+        path = os.path.join(self.config.spill_dir, files[0])
+        try:
+            with open(path, "rb") as f:
+                segment = SpeechSegment.from_bytes(f.read())
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"Failed to restore spilled segment '{path}': {e}")
+            segment = None
+        finally:
+            os.remove(path)
+
+        if segment is not None:
+            self.classes[self.classify(segment)].put((monotonic(), segment))
+            self._size += 1
+
+    def task_done(self):
+        pass
+
+    def qsize(self) -> int:
+        with self._not_empty:
+            return self._size
+
+    def empty(self) -> bool:
+        return not self.qsize()
+
+    def depth_by_class(self) -> Dict[str, int]:
+        with self._not_empty:
+            return {name: len(c) for name, c in self.classes.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._not_empty:
+            waits = list(self.waits)
+            return {
+                "depth": {name: len(c) for name, c in self.classes.items()},
+                "shed": dict(self.shed),
+                "dequeued": self.dequeued,
+                "wait": {
+                    "p50": float(np.percentile(waits, 50)) if waits else None,
+                    "p95": float(np.percentile(waits, 95)) if waits else None,
+                    "max": self.max_wait,
+                },
+            }
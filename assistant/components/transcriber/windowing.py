@@ -0,0 +1,93 @@
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from pydantic import BaseModel, Field
+
+from .types import Segment, Speaker, Transcript, Word
+
+
+class WindowingConfig(BaseModel):
+    enabled: bool = True
+    max_length: float = Field(default=30.0, description="Segments longer than this (seconds) are split")
+    window: float = Field(default=20.0, gt=0.0)
+    overlap: float = Field(default=2.0, ge=0.0)
+
+
+def split_windows(samples: int, samplerate: int, window: float, overlap: float) -> List[Tuple[int, int]]:
+    """Sample ranges `[start, end)` of overlapping windows covering `samples`."""
+    size = int(window * samplerate)
+    step = size - int(overlap * samplerate)
+    if step <= 0:
+        raise ValueError("Window overlap must be shorter than the window")
+
+    windows = []
+    start = 0
+    while True:
+        end = min(start + size, samples)
+        windows.append((start, end))
+        if end >= samples:
+            return windows
+        start += step
+
+
+def _keep(start: float, end: float, lo: float, hi: float) -> bool:
+    middle = (start + end) / 2
+    return lo <= middle < hi
+
+
+def _shift(words: List[Word], offset: float) -> List[Word]:
+    return [Word(word=w.word, start=w.start + offset, end=w.end + offset) for w in words]
+
+
+def stitch(parts: List[Tuple[float, Transcript]], overlap: float, duration: float) -> Transcript:
+    """Merge per-window transcripts into one, de-duplicating the overlaps.
+
+    `parts` are `(offset, transcript)` pairs ordered by offset. Each window owns the
+    audio up to the middle of its overlap with the next window; words (or whole
+    segments, if the server did not align words) are kept by the window that owns
+    their midpoint.
+    """
+    segments: List[Segment] = []
+    speakers: Dict[str, Speaker] = {}
+    languages: Counter = Counter()
+
+    for i, (offset, transcript) in enumerate(parts):
+        lo = offset + overlap / 2 if i > 0 else float("-inf")
+        hi = parts[i + 1][0] + overlap / 2 if i + 1 < len(parts) else float("inf")
+        languages[transcript.language] += transcript.duration
+
+        for segment in transcript.segments:
+            start, end = segment.start + offset, segment.end + offset
+
+            if segment.words:
+                words = [w for w in _shift(segment.words, offset) if _keep(w.start, w.end, lo, hi)]
+                if not words:
+                    continue
+                segments.append(
+                    Segment(
+                        text=" ".join(w.word.strip() for w in words),
+                        start=words[0].start,
+                        end=words[-1].end,
+                        speaker=segment.speaker,
+                        words=words,
+                    )
+                )
+            elif _keep(start, end, lo, hi):
+                segments.append(
+                    Segment(text=segment.text, start=start, end=end, speaker=segment.speaker)
+                )
+
+        # NOTE: Diarization labels are local to a window, so they are only merged by label.
+        for speaker in transcript.speakers:
+            if speaker.label in speakers:
+                speakers[speaker.label].total_time += speaker.total_time
+            else:
+                speakers[speaker.label] = speaker.model_copy()
+
+    return Transcript(
+        transcript=" ".join(s.text.strip() for s in segments),
+        language=languages.most_common(1)[0][0] if languages else "",
+        duration=duration,
+        speakers=list(speakers.values()),
+        segments=segments,
+    )
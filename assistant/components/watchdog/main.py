@@ -62,6 +62,7 @@ class Watchdog(Component):
         assert isinstance(watch_list, list)
 
         observer = Observer()
+        observer.name = "watchdog-observer"
         for item in watch_list:
             item = WatchDirectory.model_validate(item)
             if os.path.exists(item.path):
@@ -73,7 +74,7 @@ class Watchdog(Component):
         observer.start()
         self.file_events = Queue()
         self.file_events_observer = observe(
-            self.file_events, lambda item: self.categorize_files(*item)
+            self.file_events, lambda item: self.categorize_files(*item), name="watchdog-files"
         )
         self.vad_filter = VadFilter(self.on_speech)
 
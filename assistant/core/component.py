@@ -3,7 +3,8 @@ import logging
 from abc import ABC, abstractmethod
 import inspect
 
-from assistant.core.config_manager import ConfigManager
+from assistant.core.config_manager import ConfigManager, merge_config
+from assistant.core.service import service
 from assistant.utils.utils import title_to_snake
 
 
@@ -14,6 +15,9 @@ class Component(ABC):
         self._name = name or title_to_snake(self.__class__.__name__)
 
         self.config = config.get_plugin_config(self.name) if config else {}
+        self.config_manager = config
+        if config:
+            config.subscribe(self.name, self.reconfigure)
         self.logger = logging.getLogger(f"component.{name}")
         self.logger.setLevel(logging.INFO)
         self.event_handlers: Dict[str, List[Callable]] = {}
@@ -73,3 +77,30 @@ class Component(ABC):
     def get_config(self, key: str, default: Any = None) -> Any:
         """Get a configuration value for this plugin."""
         return self.config.get(key, default)
+
+    def reconfigure(self, config: Dict[str, Any]) -> None:
+        """Swaps in a changed configuration and applies it, restoring the previous one if that fails."""
+        previous, self.config = self.config, config
+        try:
+            self.apply_config(previous)
+        except Exception:
+            self.config = previous
+            raise
+        self.logger.info(f"Applied configuration changes to '{self.name}'")
+
+    def apply_config(self, previous: Dict[str, Any]) -> None:  # noqa: B027 - optional hook, not abstract
+        """Applies `self.config` to the running component, in place.
+
+        Settings a component doesn't apply here take effect on the next restart.
+        Validate everything before changing any state, raising rejects the change.
+        """
+        pass
+
+    @service
+    def update_config(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Merges `changes` into this plugin's configuration and applies it without a restart."""
+        if self.config_manager:
+            self.config_manager.update_plugin_config(self.name, changes)
+        else:
+            self.reconfigure(merge_config(self.config, changes))
+        return self.config
@@ -1,13 +1,40 @@
+import copy
+import logging
 import os
-from typing import Any
+import threading
+from typing import Any, Callable, Optional
 
 import yaml
 
+logger = logging.getLogger(__name__)
+
+ConfigListener = Callable[[dict[str, Any]], None]
+
+
+def merge_config(base: dict[str, Any], changes: dict[str, Any]) -> dict[str, Any]:
+    """Copy of `base` with `changes` merged into nested sections. A `None` value removes the key."""
+    merged = copy.deepcopy(base)
+    for key, value in changes.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
 
 class ConfigManager:
     def __init__(self, config_path: str = "config.yaml"):
         self.config_path = config_path
         self.config = self._load_config()
+        self.lock = threading.RLock()
+        # Changes made at runtime, kept on top of the file across reloads.
+        self.overrides: dict[str, dict[str, Any]] = {}
+        self.listeners: dict[str, list[ConfigListener]] = {}
+        self._modified_at = self._get_modified_at()
+        self._stopped = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
 
     def _load_config(self) -> dict[str, Any]:
         """Load configuration from YAML file."""
@@ -17,6 +44,12 @@ class ConfigManager:
         with open(self.config_path) as file:
             return yaml.safe_load(file) or {"system": {}, "plugins": {}}
 
+    def _get_modified_at(self) -> Optional[float]:
+        try:
+            return os.stat(self.config_path).st_mtime
+        except FileNotFoundError:
+            return None
+
     def get_system_config(self) -> dict[str, Any]:
         """Get system-wide configuration."""
         return self.config.get("system", {})
@@ -24,9 +57,88 @@ class ConfigManager:
     def get_plugin_config(self, plugin_name: str) -> dict[str, Any]:
         """Get configuration for a specific plugin."""
         plugins_config = self.config.get("plugins", {})
-        return plugins_config.get(plugin_name, {})
+        plugin_config = plugins_config.get(plugin_name, {})
+        if plugin_name in self.overrides:
+            return merge_config(plugin_config, self.overrides[plugin_name])
+        return plugin_config
 
     def is_plugin_enabled(self, plugin_name: str) -> bool:
         """Check if a plugin is enabled in the configuration."""
         plugin_config = self.get_plugin_config(plugin_name)
         return plugin_config.get("enabled", False)
+
+    def subscribe(self, plugin_name: str, listener: ConfigListener):
+        """Calls `listener` with the full plugin configuration whenever it changes."""
+        with self.lock:
+            self.listeners.setdefault(plugin_name, []).append(listener)
+
+    def _notify(self, plugin_name: str, plugin_config: dict[str, Any]):
+        for listener in self.listeners.get(plugin_name, []):
+            listener(plugin_config)
+
+    def update_plugin_config(self, plugin_name: str, changes: dict[str, Any]) -> dict[str, Any]:
+        """Merges `changes` into a plugin's configuration at runtime, without touching the file.
+
+        If a listener rejects the new configuration, the change is rolled back and the
+        error is raised to the caller.
+        """
+        with self.lock:
+            previous = self.overrides.get(plugin_name)
+            self.overrides[plugin_name] = merge_config(previous or {}, changes)
+            plugin_config = self.get_plugin_config(plugin_name)
+            try:
+                self._notify(plugin_name, plugin_config)
+            except Exception:
+                if previous is None:
+                    del self.overrides[plugin_name]
+                else:
+                    self.overrides[plugin_name] = previous
+                raise
+            logger.info(f"Updated configuration of '{plugin_name}': {changes}")
+            return plugin_config
+
+    def reload(self) -> list[str]:
+        """Re-reads the file and notifies the plugins whose configuration changed."""
+        with self.lock:
+            self._modified_at = self._get_modified_at()
+            try:
+                config = self._load_config()
+            except (OSError, yaml.YAMLError) as e:
+                logger.error(f"Keeping the current configuration, failed to load '{self.config_path}': {e}")
+                return []
+
+            names = set(self.config.get("plugins", {})) | set(config.get("plugins", {}))
+            previous = {name: self.get_plugin_config(name) for name in names}
+            self.config = config
+
+            changed = []
+            for name in sorted(names):
+                plugin_config = self.get_plugin_config(name)
+                if plugin_config == previous[name]:
+                    continue
+                changed.append(name)
+                try:
+                    self._notify(name, plugin_config)
+                except Exception as e:
+                    logger.error(f"Plugin '{name}' rejected the reloaded configuration: {e}")
+            if changed:
+                logger.info(f"Reloaded '{self.config_path}', changed: {changed}")
+            return changed
+
+    def watch(self, interval: float = 2.0) -> "ConfigManager":
+        """Reloads the file whenever its modification time changes, checked every `interval` seconds."""
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="config-watcher", daemon=True)
+        self._watcher.start()
+        return self
+
+    def _watch(self, interval: float):
+        while not self._stopped.wait(interval):
+            if self._get_modified_at() == self._modified_at:
+                continue
+            try:
+                self.reload()
+            except Exception as e:
+                logger.exception(f"Reloading '{self.config_path}' failed: {e}")
+
+    def stop_watching(self):
+        self._stopped.set()
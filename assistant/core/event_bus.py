@@ -28,7 +28,7 @@ class EventBus:
         self.services: Dict[
             str, Dict[str, ServiceInfo]
         ] = {}  # component_name -> {service_name -> ServiceInfo}
-        self.thread_pool = ThreadPoolExecutor(max_workers=10)
+        self.thread_pool = ThreadPoolExecutor(max_workers=10, thread_name_prefix="event-bus")
         self.pending_calls: Dict[str, Future] = {}  # request_id -> Future
 
     def register_event(self, event_id: str, component_name: str) -> bool:
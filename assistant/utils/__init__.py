@@ -3,4 +3,7 @@ from .audio import (
     chop_audio,
     enrich_with_silence,
 )
-from .utils import ensure_model_exists, event_context, observe
+from .dispatch import DispatchConfig, SourceDispatcher
+from .models import PullProgress, ensure_model_exists
+from .utils import event_context, observe
+from .workers import WorkerPool
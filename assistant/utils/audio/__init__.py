@@ -1,5 +1,5 @@
 import numpy as np
-from .vad import VadFilter
+from .vad import VadConfig, VadFilter, VadPool
 
 
 def audio_length(audio_data: np.ndarray, samplerate: int) -> int:
@@ -1,9 +1,54 @@
-from typing import Callable
+import threading
+from typing import Callable, List, Optional
+from pydantic import BaseModel, ConfigDict, Field
 from pysilero_vad import SileroVoiceActivityDetector
 import numpy as np
 from collections import deque
 
 
+class VadConfig(BaseModel):
+    """Speech detection thresholds, counted in chunks. Frozen, so a filter can swap them in one assignment."""
+
+    model_config = ConfigDict(frozen=True)
+
+    min_speech: int = Field(default=4, ge=1, description="Speech chunks that start an utterance")
+    silence_end: int = Field(default=8, ge=1, description="Silent chunks in a row that end it")
+    speech_threshold: float = Field(default=0.5, ge=0, le=1)
+
+
+class VadPool:
+    """Reuses loaded VAD models instead of loading one for every speaker.
+
+    Released detectors are reset and kept, up to `max_idle` of them, for the
+    next `acquire`.
+    """
+
+    def __init__(self, max_idle: int = 8):
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self.idle: List[SileroVoiceActivityDetector] = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self) -> SileroVoiceActivityDetector:
+        with self.lock:
+            if self.idle:
+                self.reused += 1
+                return self.idle.pop()
+            self.created += 1
+        return SileroVoiceActivityDetector()
+
+    def release(self, vad: SileroVoiceActivityDetector):
+        vad.reset()
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(vad)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"created": self.created, "reused": self.reused, "idle": len(self.idle)}
+
+
 class VadFilter:
     def __init__(
         self,
@@ -12,14 +57,20 @@ class VadFilter:
         silence_end: int = 8,
         speech_threshold: float = 0.5,
         preroll_size: int = 5,
+        vad: Optional[SileroVoiceActivityDetector] = None,
+        config: Optional[VadConfig] = None,
+        on_start: Optional[Callable[[], None]] = None,
     ):
-        self.vad = SileroVoiceActivityDetector()
+        self.vad = vad or SileroVoiceActivityDetector()
 
         self.callback = callback
+        # Called as soon as speech is detected, long before `callback` gets the whole utterance.
+        self.on_start = on_start
 
-        self.min_speech = min_speech
-        self.silence_end = silence_end
-        self.speech_threshold = speech_threshold
+        # Replaced as a whole to retune a running filter, read once per chunk.
+        self.config = config or VadConfig(
+            min_speech=min_speech, silence_end=silence_end, speech_threshold=speech_threshold
+        )
         self.preroll_size = preroll_size
 
         self.speech_count = 0
@@ -29,16 +80,35 @@ class VadFilter:
         self.current_speech = bytearray()
         self.preroll_buffer = deque(maxlen=preroll_size)
 
+    def flush(self) -> bool:
+        """Emits speech in progress, e.g. when the source stopped sending audio mid-utterance."""
+        flushed = self.speaking and bool(self.current_speech)
+        if flushed and self.callback and callable(self.callback):
+            self.callback(bytes(self.current_speech))
+        self.reset()
+        return flushed
+
+    def reset(self):
+        self.vad.reset()
+        self.speech_count = 0
+        self.silence_count = 0
+        self.speaking = False
+        self.current_speech = bytearray()
+        self.preroll_buffer.clear()
+
     def __call__(self, chunk: np.ndarray) -> bool:
+        config = self.config
         self.preroll_buffer.append(chunk.copy())
-        is_speech = self.vad(chunk.tobytes()) >= self.speech_threshold
+        is_speech = self.vad(chunk.tobytes()) >= config.speech_threshold
 
         if is_speech:
             self.speech_count += 1
             self.silence_count = 0
 
-            if self.speech_count == self.min_speech:
+            if not self.speaking and self.speech_count >= config.min_speech:
                 self.speaking = True
+                if self.on_start:
+                    self.on_start()
 
                 # First, add all the preroll chunks to the speech buffer
                 for preroll_chunk in self.preroll_buffer:
@@ -54,7 +124,7 @@ class VadFilter:
             if self.speaking:
                 self.current_speech.extend(chunk)
 
-                if self.silence_count >= self.silence_end:
+                if self.silence_count >= config.silence_end:
                     if self.callback and callable(self.callback):
                         self.callback(bytes(self.current_speech))
 
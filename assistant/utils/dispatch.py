@@ -0,0 +1,135 @@
+import logging
+import threading
+from collections import deque
+from queue import Queue
+from typing import Any, Callable, Deque, Dict
+
+from pydantic import BaseModel, Field
+
+from .workers import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchConfig(BaseModel):
+    workers: int = Field(default=2, ge=1)
+    max_queue: int = Field(default=200, ge=1, description="Items kept per source before the oldest is dropped")
+    max_batch: int = Field(default=16, ge=1, description="Items a worker handles for one source before rotating")
+
+
+class _SourceState:
+    def __init__(self, max_queue: int):
+        self.items: Deque[Any] = deque(maxlen=max_queue)
+        self.scheduled = False
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+
+
+class SourceDispatcher:
+    """Hands work off from a latency-sensitive thread to a pool of workers.
+
+    `submit` never blocks: each source has a bounded queue and when it is full the
+    oldest item is dropped and counted. A source is handled by at most one worker at
+    a time, so its items are processed in order, while different sources run in
+    parallel. Workers rotate between sources every `max_batch` items.
+    """
+
+    def __init__(self, handler: Callable[[str, Any], None], config: DispatchConfig, name: str = "dispatch"):
+        self.handler = handler
+        self.config = config
+        self.lock = threading.Lock()
+        self.sources: Dict[str, _SourceState] = {}
+        self.ready: Queue = Queue()
+        self.pool = WorkerPool(self.ready, self._drain, max_workers=config.workers, name=name)
+
+    def start(self) -> "SourceDispatcher":
+        self.pool.start()
+        return self
+
+    def shutdown(self, wait: bool = False):
+        self.pool.shutdown(wait=wait)
+
+    def submit(self, source: str, item: Any) -> bool:
+        """Queues `item` for `source`. Returns False if an older item was dropped to make room."""
+        with self.lock:
+            state = self.sources.get(source)
+            if state is None:
+                state = self.sources[source] = _SourceState(self.config.max_queue)
+
+            accepted = len(state.items) < self.config.max_queue
+            if not accepted:
+                state.dropped += 1
+            state.items.append(item)
+            state.enqueued += 1
+
+            if not state.scheduled:
+                state.scheduled = True
+                self.ready.put(source)
+        return accepted
+
+    def _drain(self, source: str):
+        for _ in range(self.config.max_batch):
+            with self.lock:
+                state = self.sources[source]
+                if not state.items:
+                    state.scheduled = False
+                    return
+                item = state.items.popleft()
+
+            try:
+                self.handler(source, item)
+            except Exception as e:
+                # Keep draining, one bad chunk must not stall the source.
+                logger.exception(f"Handling item from '{source}' failed: {e}")
+                with self.lock:
+                    state.failed += 1
+            with self.lock:
+                state.processed += 1
+
+        # More work left: go to the back of the line so other sources get a turn.
+        with self.lock:
+            if state.items:
+                self.ready.put(source)
+            else:
+                state.scheduled = False
+
+    def reconfigure(self, config: DispatchConfig):
+        """Applies new limits to the running dispatcher. Queues over a lowered `max_queue` drop their oldest items."""
+        with self.lock:
+            if config.max_queue != self.config.max_queue:
+                for state in self.sources.values():
+                    state.dropped += max(0, len(state.items) - config.max_queue)
+                    state.items = deque(state.items, maxlen=config.max_queue)
+            self.config = config
+        self.pool.resize(config.workers)
+
+    def pending(self, source: str) -> int:
+        with self.lock:
+            state = self.sources.get(source)
+            return len(state.items) if state else 0
+
+    def forget(self, source: str) -> bool:
+        """Drops the state of an idle source. Returns False if it still has work queued."""
+        with self.lock:
+            state = self.sources.get(source)
+            if state is None:
+                return True
+            if state.items or state.scheduled:
+                return False
+            del self.sources[source]
+            return True
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self.lock:
+            return {
+                source: {
+                    "queued": len(state.items),
+                    "enqueued": state.enqueued,
+                    "processed": state.processed,
+                    "dropped": state.dropped,
+                    "failed": state.failed,
+                }
+                for source, state in self.sources.items()
+            }
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Set, Tuple, Union
+
+from ollama import Client
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_TTL = 300.0
+
+
+class PullProgress(BaseModel):
+    model: str
+    status: str
+    completed: Optional[int] = None
+    total: Optional[int] = None
+
+    @property
+    def fraction(self) -> Optional[float]:
+        return self.completed / self.total if self.completed is not None and self.total else None
+
+
+def canonical_name(model: str) -> str:
+    """Ollama lists untagged models as ':latest'."""
+    return model if ":" in model else f"{model}:latest"
+
+
+class ModelInventory:
+    """Models available on one Ollama server, listed at most once per `ttl` seconds."""
+
+    def __init__(self, client: Client, ttl: float = INVENTORY_TTL):
+        self.client = client
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.models: Set[str] = set()
+        self.listed_at: Optional[float] = None
+
+    def __contains__(self, model: str) -> bool:
+        with self.lock:
+            if self.listed_at is None or time.monotonic() - self.listed_at > self.ttl:
+                self.models = {item["model"] for item in self.client.list().get("models")}
+                self.listed_at = time.monotonic()
+            return canonical_name(model) in self.models
+
+    def add(self, model: str):
+        with self.lock:
+            self.models.add(canonical_name(model))
+
+
+_lock = threading.Lock()
+_clients: Dict[str, Client] = {}
+_inventories: Dict[str, ModelInventory] = {}
+_preparing: Dict[Tuple[str, str], threading.Event] = {}
+
+
+def get_client(base_url: str) -> Client:
+    with _lock:
+        if base_url not in _clients:
+            _clients[base_url] = Client(base_url)
+        return _clients[base_url]
+
+
+def get_inventory(base_url: str) -> ModelInventory:
+    client = get_client(base_url)
+    with _lock:
+        if base_url not in _inventories:
+            _inventories[base_url] = ModelInventory(client)
+        return _inventories[base_url]
+
+
+def _pull(client: Client, model: str, on_progress: Optional[Callable[[PullProgress], None]]):
+    last: Optional[PullProgress] = None
+    for item in client.pull(model, stream=True):
+        progress = PullProgress(
+            model=model, status=item.get("status"), completed=item.get("completed"), total=item.get("total")
+        )
+        # Report status changes and whole-percent steps, not every chunk.
+        step = int((progress.fraction or 0) * 100)
+        if last is None or progress.status != last.status or step > int((last.fraction or 0) * 100):
+            last = progress
+            logger.info(f"Pulling '{model}': {progress.status} {step}%")
+            if on_progress is not None:
+                on_progress(progress)
+
+
+def ensure_model_exists(
+    base_url: str,
+    model: str,
+    on_progress: Optional[Callable[[PullProgress], None]] = None,
+    warmup: bool = False,
+    keep_alive: Union[float, str, None] = None,
+) -> threading.Event:
+    """Makes `model` available on the server at `base_url` without blocking the caller.
+
+    A missing model is pulled and, with `warmup`, loaded into memory on a background
+    thread. The returned event is set when that is finished, failures are logged and
+    surface on the first real request. Concurrent calls for the same model share it.
+    """
+    key = (base_url, canonical_name(model))
+    with _lock:
+        if key in _preparing:
+            return _preparing[key]
+        ready = _preparing[key] = threading.Event()
+
+    def prepare():
+        client = get_client(base_url)
+        try:
+            inventory = get_inventory(base_url)
+            if model not in inventory:
+                logger.warning(f"Model '{model}' does not exists. Downloading.")
+                _pull(client, model, on_progress)
+                inventory.add(model)
+
+            if warmup:
+                started_at = time.perf_counter()
+                # A generate request without a prompt only loads the model.
+                client.generate(model=model, keep_alive=keep_alive)
+                logger.info(f"Model '{model}' loaded in {time.perf_counter() - started_at:.2f}s")
+        except Exception as e:
+            logger.error(f"Failed to prepare model '{model}' on '{base_url}': {e}")
+        finally:
+            with _lock:
+                _preparing.pop(key, None)
+            ready.set()
+
+    threading.Thread(target=prepare, name=f"ollama-prepare-{model}", daemon=True).start()
+    return ready
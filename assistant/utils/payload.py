@@ -0,0 +1,77 @@
+import struct
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# magic, version, number of strings, samples in the audio buffer (NO_AUDIO if there is none)
+PREFIX = struct.Struct("<4sBxxxIQ")
+LENGTH = struct.Struct("<I")
+NO_AUDIO = 2**64 - 1
+ALIGNMENT = 8
+VERSION = 1
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(timestamp: datetime) -> int:
+    """Exact for naive datetimes, unlike `datetime.timestamp()` round trips through a float."""
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def from_micros(micros: int) -> datetime:
+    return _EPOCH + micros * _MICROSECOND
+
+
+def encode(
+    magic: bytes, fixed: struct.Struct, values: tuple, strings: Sequence[str], audio: Optional[np.ndarray]
+) -> List[memoryview]:
+    """Header buffer followed by the audio's own buffer, ready for `writelines` or `sendmsg`.
+
+    Layout: `PREFIX`, `fixed` values, one `LENGTH` and the UTF-8 bytes per string,
+    zero padding to `ALIGNMENT`, then the raw little-endian int16 samples.
+    """
+    encoded = [s.encode("utf-8") for s in strings]
+    samples = NO_AUDIO if audio is None else len(audio)
+    header = bytearray(PREFIX.pack(magic, VERSION, len(encoded), samples))
+    header += fixed.pack(*values)
+    for item in encoded:
+        header += LENGTH.pack(len(item))
+        header += item
+    header += bytes(-len(header) % ALIGNMENT)
+
+    if audio is None:
+        return [memoryview(header)]
+    audio = np.ascontiguousarray(audio, dtype="<i2")
+    return [memoryview(header), memoryview(audio).cast("B")]
+
+
+def decode(
+    buffer: Buffer, magic: bytes, fixed: struct.Struct
+) -> Tuple[tuple, List[str], Optional[np.ndarray]]:
+    """Inverse of `encode`. The audio is a read-only view into `buffer`, not a copy."""
+    view = memoryview(buffer)
+    found, version, count, samples = PREFIX.unpack_from(view)
+    if found != magic:
+        raise ValueError(f"Expected a {magic!r} payload, got {bytes(found)!r}")
+    if version != VERSION:
+        raise ValueError(f"Unsupported {magic!r} payload version {version}")
+
+    offset = PREFIX.size
+    values = fixed.unpack_from(view, offset)
+    offset += fixed.size
+    strings = []
+    for _ in range(count):
+        (length,) = LENGTH.unpack_from(view, offset)
+        offset += LENGTH.size
+        strings.append(str(view[offset : offset + length], "utf-8"))
+        offset += length
+    offset += -offset % ALIGNMENT
+
+    if samples == NO_AUDIO:
+        return values, strings, None
+    audio = np.frombuffer(view, dtype="<i2", count=samples, offset=offset)
+    return values, strings, audio
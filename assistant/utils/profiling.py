@@ -0,0 +1,263 @@
+import html
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from enum import Enum
+from types import CodeType, FrameType
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+_TASKS_DIR = "/proc/self/task"
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+# Innermost Python frames of a thread blocked on a lock, queue or socket. Samples
+# ending in one are idle time and skipped unless the profiler keeps idle stacks.
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("ssl.py", "read"),
+    ("socket.py", "readinto"),
+    ("thread.py", "_worker"),
+}
+
+
+class ProfileFormat(str, Enum):
+    COLLAPSED = "collapsed"
+    SVG = "svg"
+
+
+class ThreadCpu(BaseModel):
+    name: str
+    native_id: int
+    cpu: float
+    python: bool = True
+
+
+def thread_cpu_times() -> List[ThreadCpu]:
+    """CPU time (user + system, seconds) of every thread in the process.
+
+    On Linux this includes native threads started by extensions, which Python
+    doesn't know about; they are named after the OS thread name instead.
+    """
+    names = {t.native_id: t.name for t in threading.enumerate() if t.native_id is not None}
+    if not os.path.isdir(_TASKS_DIR):
+        # Without procfs only the calling thread's own clock is readable.
+        current = threading.current_thread()
+        return [ThreadCpu(name=current.name, native_id=current.native_id or 0, cpu=time.thread_time())]
+
+    threads = []
+    for task in os.listdir(_TASKS_DIR):
+        try:
+            with open(os.path.join(_TASKS_DIR, task, "stat")) as f:
+                stat = f.read()
+        except OSError:
+            continue  # exited meanwhile
+        # The command name is in parentheses and may itself contain spaces or parentheses.
+        comm = stat[stat.index("(") + 1 : stat.rindex(")")]
+        fields = stat[stat.rindex(")") + 2 :].split()
+        utime, stime = int(fields[11]), int(fields[12])
+        native_id = int(task)
+        threads.append(
+            ThreadCpu(
+                name=names.get(native_id, comm),
+                native_id=native_id,
+                cpu=(utime + stime) / _CLOCK_TICKS,
+                python=native_id in names,
+            )
+        )
+    return threads
+
+
+def cpu_usage(before: List[ThreadCpu], after: List[ThreadCpu], elapsed: float) -> List[Dict]:
+    """Per-thread CPU seconds and share of one core between two `thread_cpu_times()`, busiest first."""
+    start = {t.native_id: t.cpu for t in before}
+    usage = [
+        {
+            "name": t.name,
+            "native_id": t.native_id,
+            "python": t.python,
+            "cpu": t.cpu - start.get(t.native_id, 0.0),
+            "percent": 100 * (t.cpu - start.get(t.native_id, 0.0)) / elapsed if elapsed > 0 else 0.0,
+            "total": t.cpu,
+        }
+        for t in after
+    ]
+    return sorted(usage, key=lambda u: (u["cpu"], u["total"]), reverse=True)
+
+
+class Profile(BaseModel):
+    """Sampled stacks as "thread;outermost;...;innermost" -> number of samples."""
+
+    stacks: Dict[str, int]
+    samples: int
+    duration: float
+    interval: float
+    threads: List[Dict]
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format, readable by flamegraph.pl, speedscope and inferno."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def write(self, path: str, format: ProfileFormat = ProfileFormat.COLLAPSED):
+        content = self.collapsed() if format == ProfileFormat.COLLAPSED else render_flamegraph(self.stacks)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def by_thread(self) -> Dict[str, int]:
+        counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            counts[stack.split(";", 1)[0]] += count
+        return dict(counts.most_common())
+
+
+class SamplingProfiler:
+    """Samples the Python stack of every thread every `interval` seconds.
+
+    Runs on its own thread and only reads `sys._current_frames()`, so profiled code
+    is not instrumented and pays just for the GIL the sampler holds while walking
+    the stacks. Threads are told apart by name, stacks of idle threads are dropped
+    unless `idle` is set.
+    """
+
+    def __init__(self, interval: float = 0.01, idle: bool = False):
+        self.interval = interval
+        self.idle = idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[CodeType, str] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._cpu_before: List[ThreadCpu] = []
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "SamplingProfiler":
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self._stopped.clear()
+        self.stacks = Counter()
+        self.samples = 0
+        self._cpu_before = thread_cpu_times()
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        elapsed = time.monotonic() - self._started_at
+        return Profile(
+            stacks=dict(self.stacks),
+            samples=self.samples,
+            duration=elapsed,
+            interval=self.interval,
+            threads=cpu_usage(self._cpu_before, thread_cpu_times(), elapsed),
+        )
+
+    def _run(self):
+        own = threading.get_ident()
+        next_at = time.monotonic()
+        while not self._stopped.is_set():
+            self.sample(exclude=own)
+            next_at += self.interval
+            delay = next_at - time.monotonic()
+            if delay < 0:
+                # Fell behind, e.g. the GIL was busy: skip the missed ticks.
+                next_at = time.monotonic()
+            elif self._stopped.wait(delay):
+                break
+
+    def sample(self, exclude: Optional[int] = None):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == exclude:
+                continue
+            stack = self._stack(frame)
+            if stack is None:
+                continue
+            name = names.get(ident, f"thread-{ident}").replace(";", ":")
+            self.stacks[f"{name};{stack}"] += 1
+        self.samples += 1
+
+    def _stack(self, frame: Optional[FrameType]) -> Optional[str]:
+        if not self.idle and frame is not None:
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                return None
+
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            parts = code.co_filename.split(os.sep)
+            location = "/".join(parts[-2:])
+            label = f"{code.co_qualname} ({location}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+
+def render_flamegraph(stacks: Dict[str, int], width: int = 1200, frame_height: int = 16) -> str:
+    """Self-contained SVG flame graph of collapsed stacks, hover a frame for its sample count."""
+    # name -> [samples, children], one level per stack depth
+    tree: Dict[str, list] = {}
+    total = 0
+    depth = 0
+    for stack, count in stacks.items():
+        total += count
+        frames = stack.split(";")
+        depth = max(depth, len(frames))
+        children = tree
+        for name in frames:
+            node = children.setdefault(name, [0, {}])
+            node[0] += count
+            children = node[1]
+
+    height = (depth + 2) * frame_height
+    min_width = 0.5
+    rects: List[str] = []
+
+    def color(name: str) -> str:
+        h = zlib.crc32(name.encode("utf-8"))
+        return f"rgb({205 + h % 50},{(h >> 8) % 180 + 30},{(h >> 16) % 55})"
+
+    def draw(children: Dict[str, list], x: float, level: int):
+        for name, (count, grandchildren) in sorted(children.items()):
+            w = width * count / total
+            if w < min_width:
+                x += w
+                continue
+            y = height - (level + 2) * frame_height
+            title = html.escape(f"{name} ({count} samples, {100 * count / total:.2f}%)")
+            text = html.escape(name[: int(w / 7)]) if w > 21 else ""
+            rects.append(
+                f'<g><title>{title}</title><rect x="{x:.2f}" y="{y}" width="{w:.2f}" height="{frame_height - 1}" '
+                f'fill="{color(name)}" rx="2"/><text x="{x + 3:.2f}" y="{y + frame_height - 4}">{text}</text></g>'
+            )
+            draw(grandchildren, x, level + 1)
+            x += w
+
+    if total:
+        draw(tree, 0.0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">\n'
+        f'<text x="{width / 2}" y="{frame_height - 2}" text-anchor="middle">{total} samples</text>\n'
+        + "\n".join(rects)
+        + "\n</svg>\n"
+    )
@@ -4,19 +4,25 @@ from contextlib import contextmanager
 from queue import Queue
 from typing import Callable, Optional
 
-from ollama import Client
 from reactivex.subject import Subject
 from concurrent.futures import ThreadPoolExecutor
-from tqdm import tqdm
 import re
 
 logger = logging.getLogger(__name__)
 
 
-def observe(q: Queue, fn: Callable, threaded: bool = False, max_workers: Optional[int] = None) -> Subject:
+def _thread_name(name: Optional[str], fn: Callable) -> str:
+    return name or f"observe-{getattr(fn, '__name__', type(fn).__name__)}"
+
+
+def observe(
+    q: Queue, fn: Callable, threaded: bool = False, max_workers: Optional[int] = None, name: Optional[str] = None
+) -> Subject:
+    """Calls `fn` for every item put on `q`, from a producer thread called `name`, until `None` is put."""
+    name = _thread_name(name, fn)
     subject = Subject()
     if threaded:
-        executor = ThreadPoolExecutor(max_workers=max_workers)
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
 
         subject.subscribe(
             on_next=lambda item: executor.submit(fn, item),
@@ -35,7 +41,7 @@ def observe(q: Queue, fn: Callable, threaded: bool = False, max_workers: Optiona
             subject.on_next(item)
             q.task_done()
 
-    threading.Thread(target=producer, daemon=True).start()
+    threading.Thread(target=producer, name=name, daemon=True).start()
     return subject
 
 
@@ -48,17 +54,6 @@ def event_context(e: threading.Event):
         e.clear()
 
 
-def ensure_model_exists(base_url: str, model: str):
-    o_client = Client(base_url)
-    models = o_client.list().get("models")
-
-    if model not in map(lambda item: item["model"], models):
-        logger.warning(f"Model '{model}' does not exists. Downloading.")
-
-        for _ in tqdm(o_client.pull(model, stream=True)):
-            pass
-
-
 def title_to_snake(s: str) -> str:
     s = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", s)
     s = re.sub("([a-z0-9])([A-Z])", r"\1_\2", s)
@@ -0,0 +1,93 @@
+import logging
+import threading
+from queue import Empty
+from typing import Any, Callable, List, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class WorkSource(Protocol):
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any: ...
+
+
+class WorkerPool:
+    """Named worker threads pulling items from a queue-like source on demand.
+
+    Unlike `observe(..., threaded=True)` items are only taken from the source
+    when a worker is free, so the source decides what runs next. The pool can be
+    resized while running, surplus workers exit after their current item.
+    """
+
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, source: WorkSource, fn: Callable[[Any], None], max_workers: int, name: str):
+        self.source = source
+        self.fn = fn
+        self.name = name
+        self.max_workers = max_workers
+        self._threads: List[threading.Thread] = []
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._started = False
+        self._spawned = 0
+        self._retiring = 0
+
+    def start(self) -> "WorkerPool":
+        with self._lock:
+            self._started = True
+        self.resize(self.max_workers)
+        return self
+
+    def resize(self, max_workers: int):
+        with self._lock:
+            self.max_workers = max_workers
+            if not self._started or self._stopped.is_set():
+                return
+            running = len(self._threads) - self._retiring
+            if max_workers < running:
+                self._retiring += running - max_workers
+                return
+            # Workers asked to retire that haven't yet can simply stay.
+            kept = min(self._retiring, max_workers - running)
+            self._retiring -= kept
+            for _ in range(max_workers - running - kept):
+                self._spawn()
+
+    def _spawn(self):
+        thread = threading.Thread(target=self._run, name=f"{self.name}-{self._spawned}", daemon=True)
+        self._spawned += 1
+        self._threads.append(thread)
+        thread.start()
+
+    def _retire(self) -> bool:
+        with self._lock:
+            if not self._retiring:
+                return False
+            self._retiring -= 1
+            self._threads.remove(threading.current_thread())
+            return True
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return len(self._threads) - self._retiring
+
+    def _run(self):
+        while not self._stopped.is_set() and not self._retire():
+            try:
+                item = self.source.get(timeout=self.POLL_INTERVAL)
+            except Empty:
+                continue
+
+            try:
+                self.fn(item)
+            except Exception as e:
+                logger.exception(f"Worker '{threading.current_thread().name}' failed: {e}")
+
+    def shutdown(self, wait: bool = False):
+        self._stopped.set()
+        if wait:
+            with self._lock:
+                threads = list(self._threads)
+            for thread in threads:
+                thread.join()
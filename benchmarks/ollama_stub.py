@@ -0,0 +1,435 @@
+"""
+Local stand-in for the Ollama HTTP API used by `Shadow` and `ensure_model_exists`.
+
+Implements `GET /api/tags`, `POST /api/chat` (plain text, `format` JSON schema and
+`tools`), `POST /api/generate` and `POST /api/pull`, streamed as NDJSON like Ollama.
+Answers are schema-valid but random, timing follows a simple model:
+
+    ttft = load (first request per model) + overhead + new prompt tokens / prompt_rate
+    then one token every 1 / token_rate seconds
+
+Prompt prefixes are cached per parallel slot, so a prompt that extends an earlier one
+only pays for its new tokens, as with Ollama's KV cache.
+
+    python -m benchmarks.ollama_stub --port 11434 --token-rate 60 --prompt-rate 1500 --parallel 2
+"""
+
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+
+import click
+from pydantic import BaseModel, Field
+
+from .whisperx_stub import WORDS, LatencyModel
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+DEFAULT_FIELD_WEIGHTS = {"action": {"ADD_TO_CONTEXT": 6, "DISCARD": 3, "STORE_IN_MEMORY": 1}}
+
+
+class OllamaStubConfig(BaseModel):
+    models: List[str] = Field(default_factory=lambda: ["llama3.2:3b"])
+    token_rate: float = Field(default=60.0, gt=0.0, description="Generated tokens per second")
+    prompt_rate: float = Field(default=1500.0, gt=0.0, description="Prompt tokens evaluated per second")
+    overhead: LatencyModel = Field(default_factory=lambda: LatencyModel(kind="fixed", a=0.02))
+    load_time: float = Field(default=2.0, description="Seconds to load a model on its first request")
+    parallel: int = Field(default=1, ge=1, description="Requests served at once, like OLLAMA_NUM_PARALLEL")
+    response_tokens: int = Field(default=40, description="Length of plain text answers")
+    pull_time: float = 2.0
+    field_weights: Dict[str, Dict[str, float]] = Field(
+        default_factory=lambda: dict(DEFAULT_FIELD_WEIGHTS),
+        description="Weighted values for string fields by name, e.g. the decision action",
+    )
+    seed: Optional[int] = None
+
+
+def canonical_name(model: str) -> str:
+    return model if ":" in model else f"{model}:latest"
+
+
+def parse_weights(spec: str) -> Dict[str, Dict[str, float]]:
+    """`field=VALUE:weight,VALUE:weight;field=...`"""
+    weights: Dict[str, Dict[str, float]] = {}
+    for part in filter(None, spec.split(";")):
+        name, _, values = part.partition("=")
+        weights[name.strip()] = {
+            value.strip(): float(weight or 1) for value, _, weight in (v.partition(":") for v in values.split(","))
+        }
+    return weights
+
+
+def split_tokens(text: str) -> List[str]:
+    return [text[i : i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)] or [""]
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class SchemaSampler:
+    """Random instances of a JSON schema, as produced by pydantic's `model_json_schema`."""
+
+    def __init__(self, rng: random.Random, field_weights: Dict[str, Dict[str, float]], items: Optional[int] = None):
+        self.rng = rng
+        self.field_weights = field_weights
+        self.items = items
+
+    def sample(self, schema: dict, root: Optional[dict] = None, name: str = "") -> Any:
+        root = root or schema
+        if "$ref" in schema:
+            target: Any = root
+            for key in schema["$ref"].lstrip("#/").split("/"):
+                target = target[key]
+            return self.sample(target, root, name)
+        for key in ("anyOf", "oneOf", "allOf"):
+            if key in schema:
+                options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+                return self.sample(options[0], root, name)
+
+        if "enum" in schema:
+            return self.choose(name, schema["enum"])
+
+        kind = schema.get("type", "object")
+        if kind == "object":
+            return {key: self.sample(value, root, key) for key, value in schema.get("properties", {}).items()}
+        if kind == "array":
+            count = self.items if self.items is not None else self.rng.randint(1, 3)
+            values = [self.sample(schema.get("items", {}), root, name) for _ in range(count)]
+            # Lists of indexed items (batched decisions) are numbered in order.
+            for i, value in enumerate(values):
+                if isinstance(value, dict) and "index" in value:
+                    value["index"] = i
+            return values
+        if kind == "integer":
+            return self.rng.randint(0, 9)
+        if kind == "number":
+            return round(self.rng.random(), 3)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if name in self.field_weights:
+            return self.choose(name, list(self.field_weights[name]))
+        return " ".join(self.rng.choice(WORDS) for _ in range(self.rng.randint(3, 10)))
+
+    def choose(self, name: str, values: List[Any]) -> Any:
+        weights = self.field_weights.get(name, {})
+        return self.rng.choices(values, weights=[weights.get(str(v), 1.0) for v in values])[0]
+
+
+def sentences(rng: random.Random, tokens: int) -> str:
+    words = []
+    while len(words) < tokens:
+        sentence = [rng.choice(WORDS) for _ in range(rng.randint(5, 12))]
+        words.extend(sentence[:-1] + [sentence[-1] + "."])
+    text = " ".join(words[:tokens])
+    return text[0].upper() + text[1:]
+
+
+class PromptCache:
+    """Longest-prefix reuse across `slots` cached prompts per model."""
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self.prompts: Dict[str, List[str]] = {}
+
+    def evaluate(self, model: str, prompt: str) -> int:
+        """Number of prompt tokens that need evaluating."""
+        cached = self.prompts.setdefault(model, [])
+        best, shared = None, 0
+        for i, previous in enumerate(cached):
+            n = 0
+            limit = min(len(previous), len(prompt))
+            while n < limit and previous[n] == prompt[n]:
+                n += 1
+            if n > shared:
+                best, shared = i, n
+        if best is not None:
+            cached.pop(best)
+        elif len(cached) >= self.slots:
+            cached.pop(0)
+        cached.append(prompt)
+        return count_tokens(prompt) - shared // CHARS_PER_TOKEN
+
+
+class OllamaStub:
+    def __init__(self, config: OllamaStubConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.models = {canonical_name(m) for m in config.models}
+        self.loaded: set = set()
+        self.cache = PromptCache(config.parallel)
+        self.slots = threading.Semaphore(config.parallel)
+        self.log: List[Dict[str, Any]] = []
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OllamaStub":
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name=f"ollama-stub-{self.server.server_address[1]}", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def tags(self) -> dict:
+        with self.lock:
+            models = sorted(self.models)
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            "models": [
+                {
+                    "name": m,
+                    "model": m,
+                    "modified_at": now,
+                    "size": 0,
+                    "digest": hashlib.sha256(m.encode()).hexdigest(),
+                    "details": {"format": "gguf", "family": "stub"},
+                }
+                for m in models
+            ]
+        }
+
+    def pull(self, model: str) -> Iterator[dict]:
+        yield {"status": "pulling manifest"}
+        total, steps = 100_000_000, 20
+        for step in range(1, steps + 1):
+            time.sleep(self.config.pull_time / steps)
+            yield {
+                "status": "pulling 0000",
+                "digest": "sha256:0000",
+                "total": total,
+                "completed": total * step // steps,
+            }
+        with self.lock:
+            self.models.add(canonical_name(model))
+        yield {"status": "success"}
+
+    def answer(self, request: dict, rng: random.Random) -> dict:
+        """Message for a chat request, before timing is applied."""
+        messages = request.get("messages") or []
+        last = str(messages[-1].get("content", "")) if messages else ""
+        chunks = len(re.findall(r"^\[\d+\] ", last, flags=re.M)) or None
+        sampler = SchemaSampler(rng, self.config.field_weights, items=chunks)
+
+        schema = request.get("format")
+        if isinstance(schema, dict):
+            return {"kind": "structured", "content": json.dumps(sampler.sample(schema))}
+        if schema == "json":
+            return {"kind": "json", "content": json.dumps({"answer": sentences(rng, 8)})}
+        if request.get("tools"):
+            function = request["tools"][0]["function"]
+            call = {"function": {"name": function["name"], "arguments": sampler.sample(function.get("parameters", {}))}}
+            return {"kind": "tools", "content": "", "tool_calls": [call]}
+        return {"kind": "text", "content": sentences(rng, self.config.response_tokens)}
+
+    def generate(self, endpoint: str, request: dict) -> Iterator[dict]:
+        """Timed response chunks of a chat or generate request, the last one with Ollama's statistics."""
+        model = canonical_name(request.get("model", ""))
+        received_at = time.perf_counter()
+
+        with self.lock:
+            rng = random.Random(self.rng.random())
+            overhead = self.config.overhead.sample(rng, 0.0)
+            if endpoint == "chat":
+                prompt = json.dumps(request.get("messages", []), sort_keys=True)
+                answer = self.answer(request, rng)
+            elif request.get("prompt"):
+                prompt = request["prompt"]
+                answer = {"kind": "text", "content": sentences(rng, self.config.response_tokens)}
+            else:
+                prompt, answer = "", {"kind": "load", "content": ""}
+
+        with self.slots:
+            started_at = time.perf_counter()
+            with self.lock:
+                load = 0.0 if model in self.loaded else self.config.load_time
+                self.loaded.add(model)
+                evaluated = self.cache.evaluate(model, prompt) if prompt else 0
+            prompt_eval = evaluated / self.config.prompt_rate
+            time.sleep(load + overhead + prompt_eval)
+            first_token_at = time.perf_counter()
+
+            tokens = split_tokens(answer["content"]) if answer["content"] else []
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(1.0 / self.config.token_rate)
+                yield self._chunk(endpoint, model, token, answer.get("tool_calls") if i == 0 else None)
+            if not tokens and answer.get("tool_calls"):
+                yield self._chunk(endpoint, model, "", answer["tool_calls"])
+            finished_at = time.perf_counter()
+
+        record = {
+            "endpoint": endpoint,
+            "kind": answer["kind"],
+            "model": model,
+            "received_at": received_at,
+            "queue_wait": started_at - received_at,
+            "ttft": first_token_at - received_at,
+            "duration": finished_at - received_at,
+            "prompt_tokens": count_tokens(prompt) if prompt else 0,
+            "evaluated_tokens": evaluated,
+            "eval_count": len(tokens),
+        }
+        with self.lock:
+            self.log.append(record)
+
+        final = self._chunk(endpoint, model, "", None)
+        final.update(
+            done=True,
+            done_reason="stop" if endpoint == "chat" or prompt else "load",
+            total_duration=int((finished_at - started_at) * 1e9),
+            load_duration=int(load * 1e9),
+            prompt_eval_count=evaluated,
+            prompt_eval_duration=int(prompt_eval * 1e9),
+            eval_count=len(tokens),
+            eval_duration=int((finished_at - first_token_at) * 1e9),
+        )
+        yield final
+
+    @staticmethod
+    def _chunk(endpoint: str, model: str, token: str, tool_calls: Optional[list]) -> dict:
+        chunk: Dict[str, Any] = {"model": model, "created_at": datetime.now(timezone.utc).isoformat(), "done": False}
+        if endpoint == "chat":
+            chunk["message"] = {"role": "assistant", "content": token}
+            if tool_calls:
+                chunk["message"]["tool_calls"] = tool_calls
+        else:
+            chunk["response"] = token
+        return chunk
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _reply(self, status: int, payload: dict):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, chunks: Iterator[dict]):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for chunk in chunks:
+                        line = json.dumps(chunk).encode() + b"\n"
+                        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled the generation, as an interrupt does.
+                    logger.debug("Client closed the stream")
+                    self.close_connection = True
+
+            def _respond(self, request: dict, chunks: Iterator[dict], text_key: Optional[str] = None):
+                if request.get("stream", True):
+                    self._stream(chunks)
+                    return
+                # Non-streaming: one object with the whole text and the final statistics.
+                items = list(chunks)
+                final = items[-1]
+                if text_key == "message":
+                    final["message"]["content"] = "".join(c["message"]["content"] for c in items)
+                    calls = [call for c in items for call in c["message"].get("tool_calls", [])]
+                    if calls:
+                        final["message"]["tool_calls"] = calls
+                elif text_key == "response":
+                    final["response"] = "".join(c["response"] for c in items)
+                self._reply(200, final)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._reply(200, stub.tags())
+                elif self.path == "/api/version":
+                    self._reply(200, {"version": "0.0.0-stub"})
+                else:
+                    self._reply(404, {"error": "not found"})
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+                if self.path == "/api/pull":
+                    self._respond(request, stub.pull(request.get("model", "")))
+                    return
+
+                if self.path not in ("/api/chat", "/api/generate"):
+                    self._reply(404, {"error": "not found"})
+                    return
+
+                model = request.get("model", "")
+                with stub.lock:
+                    known = canonical_name(model) in stub.models
+                if not known:
+                    self._reply(404, {"error": f"model '{model}' not found"})
+                    return
+
+                if self.path == "/api/chat":
+                    self._respond(request, stub.generate("chat", request), "message")
+                else:
+                    self._respond(request, stub.generate("generate", request), "response")
+
+        return Handler
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", default=11434, type=int)
+@click.option("--model", "models", multiple=True, default=["llama3.2:3b"], help="Models reported as installed")
+@click.option("--token-rate", default=60.0, type=float, help="Generated tokens per second")
+@click.option("--prompt-rate", default=1500.0, type=float, help="Prompt tokens evaluated per second")
+@click.option("--overhead", default="fixed:0.02", help="Per-request latency before the prompt, see whisperx_stub")
+@click.option("--load-time", default=2.0, type=float)
+@click.option("--parallel", default=1, type=int)
+@click.option("--response-tokens", default=40, type=int)
+@click.option("--fields", default=None, help="Weighted string fields, e.g. 'action=ADD_TO_CONTEXT:6,DISCARD:3'")
+@click.option("--seed", default=None, type=int)
+def main(host, port, models, token_rate, prompt_rate, overhead, load_time, parallel, response_tokens, fields, seed):
+    config = OllamaStubConfig(
+        models=list(models),
+        token_rate=token_rate,
+        prompt_rate=prompt_rate,
+        overhead=LatencyModel.parse(overhead),
+        load_time=load_time,
+        parallel=parallel,
+        response_tokens=response_tokens,
+        field_weights=parse_weights(fields) if fields else dict(DEFAULT_FIELD_WEIGHTS),
+        seed=seed,
+    )
+    stub = OllamaStub(config, host, port)
+    print(f"ollama stub listening on {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if "__main__" == __name__:
+    main()
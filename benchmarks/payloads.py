@@ -0,0 +1,107 @@
+"""
+Construction and serialization cost of the audio event payloads.
+
+Compares the slotted `SpeechSegment` dataclass against the pydantic model it
+replaced, for building a segment (as VAD does per utterance) and for getting it
+across a process boundary: pickle of either, versus the header + raw int16
+`to_bytes`/`from_bytes` encoding.
+
+    python -m benchmarks.payloads --seconds 1 --seconds 10
+"""
+
+import json
+import pickle
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List
+from uuid import UUID, uuid4
+
+import click
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel, ConfigDict, Field
+
+from assistant.components.mumble.mumble import SpeechSegment
+from assistant.config import SPEECH_PIPELINE_SAMPLERATE
+
+
+class PydanticSpeechSegment(BaseModel):
+    """`SpeechSegment` as it was before, for comparison."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    id: UUID = Field(default_factory=uuid4)
+    source: str
+    data: NDArray[np.int16] = Field(repr=False)
+    timestamp: datetime = Field(default_factory=datetime.now)
+    connection: str = "default"
+
+
+def per_call(fn: Callable[[], object], min_time: float) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = max(3, int(min_time / max(timer.timeit(number) / number, 1e-9) / number))
+    return min(timer.repeat(repeat=runs, number=number)) / number
+
+
+@click.command()
+@click.option("--seconds", "lengths", multiple=True, type=float, default=[1.0, 10.0], help="Audio length")
+@click.option("--min-time", default=0.5, type=float, help="Seconds spent per measurement")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def main(lengths, min_time, as_json):
+    report: List[Dict[str, object]] = []
+    for seconds in lengths:
+        data = (np.random.default_rng(0).standard_normal(int(seconds * SPEECH_PIPELINE_SAMPLERATE)) * 3000).astype(
+            np.int16
+        )
+        segment = SpeechSegment(source="alice", data=data)
+        model = PydanticSpeechSegment(source="alice", data=data)
+        encoded = segment.to_bytes()
+        pickled_segment = pickle.dumps(segment, protocol=pickle.HIGHEST_PROTOCOL)
+        pickled_model = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+
+        cases = {
+            "construct": {
+                "dataclass": lambda data=data: SpeechSegment(source="alice", data=data),
+                "pydantic": lambda data=data: PydanticSpeechSegment(source="alice", data=data),
+            },
+            "encode": {
+                "to_bytes": segment.to_bytes,
+                "to_buffers": segment.to_buffers,
+                "pickle dataclass": lambda segment=segment: pickle.dumps(segment, protocol=pickle.HIGHEST_PROTOCOL),
+                "pickle pydantic": lambda model=model: pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL),
+            },
+            "decode": {
+                "from_bytes": lambda encoded=encoded: SpeechSegment.from_bytes(encoded),
+                "unpickle dataclass": lambda pickled_segment=pickled_segment: pickle.loads(pickled_segment),
+                "unpickle pydantic": lambda pickled_model=pickled_model: pickle.loads(pickled_model),
+            },
+        }
+        report.append(
+            {
+                "seconds": seconds,
+                "bytes": {
+                    "audio": data.nbytes,
+                    "to_bytes": len(encoded),
+                    "pickle dataclass": len(pickled_segment),
+                    "pickle pydantic": len(pickled_model),
+                },
+                "us": {
+                    step: {name: per_call(fn, min_time) * 1e6 for name, fn in variants.items()}
+                    for step, variants in cases.items()
+                },
+            }
+        )
+
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+        return
+
+    for row in report:
+        click.echo(f"{row['seconds']:g}s of audio, sizes {row['bytes']}")
+        for step, variants in row["us"].items():
+            click.echo(f"  {step:<10} " + ", ".join(f"{name} {us:.2f}us" for name, us in variants.items()))
+
+
+if "__main__" == __name__:
+    main()
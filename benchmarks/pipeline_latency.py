@@ -0,0 +1,262 @@
+"""
+End-to-end latency benchmark of the speech pipeline against local whisperx stand-ins.
+
+N synthetic speakers are fed in 20 ms frames (as pymumble delivers them) through
+`FixedLengthAudioChunker` -> `VadFilter` -> `TranscriberService`. Latency is taken
+from the moment VAD emits a `SpeechSegment` to `TRANSCRIPTION_SEGMENT_DONE`.
+
+    python -m benchmarks.pipeline_latency --speakers 8 --duration 60 --stubs 2 --latency lognormal:0.4,0.3
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+import click
+import numpy as np
+import resampy
+import soundfile as sf
+import yaml
+from numpy.typing import NDArray
+from pymumble_py3.constants import PYMUMBLE_SAMPLERATE
+
+from assistant.components.mumble.mumble import SpeechSegment
+from assistant.components.transcriber.events import TRANSCRIPTION_SEGMENT_DONE, TRANSCRIPTION_SEGMENT_STARTED
+from assistant.components.transcriber.main import TranscriberService
+from assistant.config import SPEECH_PIPELINE_BUFFER_SIZE_MILIS, SPEECH_PIPELINE_SAMPLERATE
+from assistant.core.config_manager import ConfigManager
+from assistant.utils.audio import VadFilter
+from assistant.utils.audio.reshape import FixedLengthAudioChunker
+
+from .whisperx_stub import LatencyModel, StubConfig, WhisperxStub
+
+FRAME_MS = 20
+
+# First three formants of a few vowels, Hz.
+VOWELS = [(730, 1090, 2440), (270, 2290, 3010), (300, 870, 2240), (530, 1840, 2480), (570, 840, 2410)]
+
+
+def _resonate(x: NDArray[np.float64], frequency: float, bandwidth: float, samplerate: int) -> NDArray[np.float64]:
+    r = np.exp(-np.pi * bandwidth / samplerate)
+    a1, a2 = -2 * r * np.cos(2 * np.pi * frequency / samplerate), r * r
+    y = np.zeros_like(x)
+    y1 = y2 = 0.0
+    for i, v in enumerate(x):
+        y[i] = (1 - r) * v - a1 * y1 - a2 * y2
+        y2, y1 = y1, y[i]
+    return y
+
+
+def syllable_bank(rng: np.random.Generator, samplerate: int, size: int = 32) -> List[NDArray[np.float64]]:
+    """Vowel-like syllables (glottal pulses through formant resonators) that Silero VAD accepts as speech."""
+    bank = []
+    for _ in range(size):
+        n = int(rng.uniform(0.15, 0.35) * samplerate)
+        t = np.arange(n) / samplerate
+        f0 = rng.uniform(100, 220) * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(1, 4) * t))
+        phase = np.cumsum(f0) / samplerate % 1
+        source = np.diff(np.where(phase < 0.6, np.sin(np.pi * phase / 0.6) ** 2, 0.0), prepend=0)
+        source += 0.01 * rng.standard_normal(n)
+
+        vowel = VOWELS[rng.integers(len(VOWELS))]
+        y = sum(_resonate(source, f, 60 + 50 * k, samplerate) / (k + 1) for k, f in enumerate(vowel))
+        ramp = np.minimum(1.0, np.minimum(t, t[-1] - t) / 0.03)
+        bank.append(y * ramp / np.abs(y).max())
+    return bank
+
+
+def conversation(
+    rng: np.random.Generator,
+    duration: float,
+    speech: List[NDArray[np.float64]],
+    samplerate: int,
+    utterance: tuple = (1.5, 6.0),
+    pause: tuple = (1.0, 3.0),
+) -> NDArray[np.int16]:
+    parts = [np.zeros(int(rng.uniform(*pause) * samplerate))]
+    length = len(parts[0])
+    while length < duration * samplerate:
+        target = int(rng.uniform(*utterance) * samplerate)
+        spoken = 0
+        while spoken < target:
+            chunk = speech[rng.integers(len(speech))]
+            parts.append(chunk)
+            spoken += len(chunk)
+        silence = np.zeros(int(rng.uniform(*pause) * samplerate))
+        parts.append(silence)
+        length += spoken + len(silence)
+
+    audio = np.concatenate(parts)[: int(duration * samplerate)]
+    return (audio * 0.6 * np.iinfo(np.int16).max).astype(np.int16)
+
+
+def load_speech(path: str, samplerate: int) -> List[NDArray[np.float64]]:
+    sound, rate = sf.read(path, always_2d=True)
+    sound = resampy.resample(sound.mean(axis=1), rate, samplerate)
+    sound = sound / max(np.abs(sound).max(), 1e-9)
+    # Slice the recording into pieces so every speaker gets a different mix.
+    size = samplerate // 2
+    return [sound[i : i + size] for i in range(0, len(sound) - size, size)]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    return float(np.percentile(values, q)) if values else None
+
+
+class Speaker(threading.Thread):
+    def __init__(self, name: str, audio: NDArray[np.int16], speed: float, on_speech):
+        super().__init__(name=f"bench-{name}", daemon=True)
+        self.source = name
+        self.audio = audio
+        self.speed = speed
+        self.on_speech = on_speech
+        self.vad = VadFilter(self.emit)
+        self.chunker = FixedLengthAudioChunker(
+            callback=self.vad,
+            target_chunk_length_ms=SPEECH_PIPELINE_BUFFER_SIZE_MILIS,
+            source_samplerate=PYMUMBLE_SAMPLERATE,
+            target_samplerate=SPEECH_PIPELINE_SAMPLERATE,
+        )
+
+    def emit(self, speech: bytes):
+        self.on_speech(SpeechSegment(source=self.source, data=np.frombuffer(speech, dtype=np.int16)))
+
+    def run(self):
+        frame = PYMUMBLE_SAMPLERATE * FRAME_MS // 1000
+        started_at = time.monotonic()
+        for i, offset in enumerate(range(0, len(self.audio) - frame + 1, frame)):
+            if self.speed > 0:
+                delay = started_at + i * FRAME_MS / 1000 / self.speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self.chunker(self.audio[offset : offset + frame].tobytes())
+
+
+@click.command()
+@click.option("--speakers", default=4, type=int)
+@click.option("--duration", default=60.0, type=float, help="Seconds of audio per speaker")
+@click.option("--speed", default=1.0, type=float, help="Playback speed multiplier, 0 for unthrottled")
+@click.option("--stubs", default=1, type=int, help="Number of whisperx stand-in servers")
+@click.option("--latency", default="lognormal:0.3,0.3", help="Stub latency distribution, see whisperx_stub")
+@click.option("--rtf", default=0.05, type=float, help="Stub seconds of latency per second of audio")
+@click.option("--error-rate", default=0.0, type=float)
+@click.option("--max-workers", default=4, type=int)
+@click.option("--speech", default=None, type=click.Path(exists=True), help="Recording used instead of synthetic speech")
+@click.option("--drain-timeout", default=30.0, type=float)
+@click.option("--seed", default=0, type=int)
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def main(speakers, duration, speed, stubs, latency, rtf, error_rate, max_workers, speech, drain_timeout, seed, as_json):
+    rng = np.random.default_rng(seed)
+    material = (
+        load_speech(speech, PYMUMBLE_SAMPLERATE) if speech else syllable_bank(rng, PYMUMBLE_SAMPLERATE)
+    )
+
+    servers = [
+        WhisperxStub(
+            StubConfig(latency=LatencyModel.parse(latency, rtf), error_rate=error_rate, seed=seed + i)
+        ).start()
+        for i in range(stubs)
+    ]
+
+    plugin_config = {
+        "max_workers": max_workers,
+        "whisperx": {"urls": [s.url for s in servers], "health_check": {"enabled": False}},
+    }
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+        yaml.safe_dump({"system": {}, "plugins": {"transcriber": plugin_config}}, f)
+    transcriber = TranscriberService(config=ConfigManager(f.name))
+    os.unlink(f.name)
+
+    lock = threading.Lock()
+    emitted: List[SpeechSegment] = []
+    latencies: List[float] = []
+    audio_seconds = 0.0
+
+    def on_speech(segment: SpeechSegment):
+        with lock:
+            emitted.append(segment)
+        transcriber.on_speech(segment)
+
+    def on_done(segment: SpeechSegment, _):
+        nonlocal audio_seconds
+        with lock:
+            latencies.append((time.time() - segment.timestamp.timestamp()))
+            audio_seconds += len(segment.data) / SPEECH_PIPELINE_SAMPLERATE
+
+    transcriber.on(TRANSCRIPTION_SEGMENT_STARTED, lambda _: None)
+    transcriber.on(TRANSCRIPTION_SEGMENT_DONE, on_done)
+    transcriber.initialize()
+
+    feeders = [
+        Speaker(f"speaker-{i}", conversation(rng, duration, material, PYMUMBLE_SAMPLERATE), speed, on_speech)
+        for i in range(speakers)
+    ]
+
+    started_at = time.monotonic()
+    for feeder in feeders:
+        feeder.start()
+    for feeder in feeders:
+        feeder.join()
+    fed_at = time.monotonic()
+
+    # Wait for the tail: stop when everything is transcribed or progress stalls.
+    last_progress, done = time.monotonic(), -1
+    while time.monotonic() - last_progress < drain_timeout:
+        with lock:
+            if len(latencies) != done:
+                done, last_progress = len(latencies), time.monotonic()
+            if done == len(emitted):
+                break
+        time.sleep(0.05)
+    finished_at = time.monotonic()
+
+    report = {
+        "speakers": speakers,
+        "audio_per_speaker": duration,
+        "speed": speed,
+        "stubs": stubs,
+        "max_workers": max_workers,
+        "segments": {"emitted": len(emitted), "transcribed": len(latencies), "lost": len(emitted) - len(latencies)},
+        "wall_time": {"feed": fed_at - started_at, "total": finished_at - started_at},
+        "throughput": {
+            "segments_per_s": len(latencies) / (finished_at - started_at),
+            "audio_s_per_s": audio_seconds / (finished_at - started_at),
+        },
+        "latency": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies, default=None),
+        },
+        "queue": transcriber.queue_stats(),
+        "endpoints": transcriber.endpoint_stats(),
+        "stub_requests": [{"url": s.url, "requests": s.requests, "failures": s.failures} for s in servers],
+    }
+
+    transcriber.shutdown()
+    for server in servers:
+        server.stop()
+
+    if as_json:
+        click.echo(json.dumps(report, indent=2, default=str))
+        return
+
+    click.echo(f"segments     {report['segments']}")
+    click.echo(f"wall time    feed {report['wall_time']['feed']:.2f}s, total {report['wall_time']['total']:.2f}s")
+    click.echo(
+        f"throughput   {report['throughput']['segments_per_s']:.2f} segments/s, "
+        f"{report['throughput']['audio_s_per_s']:.2f} audio s/s"
+    )
+    if latencies:
+        click.echo(
+            "latency      "
+            + ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in report["latency"].items() if v is not None)
+        )
+    click.echo(f"queue        {report['queue']}")
+
+
+if "__main__" == __name__:
+    main()
@@ -0,0 +1,294 @@
+"""
+Replays recorded sessions through `MumbleInterface`'s received audio path, without a Mumble server.
+
+Utterances are cut into 20 ms frames, as pymumble delivers them, and submitted from
+one feeder thread standing in for the network thread. They then go through the same
+per-speaker dispatcher, chunker and VAD as live audio. Sessions can be replayed at
+their original pace, N times faster or unthrottled, and long pauses can be
+compressed. Unthrottled replay waits for room in a speaker's queue instead of
+dropping frames, so it measures capacity. `--copies` replays the session on several
+connections at once to multiply the load. Reports frame queue lag, speech segment
+latency and throughput.
+
+Accepted inputs:
+
+- a Recorder archive (a directory with `index.bin`)
+- a directory of Recorder files, named `<speaker>-<timestamp>.<ext>`
+- any directory with one audio file or one sub-directory of files per speaker,
+  each speaker's files played back to back from the start
+
+    python -m benchmarks.replay .recordings --speed 4 --max-gap 2 --copies 8
+"""
+
+import heapq
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import click
+import numpy as np
+import resampy
+import soundfile as sf
+from numpy.typing import NDArray
+from pydantic import BaseModel, ConfigDict
+from pymumble_py3.constants import PYMUMBLE_SAMPLERATE
+
+from assistant.components.mumble import events
+from assistant.components.mumble.mumble import MumbleInterface, SpeechSegment
+from assistant.components.recorder.archive import INDEX_FILE, Archive
+from assistant.config import SPEECH_PIPELINE_SAMPLERATE
+
+FRAME_MS = 20
+AUDIO_EXTENSIONS = (".flac", ".wav", ".ogg")
+RECORDER_FILE = re.compile(r"^(?P<speaker>.+)-(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d+)?)$")
+
+
+class Utterance(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    speaker: str
+    at: float
+    audio: NDArray[np.int16]
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / PYMUMBLE_SAMPLERATE
+
+
+def to_mumble_rate(audio: np.ndarray, samplerate: int) -> NDArray[np.int16]:
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    if samplerate != PYMUMBLE_SAMPLERATE:
+        audio = resampy.resample(audio, samplerate, PYMUMBLE_SAMPLERATE)
+    return np.clip(audio * 32768, -32768, 32767).astype(np.int16)
+
+
+def load_archive(path: str) -> List[Utterance]:
+    archive = Archive(path)
+    try:
+        return [
+            Utterance(
+                speaker=entry.speaker,
+                at=entry.timestamp.timestamp(),
+                audio=to_mumble_rate(archive.read(entry) / 32768, SPEECH_PIPELINE_SAMPLERATE),
+            )
+            for entry in archive.query()
+        ]
+    finally:
+        archive.close()
+
+
+def audio_files(path: str) -> List[str]:
+    return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(AUDIO_EXTENSIONS))
+
+
+def load_recorder_files(paths: List[str]) -> List[Utterance]:
+    utterances = []
+    for path in paths:
+        match = RECORDER_FILE.match(os.path.splitext(os.path.basename(path))[0])
+        assert match is not None
+        audio, samplerate = sf.read(path, dtype="float32")
+        utterances.append(
+            Utterance(
+                speaker=match["speaker"],
+                at=datetime.fromisoformat(match["timestamp"]).timestamp(),
+                audio=to_mumble_rate(audio, samplerate),
+            )
+        )
+    return utterances
+
+
+def load_speaker_tracks(path: str) -> List[Utterance]:
+    utterances = []
+    for name in sorted(os.listdir(path)):
+        full = os.path.join(path, name)
+        if os.path.isdir(full):
+            speaker, files = name, audio_files(full)
+        elif name.endswith(AUDIO_EXTENSIONS):
+            speaker, files = os.path.splitext(name)[0], [full]
+        else:
+            continue
+
+        at = 0.0
+        for file in files:
+            audio, samplerate = sf.read(file, dtype="float32")
+            utterance = Utterance(speaker=speaker, at=at, audio=to_mumble_rate(audio, samplerate))
+            utterances.append(utterance)
+            at += utterance.duration
+    return utterances
+
+
+def load_session(path: str) -> List[Utterance]:
+    if os.path.exists(os.path.join(path, INDEX_FILE)):
+        utterances = load_archive(path)
+    elif (files := audio_files(path)) and all(
+        RECORDER_FILE.match(os.path.splitext(os.path.basename(f))[0]) for f in files
+    ):
+        utterances = load_recorder_files(files)
+    else:
+        utterances = load_speaker_tracks(path)
+    return sorted(utterances, key=lambda u: u.at)
+
+
+def schedule(utterances: List[Utterance], max_gap: Optional[float], tail_silence: float) -> List[Utterance]:
+    """Starts the session at 0 and shortens pauses in the whole session longer than `max_gap`."""
+    if not utterances:
+        return []
+    silence = np.zeros(int(tail_silence * PYMUMBLE_SAMPLERATE), dtype=np.int16)
+
+    scheduled, shift, busy_until = [], utterances[0].at, utterances[0].at
+    for utterance in utterances:
+        if max_gap is not None and utterance.at - busy_until > max_gap:
+            shift += utterance.at - busy_until - max_gap
+        # Speech is ended by silence, which Mumble clients don't send.
+        audio = np.concatenate((utterance.audio, silence))
+        scheduled.append(Utterance(speaker=utterance.speaker, at=utterance.at - shift, audio=audio))
+        busy_until = max(busy_until, utterance.at + utterance.duration)
+    return scheduled
+
+
+def frames(utterances: List[Utterance], copies: int) -> Iterator[Tuple[float, str, str, bytes]]:
+    """(at, connection, speaker, pcm) for every 20 ms frame, in time order across speakers."""
+    size = PYMUMBLE_SAMPLERATE * FRAME_MS // 1000
+
+    def frames_of(utterance: Utterance, connection: str):
+        for i, offset in enumerate(range(0, len(utterance.audio) - size + 1, size)):
+            pcm = utterance.audio[offset : offset + size].tobytes()
+            yield utterance.at + i * FRAME_MS / 1000, connection, utterance.speaker, pcm
+
+    return heapq.merge(
+        *(frames_of(u, f"replay-{copy}") for copy in range(copies) for u in utterances), key=lambda frame: frame[0]
+    )
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    return {f"p{q}": float(np.percentile(values, q)) if values else None for q in (50, 95, 99)}
+
+
+@click.command()
+@click.argument("session", type=click.Path(exists=True, file_okay=False))
+@click.option("--speed", default=1.0, type=float, help="Playback speed multiplier, 0 for unthrottled")
+@click.option("--max-gap", default=None, type=float, help="Compress pauses longer than this, seconds")
+@click.option("--copies", default=1, type=int, help="Replay the session on this many connections at once")
+@click.option("--tail-silence", default=0.5, type=float, help="Silence appended to every utterance, seconds")
+@click.option("--workers", default=2, type=int, help="mumble.dispatch.workers")
+@click.option("--max-queue", default=200, type=int, help="mumble.dispatch.max_queue")
+@click.option("--drain-timeout", default=10.0, type=float)
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def main(session, speed, max_gap, copies, tail_silence, workers, max_queue, drain_timeout, as_json):
+    utterances = schedule(load_session(session), max_gap, tail_silence)
+    if not utterances:
+        raise click.ClickException(f"No audio found in '{session}'")
+    audio_seconds = sum(u.duration for u in utterances) * copies
+
+    mumble = MumbleInterface()
+    mumble.config = {"log_level": "WARNING", "dispatch": {"workers": workers, "max_queue": max_queue}}
+
+    lock = threading.Lock()
+    lags: List[float] = []
+    latencies: List[float] = []
+    segments: List[SpeechSegment] = []
+    current = threading.local()
+
+    def on_speech(segment: SpeechSegment):
+        # Emitted on the worker while it handles the frame that ended the speech.
+        with lock:
+            segments.append(segment)
+            latencies.append(time.perf_counter() - current.fed_at)
+
+    mumble.on(events.MUMBLE_AUDIO_SPEECH, on_speech)
+    mumble.start_processing()
+    process_sound = mumble.process_sound
+
+    def timed(key: str, item: Tuple[float, bytes]):
+        current.fed_at, pcm = item
+        with lock:
+            lags.append(time.perf_counter() - current.fed_at)
+        process_sound(key, pcm)
+
+    mumble.dispatcher.handler = timed
+
+    fed = 0
+    started_at = time.monotonic()
+    for at, connection, speaker, pcm in frames(utterances, copies):
+        key = mumble.speaker_key(connection, speaker)
+        if speed > 0:
+            delay = started_at + at / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            # Unthrottled measures capacity: wait for room instead of dropping frames.
+            while mumble.dispatcher.pending(key) >= max_queue:
+                time.sleep(0.001)
+        mumble.dispatcher.submit(key, (time.perf_counter(), pcm))
+        fed += 1
+    fed_at = time.monotonic()
+
+    last_progress, done = time.monotonic(), -1
+    while time.monotonic() - last_progress < drain_timeout:
+        stats = mumble.dispatcher.stats()
+        processed = sum(s["processed"] for s in stats.values())
+        if processed != done:
+            done, last_progress = processed, time.monotonic()
+        if not any(s["queued"] for s in stats.values()) and done + sum(s["dropped"] for s in stats.values()) == fed:
+            break
+        time.sleep(0.05)
+    finished_at = time.monotonic()
+
+    sources = mumble.dispatcher.stats()
+    report = {
+        "session": {
+            "utterances": len(utterances),
+            "speakers": len({u.speaker for u in utterances}),
+            "copies": copies,
+            "audio_s": audio_seconds,
+            "span_s": max(u.at + u.duration for u in utterances),
+        },
+        "wall_time": {"feed": fed_at - started_at, "total": finished_at - started_at},
+        "frames": {
+            "fed": fed,
+            "processed": sum(s["processed"] for s in sources.values()),
+            "dropped": sum(s["dropped"] for s in sources.values()),
+            "failed": sum(s["failed"] for s in sources.values()),
+        },
+        "throughput": {
+            "realtime_factor": audio_seconds / (finished_at - started_at),
+            "frames_per_s": fed / (finished_at - started_at),
+            "segments_per_s": len(segments) / (finished_at - started_at),
+        },
+        "segments": len(segments),
+        "frame_lag": percentiles(lags),
+        "segment_latency": percentiles(latencies),
+        "speakers": mumble.speakers.stats(),
+    }
+    mumble.shutdown()
+
+    if as_json:
+        click.echo(json.dumps(report, indent=2, default=str))
+        return
+
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:.1f}ms" if value is not None else "-"
+
+    click.echo(
+        f"session      {report['session']['utterances']} utterances, {report['session']['speakers']} speakers "
+        f"x {copies}, {audio_seconds:.1f}s of audio"
+    )
+    click.echo(f"wall time    feed {report['wall_time']['feed']:.2f}s, total {report['wall_time']['total']:.2f}s")
+    click.echo(
+        f"throughput   {report['throughput']['realtime_factor']:.1f}x realtime, "
+        f"{report['throughput']['frames_per_s']:.0f} frames/s, {report['segments']} segments"
+    )
+    click.echo(f"frames       {report['frames']}")
+    click.echo("frame lag    " + ", ".join(f"{k} {ms(v)}" for k, v in report["frame_lag"].items()))
+    click.echo("seg. latency " + ", ".join(f"{k} {ms(v)}" for k, v in report["segment_latency"].items()))
+    click.echo(f"speakers     {report['speakers']}")
+
+
+if "__main__" == __name__:
+    main()
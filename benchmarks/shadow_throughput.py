@@ -0,0 +1,263 @@
+"""
+Throughput benchmark of `Shadow` decisions against the local Ollama stand-in.
+
+A transcript stream (recorded as JSONL, or synthetic) is fed into `Shadow.on_transcript`
+at its original pace, faster, or unthrottled. Reports decisions/s, queue wait and
+decision latency, and per time bucket the prompt sizes the stub saw, including how
+many prompt tokens had to be evaluated after KV cache reuse.
+
+Recorded streams have one transcript per line:
+
+    {"source": "alice", "text": "shall we start", "at": 12.4, "duration": 1.3}
+
+    python -m benchmarks.shadow_throughput --speakers 4 --duration 120 --speed 4 --parallel 2
+"""
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import click
+import numpy as np
+import yaml
+from pydantic import BaseModel
+
+from assistant.components.mumble.mumble import SpeechSegment
+from assistant.components.shadow import events
+from assistant.components.shadow.main import Shadow
+from assistant.components.transcriber.types import Transcript
+from assistant.core.config_manager import ConfigManager
+
+from .ollama_stub import LatencyModel, OllamaStub, OllamaStubConfig
+from .whisperx_stub import WORDS
+
+FILLERS = ["Thank you.", "Um.", "Okay.", "Yeah.", "you"]
+
+
+class TranscriptLine(BaseModel):
+    source: str
+    text: str
+    at: float
+    duration: float = 2.0
+
+
+def load_transcripts(path: str) -> List[TranscriptLine]:
+    with open(path) as f:
+        return sorted((TranscriptLine.model_validate_json(line) for line in f if line.strip()), key=lambda t: t.at)
+
+
+def synthetic_transcripts(rng: random.Random, speakers: int, duration: float, gap: float) -> List[TranscriptLine]:
+    """Speakers talking independently, with Poisson arrivals and some filler chunks."""
+    lines = []
+    for i in range(speakers):
+        at = rng.expovariate(1 / gap)
+        while at < duration:
+            if rng.random() < 0.2:
+                text, length = rng.choice(FILLERS), 0.6
+            else:
+                words = [rng.choice(WORDS) for _ in range(rng.randint(4, 20))]
+                text, length = " ".join(words).capitalize() + ".", 0.35 * len(words)
+            lines.append(TranscriptLine(source=f"speaker-{i}", text=text, at=at, duration=length))
+            at += length + rng.expovariate(1 / gap)
+    return sorted(lines, key=lambda t: t.at)
+
+
+def bucketed(values: List[dict], key: str, bucket: float) -> Dict[int, List[dict]]:
+    buckets: Dict[int, List[dict]] = {}
+    for value in values:
+        buckets.setdefault(int(value[key] // bucket), []).append(value)
+    return buckets
+
+
+def mean(values: List[float]) -> Optional[float]:
+    return float(np.mean(values)) if values else None
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    return {f"p{q}": float(np.percentile(values, q)) if values else None for q in (50, 95, 99)}
+
+
+@click.command()
+@click.option("--transcript", default=None, type=click.Path(exists=True), help="Recorded JSONL transcript stream")
+@click.option("--speakers", default=4, type=int, help="Synthetic speakers")
+@click.option("--duration", default=120.0, type=float, help="Seconds of synthetic conversation")
+@click.option("--gap", default=4.0, type=float, help="Mean pause between a speaker's utterances, seconds")
+@click.option("--speed", default=1.0, type=float, help="Playback speed multiplier, 0 for unthrottled")
+@click.option("--token-rate", default=60.0, type=float)
+@click.option("--prompt-rate", default=1500.0, type=float)
+@click.option("--overhead", default="fixed:0.02")
+@click.option("--parallel", default=1, type=int, help="Requests the stub serves at once")
+@click.option("--max-batch", default=8, type=int)
+@click.option("--max-concurrent", default=2, type=int, help="Shadow max_concurrent_llm_calls")
+@click.option("--no-preclassifier", is_flag=True)
+@click.option("--bucket", default=10.0, type=float, help="Report bucket, seconds of wall time")
+@click.option("--drain-timeout", default=30.0, type=float)
+@click.option("--seed", default=0, type=int)
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def main(
+    transcript,
+    speakers,
+    duration,
+    gap,
+    speed,
+    token_rate,
+    prompt_rate,
+    overhead,
+    parallel,
+    max_batch,
+    max_concurrent,
+    no_preclassifier,
+    bucket,
+    drain_timeout,
+    seed,
+    as_json,
+):
+    rng = random.Random(seed)
+    lines = load_transcripts(transcript) if transcript else synthetic_transcripts(rng, speakers, duration, gap)
+
+    model = "llama3.2:3b"
+    stub = OllamaStub(
+        OllamaStubConfig(
+            models=[model],
+            token_rate=token_rate,
+            prompt_rate=prompt_rate,
+            overhead=LatencyModel.parse(overhead),
+            parallel=parallel,
+            seed=seed,
+        )
+    ).start()
+
+    plugin_config = {
+        "url": stub.url,
+        "model": model,
+        "max_batch": max_batch,
+        "max_concurrent_llm_calls": max_concurrent,
+        "preclassifier": {"enabled": not no_preclassifier},
+    }
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+        yaml.safe_dump({"system": {}, "plugins": {"shadow": plugin_config}}, f)
+    shadow = Shadow(config=ConfigManager(f.name))
+    os.unlink(f.name)
+
+    shadow.on(events.SHADOW_MEMORY_SUMMARY, lambda _: None)
+    shadow.on(events.SHADOW_MODEL_PROGRESS, lambda _: None)
+    shadow.initialize()
+    shadow.models_ready["decision"].wait()
+    stub.log.clear()
+
+    fed_from, fed_from_perf = time.time(), time.perf_counter()
+    lock = threading.Lock()
+    decided: List[dict] = []
+    batches: List[int] = []
+    process_transcripts = shadow.process_transcripts
+
+    async def timed(source, batch):
+        started_at = time.time()
+        decisions = await process_transcripts(source, batch)
+        finished_at = time.time()
+        with lock:
+            batches.append(len(batch))
+            for segment, _ in batch:
+                arrived_at = segment.timestamp.timestamp()
+                decided.append(
+                    {
+                        "at": finished_at - fed_from,
+                        "queue_wait": started_at - arrived_at,
+                        "latency": finished_at - arrived_at,
+                    }
+                )
+        return decisions
+
+    shadow.process_transcripts = timed
+
+    started_at = time.monotonic()
+    for line in lines:
+        if speed > 0:
+            delay = started_at + line.at / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        # Stamped on arrival, so queue wait and latency are Shadow's own.
+        segment = SpeechSegment(source=line.source, data=np.zeros(0, dtype=np.int16))
+        shadow.on_transcript(
+            segment, Transcript(transcript=line.text, language="en", duration=line.duration, segments=[])
+        )
+    fed_at = time.monotonic()
+
+    last_progress, done = time.monotonic(), -1
+    while time.monotonic() - last_progress < drain_timeout:
+        with lock:
+            if len(decided) != done:
+                done, last_progress = len(decided), time.monotonic()
+            if done == len(lines):
+                break
+        time.sleep(0.05)
+    finished_at = time.monotonic()
+
+    requests = [dict(r, at=r["received_at"] - fed_from_perf) for r in stub.log]
+    by_bucket = bucketed(decided, "at", bucket)
+    requests_by_bucket = bucketed(requests, "at", bucket)
+    timeline = [
+        {
+            "from": b * bucket,
+            "decisions": len(by_bucket.get(b, [])),
+            "requests": len(requests_by_bucket.get(b, [])),
+            "prompt_tokens": mean([r["prompt_tokens"] for r in requests_by_bucket.get(b, [])]),
+            "evaluated_tokens": mean([r["evaluated_tokens"] for r in requests_by_bucket.get(b, [])]),
+            "queue_wait": mean([d["queue_wait"] for d in by_bucket.get(b, [])]),
+        }
+        for b in range(max(list(by_bucket) + list(requests_by_bucket), default=-1) + 1)
+    ]
+
+    queue_waits = [d["queue_wait"] for d in decided]
+    latencies = [d["latency"] for d in decided]
+    report = {
+        "transcripts": {"fed": len(lines), "decided": len(decided), "lost": len(lines) - len(decided)},
+        "speakers": len({line.source for line in lines}),
+        "wall_time": {"feed": fed_at - started_at, "total": finished_at - started_at},
+        "decisions_per_s": len(decided) / (finished_at - started_at),
+        "batch_size": {"mean": mean(batches), "max": max(batches, default=None)},
+        "queue_wait": percentiles(queue_waits),
+        "latency": percentiles(latencies),
+        "llm_requests": len(requests),
+        "prompt_tokens": {
+            "mean": mean([r["prompt_tokens"] for r in requests]),
+            "evaluated_mean": mean([r["evaluated_tokens"] for r in requests]),
+        },
+        "preclassifier": shadow.preclassifier_stats(),
+        "llm_calls": shadow.llm_call_stats(),
+        "timeline": timeline,
+    }
+
+    shadow.shutdown()
+    stub.stop()
+
+    if as_json:
+        click.echo(json.dumps(report, indent=2, default=str))
+        return
+
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:.0f}ms" if value is not None else "-"
+
+    click.echo(f"transcripts  {report['transcripts']}, {report['speakers']} speakers")
+    click.echo(f"wall time    feed {report['wall_time']['feed']:.2f}s, total {report['wall_time']['total']:.2f}s")
+    click.echo(
+        f"throughput   {report['decisions_per_s']:.2f} decisions/s, {report['llm_requests']} LLM requests, "
+        f"batch mean {report['batch_size']['mean'] or 0:.2f}"
+    )
+    click.echo("queue wait   " + ", ".join(f"{k} {ms(v)}" for k, v in report["queue_wait"].items()))
+    click.echo("latency      " + ", ".join(f"{k} {ms(v)}" for k, v in report["latency"].items()))
+    click.echo(f"preclass.    {report['preclassifier']}")
+    click.echo(f"\n{'from':>6} {'decided':>8} {'requests':>9} {'prompt tok':>11} {'evaluated':>10} {'queue wait':>11}")
+    for row in timeline:
+        click.echo(
+            f"{row['from']:>5.0f}s {row['decisions']:>8} {row['requests']:>9} "
+            f"{row['prompt_tokens'] or 0:>11.0f} {row['evaluated_tokens'] or 0:>10.0f} {ms(row['queue_wait']):>11}"
+        )
+
+
+if "__main__" == __name__:
+    main()
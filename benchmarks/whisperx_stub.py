@@ -0,0 +1,212 @@
+"""
+Local stand-in for the whisperx HTTP server used by `TranscriberService`.
+
+Implements `POST /transcribe` and `GET /health` with configurable latency and
+failure injection, so the pipeline can be exercised without a GPU box.
+
+    python -m benchmarks.whisperx_stub --port 8000 --latency lognormal:0.4,0.3 --error-rate 0.02
+"""
+
+import io
+import json
+import logging
+import random
+import threading
+import time
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import click
+import soundfile as sf
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+WORDS = "the quick brown fox jumps over a lazy dog while assistant listens".split()
+
+
+class LatencyModel(BaseModel):
+    """Latency distribution as `<kind>:<a>[,<b>]`, e.g. `fixed:0.2` or `uniform:0.1,0.5`.
+
+    kinds: fixed (seconds), uniform (low, high), normal (mean, std),
+    lognormal (median, sigma). `rtf` adds seconds per second of audio.
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+    rtf: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str, rtf: float = 0.0) -> "LatencyModel":
+        kind, _, params = spec.partition(":")
+        values = [float(v) for v in params.split(",") if v]
+        values += [0.0] * (2 - len(values))
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{kind}'")
+        return cls(kind=kind, a=values[0], b=values[1], rtf=rtf)
+
+    def sample(self, rng: random.Random, duration: float) -> float:
+        if self.kind == "uniform":
+            base = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            base = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            base = self.a * rng.lognormvariate(0.0, self.b)
+        else:
+            base = self.a
+        return max(0.0, base + self.rtf * duration)
+
+
+class StubConfig(BaseModel):
+    latency: LatencyModel = Field(default_factory=LatencyModel)
+    error_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    hang_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    hang_time: float = 300.0
+    seed: Optional[int] = None
+
+
+def parse_multipart(content_type: str, body: bytes) -> Dict[str, bytes]:
+    message = BytesParser(policy=policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+        for part in message.iter_parts()
+    }
+
+
+def fake_transcript(duration: float, rng: random.Random, align: bool) -> dict:
+    words = []
+    t = 0.1
+    while t + 0.3 < duration:
+        words.append({"word": rng.choice(WORDS), "start": round(t, 3), "end": round(t + 0.3, 3)})
+        t += 0.45
+
+    text = " ".join(w["word"] for w in words)
+    return {
+        "transcript": text,
+        "language": "en",
+        "duration": duration,
+        "speakers": [],
+        "segments": [
+            {
+                "text": text,
+                "start": words[0]["start"] if words else 0.0,
+                "end": words[-1]["end"] if words else duration,
+                "words": words if align else [],
+            }
+        ],
+    }
+
+
+class WhisperxStub:
+    def __init__(self, config: StubConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.rng_lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "WhisperxStub":
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name=f"whisperx-stub-{self.server.server_address[1]}", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _reply(self, status: int, payload: dict):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._reply(200, {"status": "ok"})
+                else:
+                    self._reply(404, {"detail": "Not Found"})
+
+            def do_POST(self):
+                if self.path != "/transcribe":
+                    self._reply(404, {"detail": "Not Found"})
+                    return
+
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                fields = parse_multipart(self.headers.get("Content-Type", ""), body)
+                if "file" not in fields:
+                    self._reply(422, {"detail": "Missing 'file' field"})
+                    return
+
+                info = sf.info(io.BytesIO(fields["file"]))
+                align = fields.get("align_words", b"False").lower() == b"true"
+
+                with stub.rng_lock:
+                    stub.requests += 1
+                    latency = stub.config.latency.sample(stub.rng, info.duration)
+                    fail = stub.rng.random() < stub.config.error_rate
+                    hang = stub.rng.random() < stub.config.hang_rate
+                    transcript = fake_transcript(info.duration, stub.rng, align)
+
+                time.sleep(stub.config.hang_time if hang else latency)
+
+                if fail:
+                    with stub.rng_lock:
+                        stub.failures += 1
+                    self._reply(500, {"detail": "Injected failure"})
+                else:
+                    self._reply(200, transcript)
+
+        return Handler
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", default=8000, type=int)
+@click.option(
+    "--latency", default="fixed:0.2", help="fixed:S | uniform:LO,HI | normal:MEAN,STD | lognormal:MEDIAN,SIGMA"
+)
+@click.option("--rtf", default=0.0, type=float, help="Extra seconds of latency per second of audio")
+@click.option("--error-rate", default=0.0, type=float)
+@click.option("--hang-rate", default=0.0, type=float)
+@click.option("--seed", default=None, type=int)
+def main(host, port, latency, rtf, error_rate, hang_rate, seed):
+    config = StubConfig(
+        latency=LatencyModel.parse(latency, rtf),
+        error_rate=error_rate,
+        hang_rate=hang_rate,
+        seed=seed,
+    )
+    stub = WhisperxStub(config, host, port)
+    print(f"whisperx stub listening on {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if "__main__" == __name__:
+    main()
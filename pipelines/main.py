@@ -10,6 +10,12 @@ from assistant.components.system.main import SystemIII
 from assistant.components.watchdog.main import Watchdog
 from assistant.components.watchdog import events as ww
 from assistant.components.shadow.main import Shadow
+from assistant.components.shadow import events as sh
+from assistant.components.memory.main import Memory
+from assistant.components.synthesis.main import Synthesis
+from assistant.components.synthesis import events as sy
+from assistant.components.profiler.main import Profiler
+from assistant.components.profiler import events as pp
 import logging
 
 from rich.logging import RichHandler
@@ -32,20 +38,33 @@ def main():
     watchdog = Watchdog(name="watchdog", config=config)
     system = SystemIII(config=config)
     shadow = Shadow(config=config)
+    memory = Memory(config=config)
+    synthesis = Synthesis(config=config)
+    profiler = Profiler(config=config)
 
     event_bus.register(mumble)
+    event_bus.register(recorder)
     event_bus.register(watchdog)
     event_bus.register(transcriber)
     event_bus.register(system)
     event_bus.register(shadow)
+    event_bus.register(memory)
+    event_bus.register(synthesis)
+    event_bus.register(profiler)
 
-    # mumble.on(mm.MUMBLE_CLIENT_CONNECTED, lambda: print("-> connect"))
-    # mumble.on(mm.MUMBLE_CLIENT_DISCONNECTED, lambda: print("-> disconnect"))
+    # mumble.on(mm.MUMBLE_CLIENT_CONNECTED, lambda connection: print(f"-> connect {connection}"))
+    # mumble.on(mm.MUMBLE_CLIENT_DISCONNECTED, lambda connection: print(f"-> disconnect {connection}"))
     mumble.on(mm.MUMBLE_AUDIO_SPEECH, recorder.on_speech)
     mumble.on(mm.MUMBLE_AUDIO_SPEECH, transcriber.on_speech)
     watchdog.on(ww.WATCHDOG_AUDIO_SPEECH_DETECTED, transcriber.on_speech)
     #transcriber.on(tt.TRANSCRIPTION_SEGMENT_DONE, system.on_transcript)
     transcriber.on(tt.TRANSCRIPTION_SEGMENT_DONE, shadow.on_transcript)
+    shadow.on(sh.SHADOW_MEMORY_SUMMARY, memory.on_summary)
+    shadow.on(sh.SHADOW_RESPONSE_SENTENCE, synthesis.on_sentence)
+    synthesis.on(sy.SYNTHESIS_SENTENCE_READY, mumble.on_play)
+    mumble.on(mm.MUMBLE_PLAYBACK_INTERRUPT, shadow.on_interrupt)
+    mumble.on(mm.MUMBLE_PLAYBACK_INTERRUPT, synthesis.on_interrupt)
+    profiler.on(pp.PROFILER_PROFILE_DONE, lambda report: print(f"-> profile written to {report['path']}"))
 
 
     mumble.initialize()
@@ -54,6 +73,12 @@ def main():
     system.initialize()
     watchdog.initialize()
     shadow.initialize()
+    memory.initialize()
+    synthesis.initialize()
+    profiler.initialize()
+
+    if interval := config.get_system_config().get("config_watch_interval", 2):
+        config.watch(interval)
 
     while True:
         try:
@@ -62,12 +87,16 @@ def main():
             print(end="\r")
             break
 
+    config.stop_watching()
     recorder.shutdown()
     mumble.shutdown()
     transcriber.shutdown()
     system.shutdown()
     watchdog.shutdown()
     shadow.shutdown()
+    memory.shutdown()
+    synthesis.shutdown()
+    profiler.shutdown()
 
 
 if "__main__" == __name__:
@@ -0,0 +1,106 @@
+"""
+Tests for runtime configuration changes: file reloads, live updates and their rollback.
+"""
+
+import os
+from typing import List
+
+import pytest
+import yaml
+
+from assistant.core.component import Component
+from assistant.core.config_manager import ConfigManager, merge_config
+
+
+class Tunable(Component):
+    @property
+    def version(self) -> str:
+        return "0.0.1"
+
+    @property
+    def events(self) -> List[str]:
+        return []
+
+    def apply_config(self, previous):
+        workers = self.get_config("workers", 1)
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.applied.append((previous.get("workers"), workers))
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    write(path, {"plugins": {"tunable": {"workers": 2, "vad": {"min_speech": 4}}, "other": {"x": 1}}})
+    return path
+
+
+def write(path, config):
+    path.write_text(yaml.safe_dump(config))
+    # Coarse filesystem timestamps would hide a rewrite within the same tick.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def tunable(config: ConfigManager) -> Tunable:
+    component = Tunable(config=config)
+    component.applied = []
+    return component
+
+
+def test_merge_config_is_nested_and_none_removes():
+    base = {"workers": 2, "vad": {"min_speech": 4, "silence_end": 8}}
+    merged = merge_config(base, {"vad": {"min_speech": 2}, "workers": None})
+
+    assert merged == {"vad": {"min_speech": 2, "silence_end": 8}}
+    assert base["vad"]["min_speech"] == 4
+
+
+def test_update_is_applied_and_kept_across_reloads(config_file):
+    config = ConfigManager(str(config_file))
+    component = tunable(config)
+
+    assert component.update_config({"workers": 4}) == {"workers": 4, "vad": {"min_speech": 4}}
+    assert component.applied == [(2, 4)]
+
+    write(config_file, {"plugins": {"tunable": {"workers": 2, "vad": {"min_speech": 3}}}})
+    assert config.reload() == ["other", "tunable"]
+    assert component.config == {"workers": 4, "vad": {"min_speech": 3}}
+
+
+def test_rejected_update_is_rolled_back(config_file):
+    config = ConfigManager(str(config_file))
+    component = tunable(config)
+
+    with pytest.raises(ValueError):
+        component.update_config({"workers": 0})
+
+    assert component.config["workers"] == 2
+    assert config.get_plugin_config("tunable")["workers"] == 2
+    assert component.applied == []
+
+
+def test_reload_only_notifies_changed_plugins(config_file):
+    config = ConfigManager(str(config_file))
+    component = tunable(config)
+
+    assert config.reload() == []
+    write(config_file, {"plugins": {"tunable": {"workers": 3, "vad": {"min_speech": 4}}, "other": {"x": 1}}})
+    assert config.reload() == ["tunable"]
+    assert component.applied == [(2, 3)]
+
+
+def test_invalid_file_keeps_current_config(config_file):
+    config = ConfigManager(str(config_file))
+    config_file.write_text("plugins: [")
+
+    assert config.reload() == []
+    assert config.get_plugin_config("tunable")["workers"] == 2
+
+
+def test_update_without_config_manager():
+    component = tunable(None)
+    component.config = {"workers": 1}
+
+    assert component.update_config({"workers": 2}) == {"workers": 2}
+    assert component.applied == [(1, 2)]
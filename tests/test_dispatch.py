@@ -0,0 +1,120 @@
+"""
+Tests for per-source dispatching of work off the calling thread.
+"""
+
+import threading
+import time
+
+from assistant.utils import DispatchConfig, SourceDispatcher
+
+
+def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert predicate()
+
+
+def test_items_of_one_source_are_handled_in_order():
+    handled = []
+    dispatcher = SourceDispatcher(lambda source, item: handled.append((source, item)), DispatchConfig(workers=4))
+    dispatcher.start()
+    for i in range(100):
+        dispatcher.submit("alice", i)
+    wait_for(lambda: len(handled) == 100)
+    dispatcher.shutdown()
+
+    assert [item for _, item in handled] == list(range(100))
+
+
+def test_sources_are_handled_in_parallel():
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def handle(source, item):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    dispatcher = SourceDispatcher(handle, DispatchConfig(workers=3)).start()
+    for source in ("alice", "bob", "carol"):
+        for i in range(3):
+            dispatcher.submit(source, i)
+    wait_for(lambda: sum(s["processed"] for s in dispatcher.stats().values()) == 9)
+    dispatcher.shutdown()
+
+    assert peak[0] == 3
+
+
+def test_submit_does_not_block_and_drops_oldest():
+    release = threading.Event()
+    handled = []
+
+    def handle(source, item):
+        release.wait(5.0)
+        handled.append(item)
+
+    dispatcher = SourceDispatcher(handle, DispatchConfig(workers=1, max_queue=3)).start()
+    dispatcher.submit("alice", 0)
+    wait_for(lambda: dispatcher.pending("alice") == 0)
+
+    started_at = time.monotonic()
+    accepted = [dispatcher.submit("alice", i) for i in range(1, 6)]
+    assert time.monotonic() - started_at < 0.1
+    assert accepted == [True, True, True, False, False]
+
+    release.set()
+    wait_for(lambda: len(handled) == 4)
+    dispatcher.shutdown()
+
+    assert handled == [0, 3, 4, 5]
+    assert dispatcher.stats()["alice"] == {"queued": 0, "enqueued": 6, "processed": 4, "dropped": 2, "failed": 0}
+
+
+def test_failing_item_does_not_stall_source():
+    handled = []
+
+    def handle(source, item):
+        if item == 1:
+            raise ValueError("bad chunk")
+        handled.append(item)
+
+    dispatcher = SourceDispatcher(handle, DispatchConfig(workers=1)).start()
+    for i in range(3):
+        dispatcher.submit("alice", i)
+    wait_for(lambda: len(handled) == 2)
+    wait_for(lambda: dispatcher.stats()["alice"]["processed"] == 3)
+    assert handled == [0, 2]
+    assert dispatcher.stats()["alice"]["failed"] == 1
+    wait_for(lambda: dispatcher.forget("alice"))
+    dispatcher.shutdown()
+    assert "alice" not in dispatcher.stats()
+
+
+def test_reconfigure_resizes_workers_and_trims_queues():
+    release = threading.Event()
+    handled = []
+
+    def handle(source, item):
+        release.wait(5.0)
+        handled.append(item)
+
+    dispatcher = SourceDispatcher(handle, DispatchConfig(workers=1, max_queue=10)).start()
+    dispatcher.submit("alice", 0)
+    wait_for(lambda: dispatcher.pending("alice") == 0)
+    for i in range(1, 6):
+        dispatcher.submit("alice", i)
+
+    dispatcher.reconfigure(DispatchConfig(workers=3, max_queue=2))
+    assert dispatcher.pool.size == 3
+    assert dispatcher.pending("alice") == 2
+
+    release.set()
+    wait_for(lambda: len(handled) == 3)
+    dispatcher.shutdown()
+
+    assert handled == [0, 4, 5]
+    assert dispatcher.stats()["alice"]["dropped"] == 3
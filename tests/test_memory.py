@@ -0,0 +1,122 @@
+"""
+Tests for the memory store, embedding cache and vector index.
+"""
+
+import numpy as np
+
+from assistant.components.memory.index import IndexConfig, VectorIndex
+from assistant.components.memory.store import EmbeddingCache, MemoryRecord, MemoryStore
+
+DIM = 16
+
+
+def clustered(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((20, DIM))
+    return (centers[rng.integers(20, size=n)] + 0.1 * rng.standard_normal((n, DIM))).astype(np.float32)
+
+
+class TestVectorIndex:
+    def test_exact_search(self):
+        index = VectorIndex(DIM)
+        vectors = clustered(100)
+        index.add(vectors)
+
+        ids, scores = index.search(vectors[42], k=3)
+        assert ids[0] == 42
+        assert abs(scores[0] - 1.0) < 1e-5
+        assert list(scores) == sorted(scores, reverse=True)
+
+    def test_ivf_matches_exact(self):
+        vectors = clustered(2000)
+        exact = VectorIndex(DIM)
+        exact.add(vectors)
+
+        approximate = VectorIndex(DIM, IndexConfig(ivf_threshold=1000, nprobe=8))
+        approximate.add(vectors)
+        approximate.training.join()
+        assert approximate.ivf is not None
+
+        queries = vectors[:20] + 0.01
+        recall = np.mean(
+            [
+                len(set(exact.search(q, 10)[0]) & set(approximate.search(q, 10)[0])) / 10
+                for q in queries
+            ]
+        )
+        assert recall > 0.9
+
+    def test_add_after_training(self):
+        index = VectorIndex(DIM, IndexConfig(ivf_threshold=500))
+        index.add(clustered(600))
+        index.training.join()
+
+        extra = clustered(1, seed=7)
+        index.add(extra)
+        assert index.search(extra[0], 1)[0][0] == 600
+
+
+class TestMemoryStore:
+    def test_persistence(self, tmp_path):
+        store = MemoryStore(str(tmp_path), DIM)
+        vector = clustered(1)[0]
+        store.add(MemoryRecord(summary="Bob likes tea"), vector)
+
+        reopened = MemoryStore(str(tmp_path), DIM)
+        vectors = reopened.load_vectors()
+        assert reopened.get(0).summary == "Bob likes tea"
+        assert np.array_equal(vectors[0], vector)
+
+    def test_reopen_after_torn_write(self, tmp_path):
+        store = MemoryStore(str(tmp_path), DIM)
+        store.add(MemoryRecord(summary="first"), np.full(DIM, 1, dtype=np.float32))
+        # Crash after the vector was written, and halfway through the next one.
+        store.matrix.append(np.full((1, DIM), 9, dtype=np.float32))
+        with open(store.matrix.path, "ab") as f:
+            f.write(b"\x00" * 10)
+        with open(store.records_path, "a") as f:
+            f.write('{"summary": "tor')
+
+        reopened = MemoryStore(str(tmp_path), DIM)
+        assert [r.summary for r in reopened.records] == ["first"]
+        reopened.add(MemoryRecord(summary="second"), np.full(DIM, 2, dtype=np.float32))
+
+        again = MemoryStore(str(tmp_path), DIM)
+        vectors = again.load_vectors()
+        assert [r.summary for r in again.records] == ["first", "second"]
+        assert vectors[:, 0].tolist() == [1.0, 2.0]
+
+    def test_embedding_cache(self, tmp_path):
+        calls = []
+
+        def embed(texts):
+            calls.append(list(texts))
+            return [[float(len(t))] * DIM for t in texts]
+
+        cache = EmbeddingCache(str(tmp_path), "model", DIM, embed)
+        cache(["a", "bb"])
+        cache(["bb", "ccc"])
+        assert calls == [["a", "bb"], ["ccc"]]
+
+        reopened = EmbeddingCache(str(tmp_path), "model", DIM, embed)
+        vectors = reopened(["ccc"])
+        assert len(calls) == 2
+        assert vectors[0][0] == 3.0
+
+    def test_embedding_cache_after_torn_write(self, tmp_path):
+        def embed(texts):
+            return [[float(len(t))] * DIM for t in texts]
+
+        cache = EmbeddingCache(str(tmp_path), "model", DIM, embed)
+        cache(["a"])
+        # Orphan vector without its key, then a partial key.
+        cache.matrix.append(np.full((1, DIM), 9, dtype=np.float32))
+        with open(cache.keys_path, "a") as f:
+            f.write(EmbeddingCache.key("zz")[:20])
+
+        reopened = EmbeddingCache(str(tmp_path), "model", DIM, embed)
+        assert set(reopened.entries) == {EmbeddingCache.key("a")}
+        reopened(["bb"])
+
+        again = EmbeddingCache(str(tmp_path), "model", DIM, embed)
+        assert again(["a", "bb"])[:, 0].tolist() == [1.0, 2.0]
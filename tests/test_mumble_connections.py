@@ -0,0 +1,146 @@
+"""
+Tests for serving several Mumble connections from one MumbleInterface, with fake clients.
+"""
+
+import logging
+import time
+
+import numpy as np
+import pytest
+
+from assistant.components.mumble import connection, events, mumble
+from assistant.components.mumble.mumble import DEFAULT_CONNECTION, MumbleInterface, Sentence, SpeechSegment
+
+
+class FakeConnection:
+    def __init__(self, config, on_sound, on_user_removed, emit, logger):
+        self.name = config.name
+        self.config = config
+        self.on_sound = on_sound
+        self.played = []
+        self.interrupted = 0
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def on_play(self, sentence: Sentence):
+        self.played.append(sentence)
+
+    def interrupt(self) -> bool:
+        self.interrupted += 1
+        return True
+
+
+def interface(monkeypatch, config: dict) -> MumbleInterface:
+    monkeypatch.setattr(mumble, "MumbleConnection", FakeConnection)
+    component = MumbleInterface()
+    component.config = config
+    return component
+
+
+def test_single_server_is_the_default_connection(monkeypatch):
+    component = interface(monkeypatch, {"server": {"host": "mumble.local", "channel": "Lobby"}})
+    [config] = component.connection_configs()
+    assert (config.name, config.host, config.port) == (DEFAULT_CONNECTION, "mumble.local", 64738)
+    assert config.channel == "Lobby"
+
+
+def test_connection_names_must_be_unique_and_plain(monkeypatch):
+    component = interface(monkeypatch, {"servers": [{"name": "a"}, {"name": "a"}]})
+    with pytest.raises(ValueError):
+        component.connection_configs()
+
+    component = interface(monkeypatch, {"servers": [{"name": "a/b"}]})
+    with pytest.raises(ValueError):
+        component.connection_configs()
+
+
+def test_playback_is_routed_by_connection(monkeypatch):
+    component = interface(monkeypatch, {"servers": [{"name": "lobby"}, {"name": "standup", "channel": "Standup"}]})
+    component.initialize()
+    try:
+        component.on_play(Sentence(text="hi", audio=None, length=0, connection="standup"))
+        component.on_play(Sentence(text="lost", audio=None, length=0, connection="elsewhere"))
+        assert component.connections["lobby"].played == []
+        assert [s.text for s in component.connections["standup"].played] == ["hi"]
+    finally:
+        component.shutdown()
+
+
+def test_speech_is_tagged_with_its_connection(monkeypatch):
+    component = interface(monkeypatch, {"servers": [{"name": "lobby"}]})
+    segments = []
+    component.on(events.MUMBLE_AUDIO_SPEECH, segments.append)
+    component.initialize()
+    try:
+        component.on_speech(component.speaker_key("lobby", "al/ice"), np.zeros(4, dtype=np.int16).tobytes())
+    finally:
+        component.shutdown()
+
+    assert (segments[0].connection, segments[0].source, segments[0].speaker) == ("lobby", "al/ice", "lobby/al/ice")
+    assert SpeechSegment(source="bob", data=np.zeros(0, dtype=np.int16)).speaker == "bob"
+
+
+class FakeSoundOutput:
+    def __init__(self):
+        self.frames = 0
+        self.cleared = 0
+
+    def add_sound(self, pcm: bytes):
+        self.frames += 1
+
+    def clear_buffer(self):
+        self.cleared += 1
+
+
+class FakeMumble:
+    def __init__(self, **kwargs):
+        self.sound_output = FakeSoundOutput()
+
+
+def test_interrupt_stops_playback_and_drops_queued_sentences(monkeypatch):
+    monkeypatch.setattr(connection, "Mumble", FakeMumble)
+    emitted = []
+    conn = connection.MumbleConnection(
+        connection.ConnectionConfig(name="lobby"),
+        on_sound=lambda *args: None,
+        on_user_removed=lambda *args: None,
+        emit=lambda event: lambda *args: emitted.append((event, *args)),
+        logger=logging.getLogger(__name__),
+    )
+    assert not conn.interrupt()
+
+    two_seconds = np.zeros(2 * 48000, dtype=np.int16)
+    conn.on_play(Sentence(text="long", audio=two_seconds, length=2.0, connection="lobby"))
+    conn.on_play(Sentence(text="queued", audio=two_seconds, length=2.0, connection="lobby"))
+    assert conn.is_playback_in_progress.wait(1.0)
+    time.sleep(0.1)
+
+    assert conn.interrupt()
+    assert conn.is_playback_done.wait(1.0)
+    time.sleep(0.1)
+    frames = conn.client.sound_output.frames
+    time.sleep(0.2)
+
+    assert emitted == [(events.MUMBLE_PLAYBACK_INTERRUPT, "lobby")]
+    assert 0 < frames < 50 and conn.client.sound_output.frames == frames
+    assert conn.client.sound_output.cleared == 1
+    assert conn.playback_queue.empty() and not conn.is_playback_in_progress.is_set()
+    conn.playback_clock.dispose()
+
+
+def test_speech_start_interrupts_playback_on_its_connection(monkeypatch):
+    component = interface(monkeypatch, {"servers": [{"name": "lobby"}, {"name": "standup"}]})
+    component.initialize()
+    try:
+        component.on_speech_start(component.speaker_key("standup", "alice"))
+        assert (component.connections["lobby"].interrupted, component.connections["standup"].interrupted) == (0, 1)
+
+        component.config["interrupt_on_speech"] = False
+        component.on_speech_start(component.speaker_key("standup", "alice"))
+        assert component.connections["standup"].interrupted == 1
+    finally:
+        component.shutdown()
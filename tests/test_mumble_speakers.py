@@ -0,0 +1,93 @@
+"""
+Tests for lazy per-speaker audio state and its idle eviction.
+"""
+
+import numpy as np
+
+from assistant.components.mumble.speakers import SpeakerRegistry, SpeakersConfig
+from assistant.utils.audio import VadConfig
+
+SAMPLERATE = 48000
+
+
+def frame(ms: int = 20) -> bytes:
+    return np.zeros(SAMPLERATE * ms // 1000, dtype=np.int16).tobytes()
+
+
+def registry(**kwargs) -> SpeakerRegistry:
+    speeches = []
+    speakers = SpeakerRegistry(
+        lambda source, speech: speeches.append((source, speech)),
+        source_samplerate=SAMPLERATE,
+        config=SpeakersConfig(idle_timeout=60, **kwargs),
+    )
+    speakers.speeches = speeches
+    return speakers
+
+
+def test_state_is_created_on_first_audio():
+    speakers = registry()
+    assert speakers.stats()["active"] == 0
+
+    speakers.process("alice", frame())
+    speakers.process("alice", frame())
+    speakers.process("bob", frame())
+
+    assert set(speakers.speakers) == {"alice", "bob"}
+    assert speakers.pool.stats()["created"] == 2
+
+
+def test_idle_speakers_are_evicted_and_vads_reused():
+    speakers = registry()
+    speakers.process("alice", frame())
+    speakers.process("bob", frame())
+    speakers.speakers["bob"].last_heard += 100
+
+    assert speakers.sweep(now=speakers.speakers["alice"].last_heard + 90) == ["alice"]
+    assert set(speakers.speakers) == {"bob"}
+
+    speakers.process("carol", frame())
+    assert speakers.pool.stats() == {"created": 2, "reused": 1, "idle": 0}
+
+
+def test_busy_speakers_are_kept():
+    speakers = registry()
+    speakers.can_evict = lambda source: source != "alice"
+    speakers.process("alice", frame())
+
+    assert speakers.sweep(now=speakers.speakers["alice"].last_heard + 90) == []
+    assert not speakers.evict("alice")
+
+
+def test_speech_in_progress_is_flushed_on_eviction():
+    speakers = registry()
+    speakers.process("alice", frame())
+    speech_filter = speakers.speakers["alice"].speech_filter
+    speech_filter.speaking = True
+    speech_filter.current_speech.extend(frame())
+
+    assert speakers.evict("alice")
+    assert speakers.speeches == [("alice", frame())]
+    assert not speech_filter.speaking
+
+
+def test_pool_keeps_at_most_max_idle():
+    speakers = registry(max_idle_vads=1)
+    for source in ("alice", "bob", "carol"):
+        speakers.process(source, frame())
+    speakers.shutdown()
+
+    assert speakers.stats() == {"active": 0, "evicted": 3, "vad": {"created": 3, "reused": 0, "idle": 1}}
+
+
+def test_vad_changes_reach_active_speakers():
+    speakers = registry()
+    speakers.process("alice", frame())
+    vad = VadConfig(min_speech=2, silence_end=3, speech_threshold=0.7)
+
+    speakers.reconfigure(SpeakersConfig(idle_timeout=30, max_idle_vads=2), vad)
+    speakers.process("bob", frame())
+
+    assert speakers.speakers["alice"].speech_filter.config == vad
+    assert speakers.speakers["bob"].speech_filter.config == vad
+    assert speakers.pool.max_idle == 2
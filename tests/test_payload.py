@@ -0,0 +1,48 @@
+"""
+Tests for the binary encoding of audio event payloads.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from assistant.components.mumble.mumble import Sentence, SpeechSegment
+
+
+def test_speech_segment_round_trip():
+    segment = SpeechSegment(
+        source="zoë",
+        data=np.arange(-500, 500, dtype=np.int16),
+        timestamp=datetime(2024, 5, 1, 12, 0, 0, 123457),
+        connection="lobby",
+    )
+    restored = SpeechSegment.from_bytes(segment.to_bytes())
+
+    assert restored.id == segment.id
+    assert restored.timestamp == segment.timestamp
+    assert (restored.source, restored.connection) == ("zoë", "lobby")
+    assert np.array_equal(restored.data, segment.data)
+
+
+def test_decoding_does_not_copy_audio():
+    segment = SpeechSegment(source="alice", data=np.arange(1000, dtype=np.int16))
+    header, audio = segment.to_buffers()
+    assert np.shares_memory(np.frombuffer(audio, dtype=np.int16), segment.data)
+
+    buffer = bytearray(segment.to_bytes())
+    restored = SpeechSegment.from_bytes(buffer)
+    assert np.shares_memory(restored.data, np.frombuffer(buffer, dtype=np.uint8))
+    assert len(header) % 8 == 0
+
+
+def test_sentence_without_audio():
+    sentence = Sentence(text="Okay.", audio=None, length=0.0, connection="standup")
+    restored = Sentence.from_bytes(sentence.to_bytes())
+    assert (restored.text, restored.audio, restored.connection) == ("Okay.", None, "standup")
+
+
+def test_wrong_payload_type_is_rejected():
+    sentence = Sentence(text="Okay.", audio=np.zeros(4, dtype=np.int16), length=0.5)
+    with pytest.raises(ValueError):
+        SpeechSegment.from_bytes(sentence.to_bytes())
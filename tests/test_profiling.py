@@ -0,0 +1,99 @@
+"""
+Tests for the sampling profiler, per-thread CPU accounting and the profiler component.
+"""
+
+import threading
+import time
+from queue import Queue
+
+import pytest
+
+from assistant.components.profiler.main import Profiler
+from assistant.utils.profiling import ProfileFormat, SamplingProfiler, render_flamegraph, thread_cpu_times
+from assistant.utils.utils import observe
+
+
+def spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=spin, args=(stop,), name="busy-spinner", daemon=True)
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_cpu_time_is_reported_per_named_thread(busy_thread):
+    time.sleep(0.3)
+    threads = {t.name: t for t in thread_cpu_times()}
+
+    assert threads["busy-spinner"].python
+    assert threads["busy-spinner"].native_id == busy_thread.native_id
+    assert threads["busy-spinner"].cpu > 0
+
+
+def test_busy_threads_are_sampled_and_idle_ones_skipped(busy_thread):
+    idle = threading.Event()
+    waiter = threading.Thread(target=idle.wait, name="idle-waiter", daemon=True)
+    waiter.start()
+
+    profiler = SamplingProfiler(interval=0.005).start()
+    time.sleep(0.3)
+    profile = profiler.stop()
+    idle.set()
+
+    by_thread = profile.by_thread()
+    assert by_thread["busy-spinner"] > 0
+    assert "idle-waiter" not in by_thread
+    assert any(stack.startswith("busy-spinner;") and "spin (" in stack for stack in profile.stacks)
+    assert profile.threads[0]["cpu"] >= profile.threads[-1]["cpu"]
+
+
+def test_collapsed_and_svg_output(tmp_path):
+    stacks = {"main;run (a.py:1);work (a.py:5)": 3, "main;run (a.py:1)": 1}
+
+    svg = render_flamegraph(stacks)
+    assert svg.startswith("<svg") and "work (a.py:5) (3 samples, 75.00%)" in svg
+
+    profiler = SamplingProfiler()
+    profiler.stacks.update(stacks)
+    profile = profiler.stop()
+    profile.write(str(tmp_path / "out.folded"), ProfileFormat.COLLAPSED)
+    assert (tmp_path / "out.folded").read_text() == "main;run (a.py:1) 1\nmain;run (a.py:1);work (a.py:5) 3\n"
+
+
+def test_observe_threads_are_named():
+    q = Queue()
+    observe(q, lambda item: None, name="test-observer")
+    assert "test-observer" in {t.name for t in threading.enumerate()}
+    q.put(None)
+
+
+def test_profile_service_writes_file(tmp_path, busy_thread):
+    profiler = Profiler()
+    profiler.config = {"location": str(tmp_path), "interval": 0.005}
+    profiler.initialize()
+    reports = []
+    profiler.on("profiler.profile.done", reports.append)
+
+    profiler.start_profile(duration=60, format="svg")
+    with pytest.raises(RuntimeError):
+        profiler.start_profile(duration=1)
+    time.sleep(0.2)
+    report = profiler.stop_profile()
+
+    assert reports == [report]
+    assert report["path"].endswith(".svg")
+    assert (tmp_path / report["path"].split("/")[-1]).read_text().startswith("<svg")
+    assert "busy-spinner" in report["by_thread"]
+    assert profiler.stop_profile() is None
+    assert not profiler.profile_status()["running"]
+
+    usage = profiler.thread_cpu(window=0.2)
+    assert usage[0]["name"] == "busy-spinner"
+    profiler.shutdown()
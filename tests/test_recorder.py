@@ -0,0 +1,152 @@
+"""
+Tests for the Recorder's background writer and archive.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from assistant.components.mumble.mumble import SpeechSegment
+from assistant.components.recorder import writer as writer_module
+from assistant.components.recorder.archive import INDEX_FILE, Archive, ArchiveConfig
+from assistant.components.recorder.main import Recorder
+from assistant.core.event_bus import EventBus
+
+
+def segment(source: str, seconds: float = 0.5) -> SpeechSegment:
+    return SpeechSegment(source=source, data=(np.random.rand(int(16000 * seconds)) * 1000).astype(np.int16))
+
+
+def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert predicate()
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    recorder = Recorder()
+    recorder.config = {"location": str(tmp_path), "writer": {"codec": "wav", "max_queue": 4, "max_batch": 8}}
+    recorder.initialize()
+    yield recorder
+    recorder.shutdown()
+
+
+def test_segments_are_written_in_the_background(recorder, tmp_path):
+    sent = segment("alice")
+    recorder.on_speech(sent)
+    wait_for(lambda: recorder.writer_stats()["written"] == 1)
+
+    [name] = os.listdir(tmp_path)
+    assert name.startswith("alice-") and name.endswith(".wav")
+    data, samplerate = sf.read(tmp_path / name, dtype="int16")
+    assert samplerate == 16000
+    assert np.array_equal(data, sent.data)
+
+
+def test_stalled_disk_does_not_block_and_drops_overflow(recorder, monkeypatch):
+    gate = threading.Event()
+    write = writer_module.sf.write
+
+    def stalled(*args, **kwargs):
+        gate.wait(5.0)
+        write(*args, **kwargs)
+
+    monkeypatch.setattr(writer_module.sf, "write", stalled)
+
+    recorder.on_speech(segment("alice"))
+    wait_for(lambda: recorder.writer.backlog() == 0)
+
+    started_at = time.monotonic()
+    for i in range(6):
+        recorder.on_speech(segment(f"speaker-{i}"))
+    assert time.monotonic() - started_at < 0.5
+
+    stats = recorder.writer_stats()
+    assert (stats["backlog"], stats["dropped"]) == (4, 2)
+
+    gate.set()
+    wait_for(lambda: recorder.writer_stats()["written"] == 5)
+    stats = recorder.writer_stats()
+    # The four that queued up behind the stall share one fsync.
+    assert stats["batches"] == 2
+    assert stats["write"]["p50"] > 0 and stats["fsync"] is not None
+
+
+def test_shutdown_flushes_the_backlog(tmp_path):
+    recorder = Recorder()
+    recorder.config = {"location": str(tmp_path), "writer": {"codec": "flac"}}
+    recorder.initialize()
+    for i in range(10):
+        recorder.on_speech(segment(f"speaker-{i}", seconds=0.1))
+    recorder.shutdown()
+
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".flac")]) == 10
+
+
+class TestArchive:
+    def test_query_by_speaker_and_time_range(self, tmp_path):
+        archive = Archive(str(tmp_path))
+        base = datetime(2024, 5, 1, 12, 0, 0)
+        segments = [
+            SpeechSegment(
+                source=source, data=np.full(100 + i, i, dtype=np.int16), timestamp=base + timedelta(seconds=i)
+            )
+            for i, source in enumerate(["alice", "bob", "alice", "alice", "bob"])
+        ]
+        for s in segments:
+            archive.append(s)
+
+        entries = archive.query("alice", start=base + timedelta(seconds=1), end=base + timedelta(seconds=3))
+        assert [e.id for e in entries] == [segments[2].id]
+        assert np.array_equal(archive.read(entries[0]), segments[2].data)
+
+        assert [e.speaker for e in archive.query(start=base + timedelta(seconds=3))] == ["alice", "bob"]
+        assert archive.query("carol") == []
+        assert len(archive.query("bob", limit=1)) == 1
+
+    def test_reopened_archive_drops_partial_record_and_keeps_appending(self, tmp_path):
+        archive = Archive(str(tmp_path), ArchiveConfig(max_file_size=300))
+        first = [segment("alice", seconds=0.005) for _ in range(3)]
+        for s in first:
+            archive.append(s)
+        archive.sync()
+        archive.close()
+        # A crash halfway through writing the next index record.
+        with open(tmp_path / INDEX_FILE, "ab") as f:
+            f.write(b"\0" * 7)
+
+        archive = Archive(str(tmp_path), ArchiveConfig(max_file_size=300))
+        later = segment("bob", seconds=0.005)
+        archive.append(later)
+
+        entries = archive.query()
+        assert [e.id for e in entries] == [s.id for s in first] + [later.id]
+        # 160 bytes per segment with a 300 byte limit, one segment per audio file.
+        assert [e.file for e in entries] == [0, 1, 2, 3]
+        for entry, s in zip(entries, first + [later]):
+            assert np.array_equal(archive.read(entry), s.data)
+        archive.close()
+
+    def test_recorder_archive_mode(self, tmp_path):
+        recorder = Recorder()
+        recorder.config = {"location": str(tmp_path), "mode": "archive"}
+        recorder.initialize()
+        # The pipeline reaches the recorder's services through the bus.
+        event_bus = EventBus()
+        event_bus.register(recorder)
+        sent = segment("alice")
+        recorder.on_speech(sent)
+        wait_for(lambda: event_bus.call_service(recorder.name, "writer_stats")["written"] == 1)
+
+        [entry] = event_bus.call_service(recorder.name, "query_recordings", speaker="alice")
+        assert entry.id == sent.id
+        assert np.array_equal(event_bus.call_service(recorder.name, "read_recording", entry), sent.data)
+        recorder.shutdown()
+        assert sorted(os.listdir(tmp_path)) == ["audio-000000.pcm", "index.bin", "speakers.txt"]
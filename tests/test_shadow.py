@@ -0,0 +1,267 @@
+"""
+Tests for per-speaker processing in Shadow, against a fake chat model.
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, SystemMessage
+
+from assistant.components.mumble.mumble import SpeechSegment
+from assistant.components.shadow import events, main
+from assistant.components.shadow.context import ContextConfig, RollingContext
+from assistant.components.shadow.main import DECISION_SYSTEM_PROMPT, Shadow
+from assistant.components.shadow.metrics import LlmCallStats
+from assistant.components.shadow.types import ActionDecision, MemorySummary, TranscriptionAction
+from assistant.components.transcriber.types import Transcript
+
+
+class FakeChain:
+    def __init__(self, llm: "FakeLlm", schema):
+        self.llm = llm
+        self.schema = schema
+
+    async def ainvoke(self, messages):
+        with self.llm.lock:
+            self.llm.active += 1
+            self.llm.peak = max(self.llm.peak, self.llm.active)
+        await asyncio.sleep(self.llm.delay)
+        with self.llm.lock:
+            self.llm.active -= 1
+            self.llm.prompts.append(messages)
+
+        if self.schema is MemorySummary:
+            parsed = MemorySummary(summary=messages[-1].content)
+        else:
+            parsed = ActionDecision(action=self.llm.action, reason="test")
+        return {"raw": None, "parsed": parsed, "parsing_error": None}
+
+
+class FakeLlm:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.action = TranscriptionAction.ADD_TO_CONTEXT
+        self.answer = ["Sure", ", it is", " ten past", " nine.", " Anything", " else", " I can", " do?"]
+        self.token_delay = 0.0
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.prompts = []
+
+    def with_structured_output(self, schema, **kwargs):
+        return FakeChain(self, schema)
+
+    async def astream(self, messages):
+        for token in self.answer:
+            await asyncio.sleep(self.token_delay)
+            yield AIMessageChunk(content=token)
+
+
+def transcript(text: str) -> Transcript:
+    return Transcript(transcript=text, language="en", duration=2.0, segments=[])
+
+
+def segment(source: str) -> SpeechSegment:
+    return SpeechSegment(source=source, data=np.zeros(16, dtype=np.int16))
+
+
+@pytest.fixture
+def shadow(monkeypatch):
+    llms = {"small": FakeLlm(delay=0.1), "big": FakeLlm(delay=1.0)}
+    ready = threading.Event()
+    ready.set()
+    monkeypatch.setattr(main, "ChatOllama", lambda **kwargs: llms[kwargs["model"]])
+    monkeypatch.setattr(main, "ensure_model_exists", lambda *args, **kwargs: ready)
+    shadow = Shadow()
+    shadow.config = {
+        "decision_model": "small",
+        "summary_model": {"model": "big", "options": {"num_ctx": 8192}},
+        "max_batch": 1,
+        "max_concurrent_llm_calls": 2,
+        "preclassifier": {"enabled": False},
+    }
+    shadow.initialize()
+    yield shadow
+    shadow.shutdown()
+
+
+def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert predicate()
+
+
+def test_contexts_are_per_speaker(shadow):
+    shadow.on_transcript(segment("alice"), transcript("alice talks about the trip"))
+    shadow.on_transcript(segment("bob"), transcript("bob talks about dinner"))
+    wait_for(lambda: len(shadow.decision_llm.prompts) == 2)
+
+    assert shadow.context_for("alice").snapshot()[1] == ["alice talks about the trip"]
+    assert shadow.context_for("bob").snapshot()[1] == ["bob talks about dinner"]
+
+
+def test_speakers_run_concurrently_up_to_cap(shadow):
+    for i in range(4):
+        shadow.on_transcript(segment(f"speaker-{i}"), transcript(f"speaker {i} says something"))
+    wait_for(lambda: len(shadow.decision_llm.prompts) == 4)
+
+    assert shadow.decision_llm.peak == 2
+
+
+def test_one_speaker_is_handled_in_order(shadow):
+    texts = [f"sentence number {i} here" for i in range(4)]
+    for text in texts:
+        shadow.on_transcript(segment("alice"), transcript(text))
+    wait_for(lambda: len(shadow.decision_llm.prompts) == 4)
+
+    assert shadow.decision_llm.peak == 1
+    assert shadow.context_for("alice").snapshot()[1] == texts
+
+
+def test_response_is_streamed_sentence_by_sentence(shadow):
+    sentences = []
+    shadow.on(events.SHADOW_RESPONSE_SENTENCE, sentences.append)
+    shadow.decision_llm.action = TranscriptionAction.RESPOND
+
+    shadow.on_transcript(segment("alice"), transcript("what time is it"))
+    wait_for(lambda: len(sentences) == 2)
+
+    assert [s.text for s in sentences] == ["Sure, it is ten past nine.", "Anything else I can do?"]
+    assert [s.index for s in sentences] == [0, 1]
+    assert all(s.source == "alice" for s in sentences)
+    wait_for(lambda: len(shadow.context_for("alice")) == 2)
+    assert shadow.context_for("alice").snapshot()[1][-1].endswith("Sure, it is ten past nine. Anything else I can do?")
+
+
+def test_interrupt_cancels_generation(shadow):
+    sentences = []
+    shadow.on(events.SHADOW_RESPONSE_SENTENCE, sentences.append)
+    shadow.decision_llm.action = TranscriptionAction.RESPOND
+    shadow.decision_llm.token_delay = 0.1
+
+    shadow.on_transcript(segment("alice"), transcript("what time is it"))
+    wait_for(lambda: len(sentences) == 1)
+    shadow.on_interrupt()
+    wait_for(lambda: not shadow.responses)
+    time.sleep(0.3)
+
+    assert len(sentences) == 1
+    assert shadow.context_for("alice").snapshot()[1][-1].endswith("Sure, it is ten past nine.")
+
+    # The speaker's worker keeps going after an interrupted response.
+    shadow.decision_llm.action = TranscriptionAction.ADD_TO_CONTEXT
+    shadow.on_transcript(segment("alice"), transcript("never mind then"))
+    wait_for(lambda: shadow.context_for("alice").snapshot()[1][-1] == "never mind then")
+
+
+def test_roles_fall_back_to_top_level_config(shadow):
+    decision, summary = shadow.llm_config("decision"), shadow.llm_config("summary")
+    assert (decision.model, decision.url, decision.options) == ("small", "localhost:11434", {})
+    assert (summary.model, summary.options) == ("big", {"num_ctx": 8192})
+
+
+def test_keep_alive_accepts_seconds(shadow):
+    shadow.config["keep_alive"] = -1
+    shadow.config["summary_model"] = {"model": "big", "keep_alive": 300}
+
+    assert shadow.llm_config("decision").keep_alive == -1
+    assert shadow.llm_config("summary").keep_alive == 300
+
+
+def test_memory_summary_does_not_block_decisions(shadow):
+    summaries = []
+    shadow.on(events.SHADOW_MEMORY_SUMMARY, summaries.append)
+    shadow.on_transcript(segment("alice"), transcript("my birthday is on the fifth of may"))
+    wait_for(lambda: len(shadow.context_for("alice")) == 1)
+
+    shadow.decision_llm.action = TranscriptionAction.STORE_IN_MEMORY
+    shadow.on_transcript(segment("alice"), transcript("please remember that"))
+    wait_for(lambda: len(shadow.decision_llm.prompts) == 2)
+    assert len(shadow.context_for("alice")) == 0
+
+    # Decided while the summary model is still busy.
+    shadow.decision_llm.action = TranscriptionAction.ADD_TO_CONTEXT
+    shadow.on_transcript(segment("alice"), transcript("what about the party"))
+    wait_for(lambda: shadow.context_for("alice").snapshot()[1] == ["what about the party"], timeout=0.5)
+    assert not summaries
+
+    wait_for(lambda: len(summaries) == 1)
+    assert "fifth of may" in summaries[0].summary
+
+
+def test_connections_keep_speakers_and_responses_apart(shadow):
+    sentences = []
+    shadow.on(events.SHADOW_RESPONSE_SENTENCE, sentences.append)
+    shadow.decision_llm.action = TranscriptionAction.RESPOND
+    shadow.decision_llm.token_delay = 0.1
+
+    lobby = SpeechSegment(source="alice", data=np.zeros(16, dtype=np.int16), connection="lobby")
+    standup = SpeechSegment(source="alice", data=np.zeros(16, dtype=np.int16), connection="standup")
+    shadow.on_transcript(lobby, transcript("what time is it"))
+    shadow.on_transcript(standup, transcript("what time is it"))
+    wait_for(lambda: len(sentences) == 2)
+    shadow.on_interrupt("lobby")
+    wait_for(lambda: len(sentences) == 3)
+    time.sleep(0.3)
+
+    assert {s.source for s in sentences} == {"lobby/alice", "standup/alice"}
+    assert [s.connection for s in sentences if s.index == 1] == ["standup"]
+    assert all(s.source == f"{s.connection}/alice" for s in sentences)
+
+
+def test_llm_call_stats_percentiles_and_counts():
+    stats = LlmCallStats()
+    for i in range(1, 11):
+        metadata = {"load_duration": 0, "prompt_eval_duration": i * 10**8, "prompt_eval_count": i * 10}
+        stats.record("decision", wall=float(i), raw=AIMessage(content="", response_metadata=metadata))
+    stats.record("decision", wall=11.0)
+    stats.record("context_fold", wall=2.0, raw=AIMessage(content="", response_metadata={"load_duration": 10**9}))
+
+    summary = stats.summary()
+    decision = summary["decision"]
+    assert decision["calls"] == 11
+    assert decision["wall"] == {"p50": 6.0, "p95": 10.5}
+    # The call without metadata only counts towards the wall clock.
+    assert decision["ttft"] == pytest.approx({"p50": 0.55, "p95": 0.955})
+    assert decision["prompt_tokens"] == pytest.approx({"p50": 55.0, "p95": 95.5})
+    assert decision["load"] == {"p50": 0.0, "p95": 0.0}
+    assert summary["context_fold"] == {
+        "calls": 1,
+        "wall": {"p50": 2.0, "p95": 2.0},
+        "ttft": None,
+        "load": {"p50": 1.0, "p95": 1.0},
+        "prompt_tokens": None,
+    }
+
+
+def test_decision_messages_keep_a_stable_prefix(shadow):
+    context = RollingContext(ContextConfig(max_tokens=1000), lambda summary, chunks: summary)
+    context.summary = "they planned a trip"
+    context.append("alice: we leave at nine")
+    context.append("bob: I'll bring snacks")
+
+    [system, summary, window, chunk] = shadow.decision_messages(context, [transcript("what time is it")])
+    assert isinstance(system, SystemMessage) and system.content == DECISION_SYSTEM_PROMPT
+    assert all(isinstance(m, HumanMessage) for m in (summary, window, chunk))
+    assert summary.content == "Conversation summary: they planned a trip"
+    assert window.content == "Conversation context:\n- alice: we leave at nine\n- bob: I'll bring snacks"
+    assert chunk.content == 'Transcription chunk: "what time is it"'
+
+    batch = shadow.decision_messages(context, [transcript("first"), transcript("second")])
+    assert batch[:3] == [system, summary, window]
+    assert batch[3].content.startswith('Transcription chunks, in order:\n[0] "first"\n[1] "second"\n')
+    # The shared system prompt must not restrict a batch to a single chunk.
+    assert "Decide for every chunk" in batch[3].content
+    assert "new transcription chunk(s)" in system.content and "latest" not in system.content
+
+    empty = RollingContext(ContextConfig(max_tokens=1000), lambda summary, chunks: summary)
+    assert [m.content for m in shadow.decision_messages(empty, [transcript("hi")])] == [
+        DECISION_SYSTEM_PROMPT,
+        'Transcription chunk: "hi"',
+    ]
+    context.close()
+    empty.close()
@@ -0,0 +1,74 @@
+"""
+Tests for the token-budgeted rolling context.
+"""
+
+import threading
+import time
+
+from assistant.components.shadow.context import ContextConfig, RollingContext
+
+
+def wait_for(predicate, timeout: float = 1.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestRollingContext:
+    def test_within_budget_keeps_everything(self):
+        context = RollingContext(ContextConfig(max_tokens=100), lambda s, c: "unused")
+        context.append("hello there")
+        context.append("general kenobi")
+
+        assert context.snapshot() == ("", ["hello there", "general kenobi"])
+        assert context.summary == ""
+
+    def test_old_chunks_are_folded_into_summary(self):
+        calls = []
+
+        def summarize(summary, chunks):
+            calls.append(chunks)
+            return "S"
+
+        # 4 chars per token: every chunk below costs 2 tokens.
+        context = RollingContext(ContextConfig(max_tokens=6, low_watermark=0.7), summarize)
+        for text in ["aaaa1111", "bbbb2222", "cccc3333", "dddd4444"]:
+            context.append(text)
+
+        assert wait_for(lambda: context.summary == "S")
+        assert calls == [["aaaa1111", "bbbb2222"]]
+        assert context.snapshot() == ("S", ["cccc3333", "dddd4444"])
+        assert context.prompt_tokens <= 6
+
+    def test_chunks_visible_while_folding(self):
+        release = threading.Event()
+
+        def summarize(summary, chunks):
+            release.wait(1.0)
+            return "S"
+
+        context = RollingContext(ContextConfig(max_tokens=2, low_watermark=0.5), summarize)
+        context.append("aaaa1111")
+        context.append("bbbb2222")
+
+        assert context.snapshot() == ("", ["aaaa1111", "bbbb2222"])
+        release.set()
+        assert wait_for(lambda: context.snapshot() == ("S", ["bbbb2222"]))
+
+    def test_clear_discards_inflight_fold(self):
+        release = threading.Event()
+
+        def summarize(summary, chunks):
+            release.wait(1.0)
+            return "stale"
+
+        context = RollingContext(ContextConfig(max_tokens=2, low_watermark=0.5), summarize)
+        context.append("aaaa1111")
+        context.append("bbbb2222")
+        context.clear()
+        release.set()
+
+        time.sleep(0.05)
+        assert context.snapshot() == ("", [])
+        assert context.summary == ""
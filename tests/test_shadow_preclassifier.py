@@ -0,0 +1,55 @@
+"""
+Tests for the rule-based transcript pre-classifier.
+"""
+
+import pytest
+
+from assistant.components.shadow.preclassifier import PreClassifier, PreClassifierConfig
+from assistant.components.shadow.types import TranscriptionAction
+from assistant.components.transcriber.types import Transcript
+
+
+def transcript(text: str, duration: float = 2.0) -> Transcript:
+    return Transcript(transcript=text, language="en", duration=duration)
+
+
+@pytest.fixture
+def classifier():
+    return PreClassifier(PreClassifierConfig())
+
+
+class TestPreClassifier:
+    @pytest.mark.parametrize("text", ["Thank you.", " you", "...", "Um,", "Thanks for watching!"])
+    def test_stop_phrases_discarded(self, classifier, text):
+        assert classifier.classify(transcript(text)).action == TranscriptionAction.DISCARD
+
+    def test_single_word_discarded(self, classifier):
+        assert classifier.classify(transcript("Potato.")).action == TranscriptionAction.DISCARD
+
+    def test_keep_words_go_to_model(self, classifier):
+        assert classifier.classify(transcript("No.")) is None
+
+    def test_repetition_loop_discarded(self, classifier):
+        decision = classifier.classify(transcript("the the the the the the the the", duration=3))
+        assert decision.action == TranscriptionAction.DISCARD
+
+    def test_implausible_rate_discarded(self, classifier):
+        decision = classifier.classify(transcript("well I think", duration=30))
+        assert decision.action == TranscriptionAction.DISCARD
+
+    def test_regular_sentence_goes_to_model(self, classifier):
+        assert classifier.classify(transcript("Could you remind me about the meeting tomorrow?")) is None
+
+    def test_fragment_added_to_context(self):
+        classifier = PreClassifier(PreClassifierConfig(fragment_max_words=4))
+        decision = classifier.classify(transcript("and then we"))
+        assert decision.action == TranscriptionAction.ADD_TO_CONTEXT
+
+    def test_counters(self, classifier):
+        classifier.classify(transcript("Thank you."))
+        classifier.classify(transcript("Could you remind me about the meeting tomorrow?"))
+        assert classifier.stats() == {"total": 2, "llm": 1, "avoided.DISCARD": 1}
+
+    def test_disabled(self):
+        classifier = PreClassifier(PreClassifierConfig(enabled=False))
+        assert classifier.classify(transcript("Thank you.")) is None
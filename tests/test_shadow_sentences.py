@@ -0,0 +1,38 @@
+"""
+Tests for splitting streamed LLM tokens into sentences.
+"""
+
+from assistant.components.shadow.sentences import SentenceSplitter
+
+
+def stream(text: str, step: int = 3, **kwargs):
+    splitter = SentenceSplitter(**kwargs)
+    sentences = []
+    for i in range(0, len(text), step):
+        sentences += splitter.feed(text[i : i + step])
+    return sentences, splitter.flush()
+
+
+def test_sentences_are_emitted_as_they_end():
+    splitter = SentenceSplitter()
+    assert splitter.feed("The weather is fine today") == []
+    assert splitter.feed(". And tomor") == ["The weather is fine today."]
+    assert splitter.flush() == ["And tomor"]
+
+
+def test_decimals_and_abbreviations_do_not_split():
+    sentences, rest = stream("Dr. Smith measured 3.5 degrees today. That is warm!")
+    assert sentences == ["Dr. Smith measured 3.5 degrees today."]
+    assert rest == ["That is warm!"]
+
+
+def test_short_sentences_are_joined():
+    sentences, rest = stream("Okay. Let me check that for you. Done.")
+    assert sentences == ["Okay. Let me check that for you."]
+    assert rest == ["Done."]
+
+
+def test_markdown_and_line_breaks():
+    sentences, rest = stream("Here is the plan\n- **first** step here\n- second one")
+    assert sentences == ["Here is the plan", "first step here"]
+    assert rest == ["second one"]
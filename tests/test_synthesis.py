@@ -0,0 +1,141 @@
+"""
+Tests for the synthesis audio cache and in-order emission, with a fake Piper voice.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from assistant.components.shadow.types import ResponseSentence
+from assistant.components.synthesis import events, main
+from assistant.components.synthesis.cache import AudioCache, phrase_key
+from assistant.components.synthesis.main import Synthesis
+
+
+class FakeVoice:
+    class config:
+        sample_rate = 22050
+
+    def __init__(self):
+        self.calls = []
+
+    def synthesize_stream_raw(self, text: str):
+        self.calls.append(text)
+        # Longer text takes longer, so later short sentences finish first.
+        time.sleep(0.01 * len(text))
+        yield np.full(2205, len(text), dtype=np.int16).tobytes()
+
+
+class TestAudioCache:
+    def test_keys_ignore_case_and_spacing(self):
+        assert phrase_key("amy", "One  moment.") == phrase_key("amy", " one moment.")
+        assert phrase_key("amy", "One moment.") != phrase_key("lessac", "One moment.")
+
+    def test_lru_eviction(self):
+        cache = AudioCache(None, capacity=2)
+        for key in "abc":
+            cache.put(key, key, np.zeros(4, dtype=np.int16))
+        assert cache.get("a") is None
+        assert cache.get("c") is not None
+        assert cache.stats()["entries"] == 2
+
+    def test_short_phrases_persist_on_disk(self, tmp_path):
+        cache = AudioCache(str(tmp_path), max_disk_chars=10)
+        cache.put("short", "Okay.", np.arange(4, dtype=np.int16))
+        cache.put("long", "This one is much too long.", np.arange(4, dtype=np.int16))
+
+        reopened = AudioCache(str(tmp_path))
+        assert np.array_equal(reopened.get("short"), np.arange(4))
+        assert reopened.get("long") is None
+        assert reopened.stats()["disk_hits"] == 1
+
+
+@pytest.fixture
+def synthesis(monkeypatch, tmp_path):
+    voice = FakeVoice()
+    monkeypatch.setattr(main.PiperVoice, "load", lambda *args, **kwargs: voice)
+    synthesis = Synthesis()
+    synthesis.config = {"max_workers": 4, "preload": [], "cache": {"location": str(tmp_path)}}
+    synthesis.initialize()
+    yield synthesis
+    synthesis.shutdown()
+
+
+def collect(synthesis: Synthesis) -> list:
+    ready = []
+    synthesis.on(events.SYNTHESIS_SENTENCE_READY, ready.append)
+    return ready
+
+
+def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert predicate()
+
+
+def test_sentences_are_emitted_in_order(synthesis):
+    ready = collect(synthesis)
+    texts = ["This is a rather long first sentence of the answer.", "Short.", "Medium length one."]
+    for i, text in enumerate(texts):
+        synthesis.on_sentence(ResponseSentence(source="alice", text=text, index=i))
+
+    wait_for(lambda: len(ready) == 3)
+    assert [s.text for s in ready] == texts
+    assert all(s.audio.dtype == np.int16 for s in ready)
+    # 0.1 s at 22050 Hz resampled for Mumble.
+    assert abs(len(ready[0].audio) - 4800) <= 1
+
+
+def test_repeated_phrases_are_not_resynthesized(synthesis):
+    synthesis.synthesize("One moment.")
+    synthesis.synthesize("one moment.")
+    assert synthesis.voice.calls == ["One moment."]
+    assert synthesis.cache_stats()["memory_hits"] == 1
+
+
+def test_interrupt_drops_pending_sentences(synthesis):
+    ready = collect(synthesis)
+    gate = threading.Event()
+    synthesize = synthesis.synthesize
+
+    def blocked(text: str):
+        gate.wait(2.0)
+        return synthesize(text)
+
+    synthesis.synthesize = blocked
+
+    for i in range(3):
+        synthesis.on_sentence(ResponseSentence(source="alice", text=f"Sentence {i}.", index=i))
+    synthesis.on_interrupt()
+    gate.set()
+    time.sleep(0.3)
+    assert ready == []
+
+    synthesis.synthesize = synthesize
+    synthesis.on_sentence(ResponseSentence(source="alice", text="After the interrupt.", index=0))
+    wait_for(lambda: len(ready) == 1)
+    assert ready[0].text == "After the interrupt."
+
+
+def test_interrupt_only_drops_sentences_of_its_connection(synthesis):
+    ready = collect(synthesis)
+    gate = threading.Event()
+    synthesize = synthesis.synthesize
+
+    def blocked(text: str):
+        gate.wait(2.0)
+        return synthesize(text)
+
+    synthesis.synthesize = blocked
+
+    synthesis.on_sentence(ResponseSentence(source="lobby/alice", text="For the lobby.", index=0, connection="lobby"))
+    synthesis.on_sentence(ResponseSentence(source="standup/bob", text="For standup.", index=0, connection="standup"))
+    synthesis.on_interrupt("lobby")
+    gate.set()
+
+    wait_for(lambda: len(ready) == 1)
+    time.sleep(0.2)
+    assert [(s.text, s.connection) for s in ready] == [("For standup.", "standup")]
@@ -0,0 +1,72 @@
+"""
+Tests for the whisperx endpoint pool.
+"""
+
+import time
+
+import pytest
+
+from assistant.components.transcriber.endpoints import (
+    BreakerState,
+    CircuitBreakerConfig,
+    EndpointPool,
+    EndpointPoolConfig,
+    HedgingConfig,
+    NoEndpointAvailable,
+)
+
+
+def make_pool(urls, **kwargs) -> EndpointPool:
+    return EndpointPool(EndpointPoolConfig(urls=urls, **kwargs))
+
+
+class TestEndpointPool:
+    def test_least_outstanding(self):
+        pool = make_pool(["http://a", "http://b"])
+        first = pool.acquire()
+        second = pool.acquire()
+        assert {first.url, second.url} == {"http://a", "http://b"}
+
+    def test_breaker_opens_and_recovers(self):
+        pool = make_pool(
+            ["http://a"],
+            breaker=CircuitBreakerConfig(failure_threshold=2, reset_timeout=0.05),
+        )
+
+        def fail(url):
+            raise ConnectionError(url)
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                pool.request(fail)
+
+        assert pool.endpoints[0].state == BreakerState.OPEN
+        with pytest.raises(NoEndpointAvailable):
+            pool.acquire()
+
+        time.sleep(0.06)
+        assert pool.request(lambda url: url) == "http://a"
+        assert pool.endpoints[0].state == BreakerState.CLOSED
+
+    def test_hedged_request_wins_on_slow_node(self):
+        pool = make_pool(
+            ["http://slow", "http://fast"],
+            hedging=HedgingConfig(enabled=True, min_samples=1),
+        )
+        pool.endpoints[0].latencies.append(0.01)
+
+        def call(url):
+            if url == "http://slow":
+                time.sleep(0.5)
+            return url
+
+        # Make sure the slow node is chosen as primary.
+        pool.endpoints[1].outstanding = 1
+        started_at = time.monotonic()
+        result = pool.request(call)
+        pool.endpoints[1].outstanding -= 1
+
+        assert result == "http://fast"
+        assert time.monotonic() - started_at < 0.4
+        assert pool.stats()["hedges_won"] == 1
+        pool.shutdown()
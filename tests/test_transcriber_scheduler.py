@@ -0,0 +1,156 @@
+"""
+Tests for the transcription queue scheduler.
+"""
+
+from datetime import datetime, timedelta
+from queue import Empty
+
+import numpy as np
+import pytest
+
+from assistant.components.mumble.mumble import SpeechSegment
+from assistant.components.transcriber.scheduler import (
+    FairScheduler,
+    SchedulerConfig,
+    SchedulingClass,
+    SheddingPolicy,
+)
+
+
+def segment(source: str, age: float = 0.0, samples: int = 16, connection: str = "default") -> SpeechSegment:
+    return SpeechSegment(
+        source=source,
+        data=np.zeros(samples, dtype=np.int16),
+        timestamp=datetime.now() - timedelta(seconds=age),
+        connection=connection,
+    )
+
+
+def drain(scheduler: FairScheduler):
+    return [scheduler.get_nowait().source for _ in range(scheduler.qsize())]
+
+
+class TestFairScheduler:
+    def test_live_preempts_batch(self):
+        """Live segments are served before already queued batch work."""
+        scheduler = FairScheduler()
+        for _ in range(3):
+            scheduler.put(segment("watchdog"))
+        scheduler.put(segment("alice"))
+
+        assert drain(scheduler) == ["alice", "watchdog", "watchdog", "watchdog"]
+
+    def test_round_robin_between_speakers(self):
+        """A chatty speaker does not starve others within the same class."""
+        scheduler = FairScheduler()
+        for source in ["alice", "alice", "alice", "bob", "carol"]:
+            scheduler.put(segment(source))
+
+        assert drain(scheduler) == ["alice", "bob", "carol", "alice", "alice"]
+
+    def test_weights_within_priority_level(self):
+        """Classes on the same priority split work by weight."""
+        config = SchedulerConfig(
+            default_class="a",
+            classes=[
+                SchedulingClass(name="a", weight=3),
+                SchedulingClass(name="b", weight=1, sources=["b"]),
+            ],
+        )
+        scheduler = FairScheduler(config)
+        for _ in range(4):
+            scheduler.put(segment("a"))
+            scheduler.put(segment("b"))
+
+        assert drain(scheduler)[:4].count("a") == 3
+
+    def test_get_timeout(self):
+        scheduler = FairScheduler()
+        with pytest.raises(Empty):
+            scheduler.get(timeout=0.01)
+
+    def test_unknown_default_class(self):
+        with pytest.raises(ValueError):
+            FairScheduler(SchedulerConfig(default_class="missing"))
+
+
+class TestLoadShedding:
+    def test_expired_segments_are_shed(self):
+        """Segments older than their class max_age are skipped on dequeue."""
+        scheduler = FairScheduler()
+        scheduler.put(segment("alice", age=60))
+        scheduler.put(segment("bob"))
+
+        assert scheduler.get_nowait().source == "bob"
+        assert scheduler.stats()["shed"] == {"live.expired": 1}
+
+    def test_drop_oldest_from_lowest_priority(self):
+        scheduler = FairScheduler(SchedulerConfig(max_depth=2))
+        scheduler.put(segment("watchdog", age=2))
+        scheduler.put(segment("alice"))
+        scheduler.put(segment("watchdog", age=1))
+
+        assert scheduler.depth_by_class() == {"live": 1, "batch": 1}
+        assert scheduler.stats()["shed"] == {"batch.dropped": 1}
+
+    def test_merge_keeps_audio(self):
+        scheduler = FairScheduler(SchedulerConfig(max_depth=1, policy=SheddingPolicy.MERGE))
+        scheduler.put(segment("alice", samples=10))
+        scheduler.put(segment("alice", samples=20))
+
+        merged = scheduler.get_nowait()
+        assert len(merged.data) == 30
+        assert scheduler.stats()["shed"] == {"live.merged": 1}
+
+    def test_merge_keeps_connections_apart(self):
+        scheduler = FairScheduler(SchedulerConfig(max_depth=2, policy=SheddingPolicy.MERGE))
+        first = segment("alice", age=2, samples=10, connection="lobby")
+        scheduler.put(first)
+        scheduler.put(segment("alice", age=1, samples=20, connection="standup"))
+        scheduler.put(segment("alice", samples=5, connection="lobby"))
+
+        merged = {s.connection: s for s in (scheduler.get_nowait(), scheduler.get_nowait())}
+        assert set(merged) == {"lobby", "standup"}
+        assert len(merged["lobby"].data) == 15
+        assert merged["lobby"].id == first.id
+        assert len(merged["standup"].data) == 20
+
+    def test_spill_and_restore(self, tmp_path):
+        scheduler = FairScheduler(
+            SchedulerConfig(max_depth=1, policy=SheddingPolicy.SPILL, spill_dir=str(tmp_path))
+        )
+        scheduler.put(segment("watchdog", age=1, samples=8))
+        scheduler.put(segment("watchdog"))
+        assert len(list(tmp_path.iterdir())) == 1
+
+        scheduler.get_nowait()
+        restored = scheduler.get_nowait()
+        assert restored.source == "watchdog"
+        assert len(restored.data) == 8
+        assert not list(tmp_path.iterdir())
+
+
+class TestReconfigure:
+    def test_lowered_max_depth_sheds_right_away(self):
+        scheduler = FairScheduler()
+        for age in (3, 2, 1):
+            scheduler.put(segment("watchdog", age=age))
+        scheduler.put(segment("alice"))
+
+        scheduler.reconfigure(SchedulerConfig(max_depth=2))
+        assert scheduler.depth_by_class() == {"live": 1, "batch": 1}
+        assert scheduler.stats()["shed"] == {"batch.dropped": 2}
+
+    def test_segments_of_removed_classes_are_reclassified(self):
+        scheduler = FairScheduler()
+        scheduler.put(segment("watchdog"))
+
+        scheduler.reconfigure(SchedulerConfig(classes=[SchedulingClass(name="live")]))
+        assert scheduler.depth_by_class() == {"live": 1}
+        assert scheduler.get_nowait().source == "watchdog"
+
+    def test_unknown_default_class_is_rejected(self):
+        scheduler = FairScheduler()
+        with pytest.raises(ValueError):
+            scheduler.reconfigure(SchedulerConfig(default_class="missing"))
+        assert scheduler.config.default_class == "live"
@@ -0,0 +1,101 @@
+"""
+Tests for windowed transcription splitting and stitching.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from assistant.config import SPEECH_PIPELINE_SAMPLERATE
+from assistant.components.transcriber import main
+from assistant.components.transcriber.main import TranscriberService
+from assistant.components.transcriber.types import Segment, Transcript, Word
+from assistant.components.transcriber.windowing import split_windows, stitch
+
+
+def transcript(words, duration: float) -> Transcript:
+    words = [Word(word=w, start=s, end=e) for w, s, e in words]
+    segment = Segment(text=" ".join(w.word for w in words), start=words[0].start, end=words[-1].end, words=words)
+    return Transcript(transcript=segment.text, language="en", duration=duration, segments=[segment])
+
+
+class TestSplitWindows:
+    def test_windows_cover_audio(self):
+        windows = split_windows(50, 1, window=20, overlap=2)
+        assert windows == [(0, 20), (18, 38), (36, 50)]
+
+    def test_short_audio_single_window(self):
+        assert split_windows(10, 1, window=20, overlap=2) == [(0, 10)]
+
+    def test_invalid_overlap(self):
+        with pytest.raises(ValueError):
+            split_windows(50, 1, window=2, overlap=2)
+
+
+class TestStitch:
+    def test_overlap_words_deduplicated(self):
+        # Window 0 covers [0, 10), window 1 covers [8, 18); the word spoken at ~8.5s
+        # is heard by both windows and must only appear once.
+        first = transcript([("hello", 1.0, 1.5), ("there", 8.2, 8.8)], 10)
+        second = transcript([("there", 0.2, 0.8), ("friend", 3.0, 3.5)], 10)
+
+        result = stitch([(0.0, first), (8.0, second)], overlap=2.0, duration=18.0)
+
+        assert result.transcript == "hello there friend"
+        assert [w.start for s in result.segments for w in s.words] == [1.0, 8.2, 11.0]
+        assert result.duration == 18.0
+
+    def test_segments_without_words(self):
+        first = Transcript(
+            transcript="a b",
+            language="en",
+            duration=10,
+            segments=[Segment(text="a", start=0, end=2), Segment(text="b", start=8.5, end=9.5)],
+        )
+        second = Transcript(
+            transcript="b c",
+            language="en",
+            duration=10,
+            segments=[Segment(text="b", start=0.5, end=1.5), Segment(text="c", start=4, end=5)],
+        )
+
+        result = stitch([(0.0, first), (8.0, second)], overlap=2.0, duration=18.0)
+        assert result.transcript == "a b c"
+
+
+class SlowSubmitExecutor(ThreadPoolExecutor):
+    """Pauses after its first submit, leaving room for a reconfigure mid-segment."""
+
+    submitting = threading.Event()
+
+    def submit(self, fn, *args, **kwargs):
+        future = super().submit(fn, *args, **kwargs)
+        if not self.submitting.is_set():
+            self.submitting.set()
+            time.sleep(0.2)
+        return future
+
+
+def test_resize_waits_for_windows_being_submitted(monkeypatch):
+    monkeypatch.setattr(main, "ThreadPoolExecutor", SlowSubmitExecutor)
+    transcriber = TranscriberService()
+    transcriber.config = {"max_workers": 2, "windowing": {"enabled": True, "window": 20, "overlap": 2}}
+    transcriber.initialize()
+    monkeypatch.setattr(
+        transcriber, "transcribe", lambda data: transcript([("w", 0.0, 1.0)], len(data) / SPEECH_PIPELINE_SAMPLERATE)
+    )
+    try:
+        resized = threading.Thread(
+            target=lambda: SlowSubmitExecutor.submitting.wait(1.0) and transcriber.update_config({"max_workers": 3})
+        )
+        resized.start()
+        result = transcriber.transcribe_windowed(np.zeros(50 * SPEECH_PIPELINE_SAMPLERATE, dtype=np.int16), 50.0)
+        resized.join()
+
+        assert transcriber.windows_executor._max_workers == 3
+        assert result.duration == 50.0
+    finally:
+        transcriber.shutdown()
@@ -0,0 +1,90 @@
+"""
+Tests for queue, worker pool and Ollama model helpers in assistant.utils.
+"""
+
+import threading
+import time
+from queue import Queue
+
+import pytest
+
+from assistant.utils import models
+from assistant.utils.models import ensure_model_exists
+from assistant.utils.workers import WorkerPool
+
+
+class FakeOllama:
+    def __init__(self, models):
+        self.models = list(models)
+        self.calls = []
+
+    def list(self):
+        self.calls.append("list")
+        return {"models": [{"model": m} for m in self.models]}
+
+    def pull(self, model, stream=False):
+        self.calls.append("pull")
+        for completed in range(0, 101, 10):
+            yield {"status": "pulling", "completed": completed, "total": 100}
+        self.models.append(model if ":" in model else f"{model}:latest")
+        yield {"status": "success"}
+
+    def generate(self, model, keep_alive=None):
+        self.calls.append(("generate", keep_alive))
+
+
+class TestEnsureModelExists:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        client = FakeOllama(["llama3.2:3b"])
+        monkeypatch.setattr(models, "_clients", {"http://ollama": client})
+        monkeypatch.setattr(models, "_inventories", {})
+        return client
+
+    def test_inventory_is_cached(self, client):
+        assert ensure_model_exists("http://ollama", "llama3.2:3b").wait(1.0)
+        assert ensure_model_exists("http://ollama", "llama3.2:3b").wait(1.0)
+        assert client.calls == ["list"]
+
+    def test_missing_model_is_pulled_in_background(self, client):
+        progress = []
+        ready = ensure_model_exists("http://ollama", "nomic-embed-text", on_progress=progress.append)
+        assert ready.wait(1.0)
+
+        assert client.calls == ["list", "pull"]
+        assert [p.completed for p in progress if p.status == "pulling"] == list(range(0, 101, 10))
+        assert progress[-1].status == "success"
+        # Untagged names match the ':latest' listing, no second pull.
+        assert ensure_model_exists("http://ollama", "nomic-embed-text").wait(1.0)
+        assert client.calls == ["list", "pull"]
+
+    def test_warmup_loads_model(self, client):
+        assert ensure_model_exists("http://ollama", "llama3.2:3b", warmup=True, keep_alive="30m").wait(1.0)
+        assert client.calls == ["list", ("generate", "30m")]
+
+
+class TestWorkerPool:
+    def test_resize_while_running(self):
+        q = Queue()
+        release = threading.Event()
+        pool = WorkerPool(q, lambda item: release.wait(1.0), max_workers=2, name="resize").start()
+
+        pool.resize(4)
+        assert pool.size == 4
+        assert {t.name for t in pool._threads} == {f"resize-{i}" for i in range(4)}
+
+        pool.resize(1)
+        assert pool.size == 1
+        deadline = time.monotonic() + 5.0
+        while len(pool._threads) > 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert len(pool._threads) == 1
+
+        # The remaining worker still handles items.
+        release.set()
+        q.put(1)
+        deadline = time.monotonic() + 5.0
+        while not q.empty() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert q.empty()
+        pool.shutdown(wait=True)